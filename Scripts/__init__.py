@@ -0,0 +1,59 @@
+# Importing Packages
+import importlib
+
+# Submodules of the package. Nothing is imported with the package itself: a submodule (and its dependencies, e.g.
+# matplotlib for ``anova_vis`` or scipy.stats for ``anova``) is only loaded when one of its names is first used.
+# ``manova`` names the submodule, its function is ``Scripts.manova.manova``.
+SUBMODULES = ['accumulators', 'anova', 'anova_vis', 'assumptions', 'batched_tests', 'benchmarks', 'bootstrap',
+              'chunked_ingest', 'dataset_cache', 'dist_cache', 'instrumentation', 'manova', 'multiple_testing',
+              'permutation', 'post_hoc', 'results', 'rolling', 'sequential', 'stats_tests']
+
+# Public names served from the package level {name: submodule}
+_EXPORTS = {
+    'running_moments': 'accumulators', 'grouped_moments': 'accumulators',
+    'group_summary': 'anova', 'one_way_anova': 'anova', 'one_way_anova_wide': 'anova', 'two_way_anova': 'anova',
+    'normality_tests': 'assumptions', 'homogeneity_tests': 'assumptions', 'assumption_checks': 'assumptions',
+    'assumption_checks_wide': 'assumptions',
+    'pre_anova_vis': 'anova_vis', 'marginal_means': 'anova_vis', 'marginal_means_plot': 'anova_vis',
+    'marginal_row_mean_plot': 'anova_vis', 'marginal_mean_plot': 'anova_vis',
+    'one_porportion_ztest_batch': 'batched_tests', 'ztest_notpooled_batch': 'batched_tests',
+    'long_to_wide': 'batched_tests', 'grouped_one_porportion_ztest': 'batched_tests',
+    'grouped_ztest_notpooled': 'batched_tests',
+    'bootstrap_distribution': 'bootstrap', 'percentile_ci': 'bootstrap', 'basic_ci': 'bootstrap',
+    'bca_ci': 'bootstrap', 'bootstrap_ci': 'bootstrap', 'sampling_distribution': 'bootstrap',
+    'iter_csv_chunks': 'chunked_ingest', 'read_grouped_moments': 'chunked_ingest',
+    'grouped_two_pop_tests': 'chunked_ingest', 'grouped_proportion_tests': 'chunked_ingest',
+    'cache_dataset': 'dataset_cache', 'load_columns': 'dataset_cache', 'load_dataset': 'dataset_cache',
+    'profiling': 'instrumentation',
+    'design_matrix': 'manova', 'mv_test_arrays': 'manova',
+    'storey_pi0': 'multiple_testing', 'adjust_pvalues': 'multiple_testing', 'adjust_pvalues_external': 'multiple_testing',
+    'permutation_test': 'permutation', 'two_sample_permutation_test': 'permutation',
+    'k_sample_permutation_test': 'permutation',
+    'pairwise_arrays': 'post_hoc', 'pairwise_comparisons': 'post_hoc', 'iter_pairwise_comparisons': 'post_hoc',
+    'tukey_hsd': 'post_hoc',
+    'test_result': 'results', 'from_test_output': 'results', 'result_array': 'results', 'to_records': 'results',
+    'decide': 'results', 'to_frame': 'results',
+    'rolling_window_tests': 'rolling', 'rolling_tests': 'rolling',
+    'msprt_tests': 'sequential',
+    'one_porportion_ztest': 'stats_tests', 'hyp_test': 'stats_tests', 'chi_square_one_pop': 'stats_tests',
+    'chi_square_hyp_test': 'stats_tests', 'ztest_notpooled': 'stats_tests', 'f_dist_test': 'stats_tests',
+}
+
+__all__ = SUBMODULES + list(_EXPORTS)
+
+def __getattr__(name):
+    """
+    Description: This function is the module level ``__getattr__`` (PEP 562). It imports a submodule, or the submodule
+                 defining a public name, on first access and caches the result in the package namespace.
+    """
+    if name in SUBMODULES:
+        value = importlib.import_module('.' + name,__name__)
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module('.' + _EXPORTS[name],__name__),name)
+    else:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__,name))
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
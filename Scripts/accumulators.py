@@ -0,0 +1,225 @@
+# Importing Packages
+import numpy as np
+
+class running_moments:
+    """
+    Description: This class is a compact accumulator of the sufficient statistics (count, mean and M2 i.e. sum of squared
+                 deviations) of a stream of observations. It lets the tests in ``stats_tests`` run over data that does not
+                 fit in memory, in one pass over chunked input with constant memory.
+
+                 Single values are added with Welford's update and chunks with Chan's parallel update, so accumulators
+                 built from separate shards can be merged into one.
+    """
+    __slots__ = ('count','mean','m2')
+
+    def __init__(self,count=0,mean=0.,m2=0.):
+        """
+        Description: This function is created for initializing the accumulator, empty by default.
+
+        Input: It accepts below input parameters:
+            1. ``count`` : Number of observations
+            2. ``mean`` : Mean of the observations
+            3. ``m2`` : Sum of squared deviations from the mean
+
+        Child-Functions:
+            ``push``   : Adds one observation (Welford update)
+            ``update`` : Adds a chunk of observations
+            ``merge``  : Merges another accumulator into this one
+            ``var``    : Variance of the observations seen so far
+            ``std``    : Standard deviation of the observations seen so far
+        """
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+    def _combine(self,count,mean,m2):
+        """
+        Description: This function merges the moments of another set of observations into this accumulator (Chan et al.).
+        """
+        if count == 0:
+            return self
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * (count / total)
+        self.m2 += m2 + (delta * delta) * (self.count * count / total)
+        self.count = total
+        return self
+
+    def push(self,value):
+        """
+        Description: This function adds one observation with Welford's update. NaN's are ignored.
+        Return: The accumulator itself
+        """
+        value = float(value)
+        if value != value:
+            return self
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        return self
+
+    def update(self,values):
+        """
+        Description: This function adds a chunk (array, list or Pandas Series) of observations. NaN's are ignored.
+        Return: The accumulator itself
+        """
+        chunk = np.asarray(values,dtype=float).ravel()
+        # Memory-mapped or NaN free chunks are read in place, only the NaN filtering makes a copy
+        nan_mask = np.isnan(chunk)
+        if nan_mask.any():
+            chunk = chunk[~nan_mask]
+        if chunk.size == 0:
+            return self
+        chunk_mean = chunk.mean()
+        chunk_dev = chunk - chunk_mean
+        return self._combine(chunk.size,chunk_mean,np.dot(chunk_dev,chunk_dev))
+
+    def merge(self,other):
+        """
+        Description: This function merges another ``running_moments`` (e.g. built from a different shard) into this one.
+        Return: The accumulator itself
+        """
+        return self._combine(other.count,other.mean,other.m2)
+
+    def __add__(self,other):
+        return running_moments(self.count,self.mean,self.m2).merge(other)
+
+    def var(self,ddof=0):
+        """
+        Description: This function returns the variance of the observations, ``ddof=0`` like ``np.var``.
+        """
+        if self.count - ddof <= 0:
+            return np.nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self,ddof=0):
+        """
+        Description: This function returns the standard deviation of the observations, ``ddof=0`` like ``np.std``.
+        """
+        return np.sqrt(self.var(ddof=ddof))
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return 'running_moments(count={}, mean={}, m2={})'.format(self.count,self.mean,self.m2)
+
+    @classmethod
+    def from_chunks(cls,chunks):
+        """
+        Description: This function builds an accumulator in one pass over an iterable of chunks (e.g. ``pd.read_csv(chunksize=...)``
+                     column slices or memory-mapped blocks).
+        Return: New ``running_moments`` accumulator
+        """
+        acc = cls()
+        for chunk in chunks:
+            acc.update(chunk)
+        return acc
+
+class grouped_moments:
+    """
+    Description: This class keeps one set of sufficient statistics (count, mean and M2) per group key. Every chunk is
+                 reduced with one grouped pass and merged into the per-group arrays with Chan's parallel update, so the
+                 memory used depends on the number of groups and never on the number of rows seen.
+    """
+    __slots__ = ('labels','count','mean','m2','_positions')
+
+    def __init__(self):
+        """
+        Description: This function is created for initializing an empty grouped accumulator.
+
+        Child-Functions:
+            ``update`` : Adds a chunk of (group key, value) pairs
+            ``merge``  : Merges another ``grouped_moments`` into this one
+            ``get``    : Returns the ``running_moments`` accumulator of one group
+        """
+        self.labels = []
+        self.count = np.zeros(0,dtype=np.int64)
+        self.mean = np.zeros(0,dtype=float)
+        self.m2 = np.zeros(0,dtype=float)
+        self._positions = {}
+
+    def _slots_for(self,keys):
+        """
+        Description: This function returns the array positions of the given group keys, adding new groups when needed.
+        """
+        new_keys = [key for key in keys if key not in self._positions]
+        if new_keys:
+            for key in new_keys:
+                self._positions[key] = len(self.labels)
+                self.labels.append(key)
+            grow = len(new_keys)
+            self.count = np.concatenate((self.count,np.zeros(grow,dtype=np.int64)))
+            self.mean = np.concatenate((self.mean,np.zeros(grow)))
+            self.m2 = np.concatenate((self.m2,np.zeros(grow)))
+        return np.array([self._positions[key] for key in keys],dtype=np.intp)
+
+    def _combine(self,keys,count,mean,m2):
+        """
+        Description: This function merges per-group moments of another set of observations into the accumulator.
+        """
+        pos = self._slots_for(keys)
+        old_count = self.count[pos]
+        total = old_count + count
+        delta = mean - self.mean[pos]
+        with np.errstate(invalid='ignore',divide='ignore'):
+            weight = np.where(total > 0,count / total,0.)
+            self.mean[pos] += delta * weight
+            self.m2[pos] += m2 + (delta * delta) * (old_count * weight)
+        self.count[pos] = total
+        return self
+
+    def update(self,keys,values):
+        """
+        Description: This function adds a chunk of observations. Rows with a NaN value or a missing key are ignored.
+
+        Input Parameters: It accepts below inputs:
+            1. keys : Array or Pandas Series of group keys
+            2. values : Array or Pandas Series of observations (same length as ``keys``)
+
+        Return: The accumulator itself
+        """
+        # pandas is only loaded by the grouped accumulator, the scalar tests never need it
+        import pandas as pd
+        values = np.asarray(values,dtype=float)
+        codes, uniques = pd.factorize(np.asarray(keys))
+        keep = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[keep], values[keep]
+        n_grp = len(uniques)
+        count = np.bincount(codes,minlength=n_grp)
+        present = count > 0
+        with np.errstate(invalid='ignore',divide='ignore'):
+            mean = np.bincount(codes,weights=values,minlength=n_grp) / count
+        dev = values - mean[codes]
+        m2 = np.bincount(codes,weights=dev * dev,minlength=n_grp)
+        return self._combine(list(uniques[present]),count[present],mean[present],m2[present])
+
+    def merge(self,other):
+        """
+        Description: This function merges another ``grouped_moments`` (e.g. built from a different file or shard) into this one.
+        Return: The accumulator itself
+        """
+        return self._combine(list(other.labels),other.count,other.mean,other.m2)
+
+    def get(self,key):
+        """
+        Description: This function returns the ``running_moments`` accumulator of one group.
+        """
+        pos = self._positions[key]
+        return running_moments(self.count[pos],self.mean[pos],self.m2[pos])
+
+    def __contains__(self,key):
+        return key in self._positions
+
+    def __len__(self):
+        return len(self.labels)
+
+    def to_frame(self,ddof=0):
+        """
+        Description: This function returns the per-group count, mean and variance as a Pandas DataFrame.
+        """
+        import pandas as pd
+        with np.errstate(invalid='ignore',divide='ignore'):
+            var = np.where(self.count - ddof > 0,self.m2 / (self.count - ddof),np.nan)
+        return pd.DataFrame({'count': self.count, 'mean': self.mean, 'var': var},index=pd.Index(self.labels,name='group'))
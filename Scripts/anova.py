@@ -0,0 +1,220 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+import scipy.stats as scipy_stats
+
+def _as_2d(values):
+    """
+    Description: This function returns the response(s) as a float (observations x responses) array, the response names
+                 and a flag telling whether a single response was given.
+    """
+    names = None
+    if isinstance(values,pd.DataFrame):
+        names = list(values.columns)
+    elif isinstance(values,pd.Series):
+        names = [values.name]
+    values = np.asarray(values,dtype=float)
+    single = values.ndim == 1
+    if single:
+        values = values[:,None]
+    if names is None:
+        names = list(range(values.shape[1]))
+    return values, names, single
+
+def _group_sums(values,codes,n_groups):
+    """
+    Description: This function calculates the per-group count and sum of every response column (centered on its grand
+                 mean for numerical stability) and the total sum of squares, with one ``np.bincount`` per response.
+                 The NaN's of a response are dropped for that response only. Only one centered column is held at a
+                 time, so the temporary memory is O(observations) whatever the number of groups.
+
+    Input Parameters: It accepts below inputs:
+        1. values : (observations x responses) float array
+        2. codes : Integer group code (0 .. n_groups-1) of every observation
+        3. n_groups : Number of groups
+
+    Returns:
+        - Counts, shape (n_groups x responses)
+        - Centered sums, shape (n_groups x responses)
+        - Total (centered) sum of squares, shape (responses,)
+    """
+    all_counts = np.bincount(codes,minlength=n_groups)
+    counts = np.empty((n_groups,values.shape[1]),dtype=np.int64)
+    sums = np.empty((n_groups,values.shape[1]))
+    ss_total = np.empty(values.shape[1])
+    for j in range(values.shape[1]):
+        col, col_codes = values[:,j], codes
+        valid = ~np.isnan(col)
+        if valid.all():
+            counts[:,j] = all_counts
+        else:
+            col, col_codes = col[valid], codes[valid]
+            counts[:,j] = np.bincount(col_codes,minlength=n_groups)
+        col = col - col.mean() if col.size else col
+        sums[:,j] = np.bincount(col_codes,weights=col,minlength=n_groups)
+        ss_total[j] = np.dot(col,col)
+    return counts, sums, ss_total
+
+def _prepare(values,factors):
+    """
+    Description: This function drops the observations having a missing factor level and factorizes the factors. NaN
+                 responses are kept, they are dropped per response by ``_group_sums``.
+
+    Returns:
+        - (observations x responses) array
+        - Response names
+        - Single response flag
+        - List of (codes, levels) per factor
+    """
+    values, names, single = _as_2d(values)
+    factors = [np.asarray(factor) for factor in factors]
+    coded = [pd.factorize(factor,sort=True) for factor in factors]
+    keep = np.ones(values.shape[0],dtype=bool)
+    for codes, _ in coded:
+        keep &= codes >= 0
+    if not keep.all():
+        values = values[keep]
+        coded = [pd.factorize(factor[keep],sort=True) for factor in factors]
+    return values, names, single, coded
+
+def _anova_table(terms,dfs,sum_sqs,names,single):
+    """
+    Description: This function builds the ANOVA table from the degrees of freedom and sums of squares of every term.
+                 The last term has to be the residual. The degrees of freedom of a term are a scalar or one value per
+                 response (responses having NaN's have less observations).
+
+    Return: For a single response a statsmodels ``anova_lm`` like DataFrame (one row per term with df, sum_sq, mean_sq, F, PR(>F)).
+            For many responses a DataFrame indexed by response with (term, statistic) columns.
+    """
+    dfs = np.vstack([np.broadcast_to(np.asarray(df_term,dtype=float),(len(names),)) for df_term in dfs])
+    sum_sqs = np.vstack(sum_sqs)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        mean_sqs = sum_sqs / dfs
+        f_stats = mean_sqs[:-1] / mean_sqs[-1]
+    p_values = scipy_stats.f.sf(f_stats,dfs[:-1],dfs[-1])
+    f_stats = np.vstack((f_stats,np.full((1,len(names)),np.nan)))
+    p_values = np.vstack((p_values,np.full((1,len(names)),np.nan)))
+
+    if single:
+        return pd.DataFrame({'df': dfs[:,0], 'sum_sq': sum_sqs[:,0], 'mean_sq': mean_sqs[:,0],
+                             'F': f_stats[:,0], 'PR(>F)': p_values[:,0]},index=terms)
+    columns = {}
+    for i, term in enumerate(terms):
+        columns[(term,'df')] = dfs[i]
+        columns[(term,'sum_sq')] = sum_sqs[i]
+        columns[(term,'mean_sq')] = mean_sqs[i]
+        if i < len(terms) - 1:
+            columns[(term,'F')] = f_stats[i]
+            columns[(term,'PR(>F)')] = p_values[i]
+    return pd.DataFrame(columns,index=pd.Index(names,name='response'))
+
+def group_summary(values,groups):
+    """
+    Description: This function calculates the count, mean and variance (ddof=1) of every group in one grouped pass.
+                 It is the input of the post-hoc analysis.
+
+    Input Parameters: It accepts below inputs:
+        1. values : 1-D array or Pandas Series of observations
+        2. groups : Group label of every observation
+
+    Return: DataFrame indexed by group with count, mean and var columns
+    """
+    values = np.asarray(values,dtype=float)
+    codes, levels = pd.factorize(np.asarray(groups),sort=True)
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    counts = np.bincount(codes,minlength=len(levels))
+    with np.errstate(invalid='ignore',divide='ignore'):
+        means = np.bincount(codes,weights=values,minlength=len(levels)) / counts
+        dev = values - means[codes]
+        variances = np.bincount(codes,weights=dev * dev,minlength=len(levels)) / (counts - 1)
+    return pd.DataFrame({'count': counts, 'mean': means, 'var': variances},index=pd.Index(levels,name='group'))
+
+def one_way_anova(values,groups):
+    """
+    Description: This function performs the one-factor ANOVA from grouped sums and sums of squares.
+
+    Input Parameters: It accepts below inputs:
+        1. values : Observations. Either a 1-D array/Series (one response) or a 2-D array/DataFrame with one column per
+                    response, all responses sharing the same grouping.
+        2. groups : Treatment or group label of every observation
+
+    Return: ANOVA table with 'groups' and 'Residual' rows (see ``_anova_table``)
+    """
+    values, names, single, coded = _prepare(values,[groups])
+    codes, levels = coded[0]
+    counts, sums, ss_total = _group_sums(values,codes,len(levels))
+    # Per response, as NaN's are dropped response by response
+    n_obs, n_grp = counts.sum(axis=0), np.count_nonzero(counts,axis=0)
+
+    # Sums are centered on the grand mean
+    with np.errstate(invalid='ignore',divide='ignore'):
+        ss_between = np.sum(np.where(counts > 0,sums**2 / counts,0.),axis=0)
+    ss_within = ss_total - ss_between
+    return _anova_table(['groups','Residual'],[n_grp - 1,n_obs - n_grp],[ss_between,ss_within],names,single)
+
+def one_way_anova_wide(df,cols=None):
+    """
+    Description: This function performs the one-factor ANOVA on wide data having one column per treatment (like the
+                 ``ANOVA_questions/ch08_all`` files), the columns may have different lengths (NaN padded).
+
+    Input Parameters: It accepts below inputs:
+        1. df : Pandas DataFrame having one column per treatment
+        2. cols : List of treatment columns (by default every column)
+
+    Return: ANOVA table (see ``one_way_anova``)
+    """
+    cols = list(df.columns) if cols is None else list(cols)
+    values = np.asarray(df[cols],dtype=float)
+    groups = np.broadcast_to(np.asarray(cols,dtype=object),values.shape)
+    return one_way_anova(values.ravel(),groups.ravel())
+
+def two_way_anova(values,factor_a,factor_b,replication=True,names=('A','B')):
+    """
+    Description: This function performs the two-factor ANOVA from grouped cell sums and sums of squares.
+
+    Input Parameters: It accepts below inputs:
+        1. values : Observations. Either a 1-D array/Series (one response) or a 2-D array/DataFrame with one column per response.
+        2. factor_a : Level of the first factor (treatment) of every observation
+        3. factor_b : Level of the second factor (block) of every observation
+        4. replication : It expects below values:
+                            a) True : Two-factors with repetition. Every cell must have the same number (> 1) of observations
+                                      and the interaction term is reported.
+                            b) False : Two-factors without repetition (randomized block). Every cell must have exactly one observation.
+        5. names : Names of the two factors used as row labels (by default ('A','B'))
+
+    Return: ANOVA table with rows A, B, (A:B) and Residual (see ``_anova_table``)
+    """
+    values, resp_names, single, coded = _prepare(values,[factor_a,factor_b])
+    (codes_a, levels_a), (codes_b, levels_b) = coded
+    n_a, n_b = len(levels_a), len(levels_b)
+
+    cell_codes = codes_a * n_b + codes_b
+    counts, sums, ss_total = _group_sums(values,cell_codes,n_a * n_b)
+    # Observations per cell and in total, per response (NaN's are dropped response by response)
+    reps = counts[0]
+    n_obs = counts.sum(axis=0)
+    if not (counts == reps).all():
+        raise ValueError('unbalanced design, every (A, B) cell must have the same number of (non-NaN) observations')
+    if replication and (reps < 2).any():
+        raise ValueError('two-factors with repetition needs more than one observation per cell')
+    if not replication and (reps != 1).any():
+        raise ValueError('two-factors without repetition needs exactly one observation per cell')
+
+    # Sums are centered on the grand mean
+    cell_sums = sums.reshape(n_a,n_b,-1)
+    ss_a = np.sum(cell_sums.sum(axis=1)**2,axis=0) / (n_b * reps)
+    ss_b = np.sum(cell_sums.sum(axis=0)**2,axis=0) / (n_a * reps)
+    a_name, b_name = names
+
+    if not replication:
+        ss_resid = ss_total - ss_a - ss_b
+        return _anova_table([a_name,b_name,'Residual'],[n_a - 1,n_b - 1,(n_a - 1) * (n_b - 1)],
+                            [ss_a,ss_b,ss_resid],resp_names,single)
+
+    ss_cells = np.sum(sums**2,axis=0) / reps
+    ss_ab = ss_cells - ss_a - ss_b
+    ss_resid = ss_total - ss_cells
+    return _anova_table([a_name,b_name,'{}:{}'.format(a_name,b_name),'Residual'],
+                        [n_a - 1,n_b - 1,(n_a - 1) * (n_b - 1),n_obs - (n_a * n_b)],
+                        [ss_a,ss_b,ss_ab,ss_resid],resp_names,single)
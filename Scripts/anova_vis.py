@@ -1,16 +1,238 @@
 # Importing Packages
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn
-import stemgraphic as stem
-from statsmodels import api as sm_api
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator, FuncFormatter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+import scipy.stats as scipy_stats
+from scipy.stats import gaussian_kde
+
+# Panels of the headless export figure (2 rows x 3 columns)
+_EXPORT_PANELS = ['hist', 'dot', 'qq', 'pp', 'prob', 'box']
+
+# Seaborn style of the histograms and box plots, renamed "seaborn-v0_8" in matplotlib 3.6 (the old name now raises OSError)
+SEABORN_STYLE = 'seaborn-v0_8' if 'seaborn-v0_8' in plt.style.available else 'seaborn'
+
+# Number of observations above which ``large_data='auto'`` switches to the binned rendering
+LARGE_DATA_THRESHOLD = 100000
+# Maximum number of dots drawn by the binned dot plot (every dot then stands for several observations)
+MAX_DOTS = 2000
+
+def _binned_kde(values,lower,upper,n_grid=4096):
+    """
+    Description: This function estimates the Gaussian KDE (Scott's bandwidth, like ``plot.density``) on a regular grid.
+                 The observations are linearly binned on the grid and convolved with the sampled kernel by FFT, so the
+                 cost is O(n + n_grid log n_grid) instead of the O(n x n_grid) of ``gaussian_kde``.
+
+    Input Parameters: It accepts below inputs:
+        1. values : 1-D array of observations (without NaN's)
+        2. lower, upper : Range of the grid
+        3. n_grid : Number of grid points (by default 4096)
+
+    Return: Tuple (grid, density)
+    """
+    grid = np.linspace(lower,upper,n_grid)
+    delta = grid[1] - grid[0]
+    bandwidth = values.std(ddof=1) * values.size ** (-1. / 5)
+    # Linear binning, every observation splits its weight between its two neighbouring grid points
+    pos = (values - lower) / delta
+    left = np.clip(np.floor(pos).astype(np.int64),0,n_grid - 2)
+    frac = pos - left
+    weights = np.bincount(left,weights=1 - frac,minlength=n_grid) + np.bincount(left + 1,weights=frac,minlength=n_grid)
+
+    n_kernel = int(min(np.ceil(5 * bandwidth / delta),n_grid - 1))
+    kernel = np.exp(-0.5 * (np.arange(-n_kernel,n_kernel + 1) * delta / bandwidth)**2)
+    kernel /= kernel.sum() * delta
+    n_fft = 1 << int(np.ceil(np.log2(n_grid + 2 * n_kernel + 1)))
+    density = np.fft.irfft(np.fft.rfft(weights,n_fft) * np.fft.rfft(kernel,n_fft),n_fft)[n_kernel:n_kernel + n_grid]
+    return grid, np.clip(density,0.,None) / values.size
+
+def _column_summary(values,dot_scale,n_quantiles=1000,n_bins=10):
+    """
+    Description: This function reduces one column to the fixed-size summaries drawn by the large-data mode, so the
+                 rendering cost does not depend on the number of observations:
+                    - histogram counts over ``n_bins`` bins
+                    - binned FFT KDE (see ``_binned_kde``)
+                    - ``n_quantiles`` order statistics at the plotting positions i/(n_quantiles+1) used by ``ProbPlot``,
+                      selected with ``np.partition`` (no full sort)
+                    - box-plot statistics (quartiles, whiskers at 1.5 IQR, outliers among the selected quantiles and the extremes)
+                    - dot plot bin counts
+
+    Input Parameters: It accepts below inputs:
+        1. values : 1-D array of observations (NaN's are dropped)
+        2. dot_scale : Bin width of the dot plot
+        3. n_quantiles : Number of quantiles used by the QQ/PP/probability plots (by default 1000)
+        4. n_bins : Number of histogram bins (by default 10 as in ``plot(kind='hist')``)
+
+    Return: Dictionary of summaries
+    """
+    values = np.asarray(values,dtype=float)
+    values = values[~np.isnan(values)]
+    n_obs = values.size
+    val_min, val_max = values.min(), values.max()
+    summary = {'n_obs': n_obs}
+    summary['hist'] = np.histogram(values,bins=n_bins)
+
+    sample_range = val_max - val_min
+    if sample_range > 0:
+        summary['kde'] = _binned_kde(values,val_min - 0.5 * sample_range,val_max + 0.5 * sample_range)
+
+    # Ranks of the order statistics matching the plotting positions of n_quantiles points
+    n_quant = min(n_quantiles,n_obs)
+    ranks = np.round(np.arange(1,n_quant + 1) * (n_obs + 1.) / (n_quant + 1)).astype(np.int64) - 1
+    ranks = np.clip(ranks,0,n_obs - 1)
+    quartile_pos = np.array([0.25,0.5,0.75]) * (n_obs - 1)
+    quartile_ranks = np.r_[np.floor(quartile_pos),np.ceil(quartile_pos)].astype(np.int64)
+    kth = np.unique(np.r_[ranks,quartile_ranks])
+    partitioned = np.partition(values,kth)
+    summary['quantiles'] = partitioned[ranks]
+
+    floor_vals = partitioned[quartile_ranks[:3]]
+    ceil_vals = partitioned[quartile_ranks[3:]]
+    q1, med, q3 = floor_vals + (quartile_pos - np.floor(quartile_pos)) * (ceil_vals - floor_vals)
+    iqr = q3 - q1
+    whislo = values[values >= q1 - 1.5 * iqr].min()
+    whishi = values[values <= q3 + 1.5 * iqr].max()
+    candidates = np.r_[val_min,summary['quantiles'],val_max]
+    fliers = np.unique(candidates[(candidates < whislo) | (candidates > whishi)])
+    summary['box'] = {'med': med, 'q1': q1, 'q3': q3, 'whislo': whislo, 'whishi': whishi, 'fliers': fliers, 'label': ''}
+
+    dot_codes = np.round(values / dot_scale)
+    code_min = dot_codes.min()
+    if dot_codes.max() - code_min < 1e6:
+        dot_counts = np.bincount((dot_codes - code_min).astype(np.int64))
+        dot_bins = np.flatnonzero(dot_counts)
+        summary['dot'] = ((dot_bins + code_min) * dot_scale,dot_counts[dot_bins])
+    else:
+        dot_bins, dot_counts = np.unique(dot_codes,return_counts=True)
+        summary['dot'] = (dot_bins * dot_scale,dot_counts)
+    return summary
+
+def _new_export_figure(figstyle):
+    """
+    Description: This function creates the figure and the 2x3 axes grid reused for every column of the headless export.
+                 The figure is attached to an Agg canvas directly (no pyplot), so no GUI backend is needed and
+                 pyplot never keeps a reference to it.
+    """
+    fig = Figure(figsize=(figstyle[0] * 3,figstyle[1] * 2))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(nrows=2,ncols=3).ravel()
+    return fig, dict(zip(_EXPORT_PANELS,axes))
+
+def _dot_plot_ax(ax,dot_bins,dot_counts,max_dots=None):
+    """
+    Description: This function draws a dot plot (stacked dots per bin) on the given axes from the bin counts.
+                 It is the headless stand-in of ``stemgraphic.stem_dot`` which prints a text plot. When ``max_dots`` is
+                 given and exceeded, every dot stands for several observations.
+
+    Return: Number of observations per dot
+    """
+    unit = 1
+    if max_dots is not None and dot_counts.sum() > max_dots:
+        unit = int(np.ceil(dot_counts.sum() / float(max_dots)))
+    n_dots = -(-dot_counts // unit)
+    starts = np.cumsum(n_dots) - n_dots
+    # Height of every dot inside its bin
+    heights = np.arange(n_dots.sum()) - np.repeat(starts,n_dots)
+    ax.scatter(np.repeat(dot_bins,n_dots),heights + 1,s=12,color='steelblue')
+    return unit
+
+def _render_column(fig,axes,col,values,dot_scale,label_font_style,title_font_style,large_data=False,n_quantiles=1000):
+    """
+    Description: This function draws every pre-ANOVA plot of one column on the reused axes grid. With ``large_data``
+                 the plots are drawn from the fixed-size summaries of ``_column_summary``.
+    """
+    for ax in axes.values():
+        ax.clear()
+    values = values[~np.isnan(values)]
+    if large_data == 'auto':
+        large_data = values.size > LARGE_DATA_THRESHOLD
+
+    # Data distribution plot (histogram + KDE)
+    ax = axes['hist']
+    if large_data:
+        summary = _column_summary(values,dot_scale,n_quantiles=n_quantiles)
+        counts, edges = summary['hist']
+        ax.hist(edges[:-1],bins=edges,weights=counts,density=True,color='coral')
+        if 'kde' in summary:
+            ax.plot(*summary['kde'],color='black')
+    else:
+        ax.hist(values,density=True,color='coral')
+        if np.unique(values).size > 1:
+            grid = np.linspace(values.min(),values.max(),256)
+            ax.plot(grid,gaussian_kde(values)(grid),color='black')
+    ax.set_xlabel(col,fontdict=label_font_style)
+    ax.set_ylabel('Freq',fontdict=label_font_style)
+    ax.set_title('Data Distribution of {}'.format(col),fontdict=title_font_style)
+
+    # Dot plot
+    if large_data:
+        unit = _dot_plot_ax(axes['dot'],*summary['dot'],max_dots=MAX_DOTS)
+        if unit > 1:
+            axes['dot'].set_ylabel('Dots ({} obs. each)'.format(unit),fontdict=label_font_style)
+    else:
+        dot_bins, dot_counts = np.unique(np.round(values / dot_scale) * dot_scale,return_counts=True)
+        _dot_plot_ax(axes['dot'],dot_bins,dot_counts)
+    axes['dot'].set_title('Dot Plot of {}'.format(col),fontdict=title_font_style)
+
+    # Quantile-quantile, percentile-percentile and probability plots (statsmodels is only loaded for them)
+    from statsmodels.graphics.gofplots import ProbPlot
+    prob_plt = ProbPlot(summary['quantiles'] if large_data else values)
+    prob_plt.qqplot(line='r',ax=axes['qq'])
+    prob_plt.ppplot(line='r',ax=axes['pp'])
+    prob_plt.probplot(line='r',ax=axes['prob'])
+    for name, ylabel, title in [('qq','Quantiles','QQ Plot'),('pp','Probabilities','PP Plot'),('prob','Quantiles','Probability Plot')]:
+        axes[name].set_xlabel(col,fontdict=label_font_style)
+        axes[name].set_ylabel(ylabel,fontdict=label_font_style)
+        axes[name].set_title('{} of {}'.format(title,col),fontdict=title_font_style)
+
+    # Box-whisker plot
+    if large_data:
+        axes['box'].bxp([summary['box']])
+    else:
+        axes['box'].boxplot(values)
+    axes['box'].set_xlabel(col,fontdict=label_font_style)
+    axes['box'].set_ylabel('Freq',fontdict=label_font_style)
+    axes['box'].set_title('Box-Plot of {}'.format(col),fontdict=title_font_style)
+    fig.tight_layout()
+    return fig
+
+def _export_file_name(out_dir,col,fmt):
+    """
+    Description: This function returns the output file of one column (path separators in the column name are replaced).
+    """
+    safe_col = str(col).replace(os.sep,'_').replace('/','_')
+    return os.path.join(out_dir,'{}.{}'.format(safe_col,fmt))
+
+def _export_columns(task):
+    """
+    Description: This function is the task of one export worker. It renders its share of columns on one reused figure
+                 and saves every column as a PNG/SVG file.
+
+    Return: List of written files
+    """
+    columns, out_dir, fmt, dpi, figstyle, dot_scale, label_font_style, title_font_style, large_data, n_quantiles = task
+    fig, axes = _new_export_figure(figstyle)
+    written = []
+    try:
+        for col, values in columns:
+            _render_column(fig,axes,col,values,dot_scale,label_font_style,title_font_style,large_data,n_quantiles)
+            path = _export_file_name(out_dir,col,fmt)
+            fig.savefig(path,format=fmt,dpi=dpi)
+            written.append(path)
+    finally:
+        fig.clf()
+    return written
 
 class pre_anova_vis:
     """
     Description: This class consists of different functions for plotting the distribution of data before running the ANOVA.
     """
-    def __init__(self,data,cols,dot_scale=0.1):
+    def __init__(self,data,cols,dot_scale=0.1,large_data=False,n_quantiles=1000):
         """
         Description: This function is created for initializing the variables and it will be called every time when a class object is instantiated.  
         
@@ -21,6 +243,13 @@ class pre_anova_vis:
                         List of Groups or Treatments or columns for which distributions to be plotted
             3. ``dot_scale`` : Int or Float
                         Value of scale used in Dot plot. By default scale is 0.1
+            4. ``large_data`` : Bool or "auto"
+                        Large-data mode. When True the histogram/KDE, QQ/PP/probability and box plots are drawn from
+                        fixed-size summaries (histogram bins, binned FFT KDE, ``n_quantiles`` order statistics), so the
+                        rendering time does not depend on the number of observations. "auto" switches it on for the
+                        columns having more than ``LARGE_DATA_THRESHOLD`` observations. By default False.
+            5. ``n_quantiles`` : Int
+                        Number of quantiles used by the QQ/PP/probability plots in the large-data mode. By default 1000
         
         Child-Functions: 
             ``plot_dist`` : This function is created for plotting the histogram of every treatment or column.
@@ -28,6 +257,7 @@ class pre_anova_vis:
             ``qq_plot``   : This function is created for creating the qunatile-quantile plot of every treatment or column.
             ``plot_box``  : This function is created for plotting the box-whisker plot of every treatment or column.
             ``all_plots`` : This function is created for creating all the plots(histogram, qq/pp/prob plots, Dot and Box plots) in one go. 
+            ``export_plots`` : This function renders all the plots of every column to PNG/SVG files or one PDF without a display.
         """
         self.data = data
         self.cols = cols
@@ -37,7 +267,26 @@ class pre_anova_vis:
         self.title_font_style = {'size':19, 'color': 'purple', 'family': 'calibri'}
         # Figure length and width
         self.figstyle = (5,5)
+        self.large_data = large_data
+        self.n_quantiles = n_quantiles
+        # Large-data summaries per column, computed once
+        self._summaries = {}
         return None
+
+    def _summary(self,col):
+        """
+        Description: This function returns the large-data summary of a column (see ``_column_summary``), or None when the
+                     column is rendered from its raw observations.
+        """
+        large_data = self.large_data
+        if large_data == 'auto':
+            large_data = self.data[col].count() > LARGE_DATA_THRESHOLD
+        if not large_data:
+            return None
+        if col not in self._summaries:
+            self._summaries[col] = _column_summary(self.data[col].to_numpy(dtype=float),self.dot_scale,
+                                                   n_quantiles=self.n_quantiles)
+        return self._summaries[col]
     
     def plot_dist(self):
         """
@@ -47,9 +296,17 @@ class pre_anova_vis:
         # Below is the data distribution plot code
         print("\n")
         for col in self.cols:
-            with plt.style.context('seaborn'):
-                self.data[col].plot(kind='hist',histtype='bar',density=True,color='coral',figsize=self.figstyle)
-                self.data[col].plot.density(color='black')
+            with plt.style.context(SEABORN_STYLE):
+                summary = self._summary(col)
+                if summary is None:
+                    self.data[col].plot(kind='hist',histtype='bar',density=True,color='coral',figsize=self.figstyle)
+                    self.data[col].plot.density(color='black')
+                else:
+                    counts, edges = summary['hist']
+                    plt.figure(figsize=self.figstyle)
+                    plt.hist(edges[:-1],bins=edges,weights=counts,histtype='bar',density=True,color='coral')
+                    if 'kde' in summary:
+                        plt.plot(*summary['kde'],color='black')
                 plt.grid('ggplot2')
                 plt.xlabel(col,fontdict=self.label_font_style)
                 plt.ylabel('Freq',fontdict=self.label_font_style)
@@ -63,6 +320,7 @@ class pre_anova_vis:
         Return: Plot the DOT Plot.
         """
         # Below is the Dot plot code
+        import stemgraphic as stem
         for col in self.cols:
             print('\n###### Dot Plot of {} ######'.format(col))
             stem.stem_dot(self.data[col],flip_axes=True,asc=True,scale=self.dot_scale)
@@ -73,10 +331,15 @@ class pre_anova_vis:
         Description: This function is created for creating the qunatile-quantile plot of every treatment or column.
         Return: Plot the qq-plot.
         """
+        from statsmodels.graphics.gofplots import ProbPlot
         print("\n")
         with plt.style.context('classic'):
             for col in self.cols:
-                prob_plt = sm_api.ProbPlot(self.data[~self.data[col].isna()][col])
+                summary = self._summary(col)
+                if summary is None:
+                    prob_plt = ProbPlot(self.data[~self.data[col].isna()][col])
+                else:
+                    prob_plt = ProbPlot(summary['quantiles'])
                 # Below is the quantile-quantile plot code
                 prob_plt.qqplot(line='r')
                 plt.xlabel(col,fontdict=self.label_font_style)
@@ -105,9 +368,14 @@ class pre_anova_vis:
         """
         # Below is the box-plot creation code
         print("\n")
-        with plt.style.context('seaborn'):
+        with plt.style.context(SEABORN_STYLE):
             for col in self.cols:
-                self.data[col].plot(kind='box',style='inferno',figsize=self.figstyle,label='')
+                summary = self._summary(col)
+                if summary is None:
+                    self.data[col].plot(kind='box',style='inferno',figsize=self.figstyle,label='')
+                else:
+                    plt.figure(figsize=self.figstyle)
+                    plt.gca().bxp([summary['box']])
                 plt.xlabel(col,fontdict=self.label_font_style)
                 plt.ylabel('Freq',fontdict=self.label_font_style)
                 plt.title('Box-Plot of {}'.format(col),fontdict=self.title_font_style)
@@ -123,79 +391,210 @@ class pre_anova_vis:
         self.qq_plot()
         self.plot_box()
         return None
+
+    def export_plots(self,out_dir,fmt='png',n_jobs=1,dpi=100,pdf_name='pre_anova_plots.pdf'):
+        """
+        Description: This function is the headless version of ``all_plots``. Every column's histogram/KDE, dot, QQ, PP,
+                     probability and box plots are drawn on one 2x3 figure with the Agg canvas and written to disk,
+                     without ``plt.show()`` or an interactive backend. One figure/axes grid is reused for all the columns
+                     of a worker and released at the end, so memory does not grow with the number of columns.
+
+        Input: It accepts below input parameters:
+            1. ``out_dir`` : Directory in which the files are written (created if needed)
+            2. ``fmt`` : Output format. It expects below values:
+                        a) "png" or "svg" : One file per column, named after the column (default "png")
+                        b) "pdf" : One multi-page PDF (``pdf_name``) with one page per column. It is written by a single
+                                   process, ``n_jobs`` is ignored.
+            3. ``n_jobs`` : Number of worker processes the columns are spread across (by default 1, -1 means all the CPUs)
+            4. ``dpi`` : Resolution of the raster output (by default 100)
+            5. ``pdf_name`` : File name of the multi-page PDF
+
+        Return: List of written files
+        """
+        if fmt not in ['png', 'svg', 'pdf']:
+            raise ValueError('invalid fmt')
+        os.makedirs(out_dir,exist_ok=True)
+        columns = [(col,np.asarray(self.data[col],dtype=float)) for col in self.cols]
+        styles = (self.figstyle,self.dot_scale,self.label_font_style,self.title_font_style,self.large_data,self.n_quantiles)
+
+        if fmt == 'pdf':
+            path = os.path.join(out_dir,pdf_name)
+            fig, axes = _new_export_figure(self.figstyle)
+            try:
+                with PdfPages(path) as pdf:
+                    for col, values in columns:
+                        _render_column(fig,axes,col,values,self.dot_scale,self.label_font_style,self.title_font_style,
+                                       self.large_data,self.n_quantiles)
+                        pdf.savefig(fig)
+            finally:
+                fig.clf()
+            return [path]
+
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = max(1,min(int(n_jobs),len(columns)))
+        if n_jobs == 1:
+            return _export_columns((columns,out_dir,fmt,dpi) + styles)
+        # Round-robin split so every worker gets a similar share of columns
+        tasks = [(columns[i::n_jobs],out_dir,fmt,dpi) + styles for i in range(n_jobs)]
+        written = []
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            for files in executor.map(_export_columns,tasks):
+                written.extend(files)
+        return written
         
+def marginal_means(df,cols=None,value_col=None,col_factor=None,row_factor=None,loc=0.95):
+    """
+    Description: This function calculates the column (treatment) and row (block) marginal means with their confidence
+                 intervals from one aggregation of the cells, whatever the number of levels.
+
+    Input parameter:
+        1. df : DataFrame having treatment or group data. It can be either
+                    a) wide : one column per treatment and one row per block (like ``ANOVA_questions/ch08_all``), or
+                    b) long : one row per observation with ``value_col``, ``col_factor`` and ``row_factor`` columns
+        2. cols : Treatment columns of wide data (by default every column)
+        3. value_col : Observation column of long data
+        4. col_factor : Treatment (column) factor of long data
+        5. row_factor : Block (row) factor of long data (optional)
+        6. loc : Level of confidence of the intervals (by default 0.95)
+
+    Output: Tuple (column means, row means, grand mean). Both means are DataFrames indexed by level with count, mean,
+            std_err, lower and upper columns (row means is None for long data without ``row_factor``).
+    """
+    if value_col is None:
+        values = np.asarray(df[list(df.columns) if cols is None else list(cols)],dtype=float)
+        col_levels = pd.Index(df.columns if cols is None else cols)
+        row_levels = df.index
+        # Every cell of wide data holds one observation
+        present = ~np.isnan(values)
+        cell_count = present.astype(float)
+        cell_mean = np.where(present,values,0.)
+        cell_m2 = np.zeros_like(cell_mean)
+    else:
+        keys = [col_factor] if row_factor is None else [col_factor,row_factor]
+        # Single groupby over the (treatment, block) cells, with centered sums of squares (M2) per cell
+        grouped = df[keys].assign(value=df[value_col].astype(float)).groupby(keys,sort=True)['value']
+        cells = pd.DataFrame({'count': grouped.count(), 'mean': grouped.mean(), 'm2': grouped.var(ddof=0)})
+        cells['m2'] *= cells['count']
+        cells = cells.fillna(0.)
+        if row_factor is None:
+            # One row of cells, one column per treatment level
+            col_levels, row_levels = cells.index, None
+            cell_count, cell_mean, cell_m2 = [cells[stat].to_numpy(dtype=float)[None,:] for stat in ['count','mean','m2']]
+        else:
+            col_levels, row_levels = cells.index.levels
+            grid = pd.MultiIndex.from_product([col_levels,row_levels])
+            cells = cells.reindex(grid,fill_value=0.)
+            shape = (len(col_levels),len(row_levels))
+            cell_count, cell_mean, cell_m2 = [cells[stat].to_numpy(dtype=float).reshape(shape).T
+                                              for stat in ['count','mean','m2']]
+
+    def _margin(axis,levels):
+        # Cells merged with the parallel (Chan) update: M2 = sum of the cell M2 + sum n_i (mean_i - mean)**2
+        count = cell_count.sum(axis=axis)
+        with np.errstate(invalid='ignore',divide='ignore'):
+            mean = (cell_count * cell_mean).sum(axis=axis) / count
+            dev = cell_mean - np.expand_dims(mean,axis)
+            m2 = cell_m2.sum(axis=axis) + (cell_count * np.where(cell_count > 0,dev,0.)**2).sum(axis=axis)
+            var = m2 / (count - 1)
+            std_err = np.sqrt(np.clip(var,0.,None) / count)
+            margin = scipy_stats.t.ppf(1 - (1 - loc) / 2,count - 1) * std_err
+        return pd.DataFrame({'count': count, 'mean': mean, 'std_err': std_err, 'lower': mean - margin,
+                             'upper': mean + margin},index=levels)
+
+    grand_mean = (cell_count * cell_mean).sum() / cell_count.sum()
+    col_means = _margin(0,col_levels)
+    row_means = None if row_levels is None else _margin(1,row_levels)
+    return col_means, row_means, grand_mean
+
+def _marginal_series_plot(stats,grand_mean,marker,color,label,title,band=True,ax=None):
+    """
+    Description: This function draws one series of marginal means, one scatter call for the means and one ``vlines`` call
+                 for the confidence bands, around the grand mean line.
+    """
+    if ax is None:
+        ax = plt.figure(figsize=(10,7)).gca()
+    positions = np.arange(len(stats))
+    ax.axhline(grand_mean,linestyle='--',color='black',label='Grand Mean')
+    if band:
+        ax.vlines(positions,stats['lower'],stats['upper'],color=color,linewidth=3,alpha=0.4,label='{} CI'.format(label))
+    ax.scatter(positions,stats['mean'],marker=marker,s=144,color=color,label='{} mean'.format(label),zorder=3)
+    labels = [str(level) for level in stats.index]
+    if len(labels) <= 30:
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels,rotation=25)
+    else:
+        # Only a readable subset of the level names for large designs
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=20,integer=True))
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda pos, _: labels[int(pos)] if 0 <= int(pos) < len(labels) else ''))
+        ax.tick_params(axis='x',labelrotation=25)
+    ax.set_title(title,fontdict={'size':22, 'family':'calibri', 'color':'coral', 'style': 'italic'})
+    ax.legend(scatterpoints=1)
+    return ax
+
+def marginal_means_plot(df,cols=None,grand_mean=None,rows=False,value_col=None,col_factor=None,row_factor=None,
+                        loc=0.95,band=True):
+    """
+    Description: This function is created for plotting the marginal mean graphs of a dataset having any number of
+                 groups/columns and blocks/rows, with the confidence band of every mean.
+
+    Input parameter:
+        1. df : DataFrame having treatment or group data, wide or long (see ``marginal_means``)
+        2. cols : Treatment columns of wide data (by default every column)
+        3. grand_mean : Overall mean drawn as the reference line (by default the mean of all the observations)
+        4. rows : If True, the marginal mean graph of the blocks/rows is plotted too
+        5. value_col, col_factor, row_factor : Columns of long data (see ``marginal_means``)
+        6. loc : Level of confidence of the bands (by default 0.95)
+        7. band : If False, the confidence bands are not drawn
+
+    Output: Generate the Marginal Mean Graphs and return the column and row marginal means (see ``marginal_means``)
+    """
+    col_means, row_means, overall_mean = marginal_means(df,cols=cols,value_col=value_col,col_factor=col_factor,
+                                                        row_factor=row_factor,loc=loc)
+    grand_mean = overall_mean if grand_mean is None else grand_mean
+    with plt.style.context("classic"):
+        _marginal_series_plot(col_means,grand_mean,'*','red','Grp','Marginal Mean Graph',band=band)
+        if rows and row_means is not None:
+            _marginal_series_plot(row_means,grand_mean,'>','orange','Row/Block','Marginal Mean Graph of Blocks or Rows',band=band)
+    return col_means, row_means
+
 def marginal_row_mean_plot(df,grand_mean,row1=False,row2=False,row3=False,row4=False,row5=False,row6=False):
     """
-    Description: This function is created for plotting the marginal mean graph of a dataset having at most 6 groups or columns.
-    
+    Description: This function is created for plotting the marginal mean graph of the blocks/rows. It is kept for the
+                 existing notebooks, ``marginal_means_plot`` handles any number of rows.
+
     Input parameter:
         1. df : DataFrame having treatment or group data
         2. grand_mean : Overall mean of groups or str
-        3. row1 : Row or Block 1 or str
-        4. row2 : Row or Block 2 or str
-        5. row3 : Row or Block 3 or str
-        6. row4 : Row or Block 4 or str
-        7. row5 : Row or Block 5 or str
-        8. row6 : Row or Block 6 or str
-    
+        3. row1 .. row6 : Any value other than False selects the row/block 1 .. 6
+
     Output: Generate the Marginal Mean Graph
-    
-    Work-in-progress :: These two marginal mean plot functions to be combined in one as a generic function.
     """
-    plt.figure(figsize=(10,7))
+    selected = [pos for pos, row in enumerate([row1,row2,row3,row4,row5,row6]) if row is not False]
+    _, row_means, _ = marginal_means(df.iloc[selected])
     with plt.style.context("classic"):
-        plt.axhline(grand_mean,linestyle='--',color='black',label='Grand Mean')
-        if row1 != False:
-            plt.plot(df[row1][0],marker='>',ls='',ms=12,color='pink',label='Row/Block 1 mean')
-        if row2 != False:
-            plt.plot(df[row2][1],marker='>',ls='',ms=12,color='gray',label='Row/Block 2 mean')
-        if row3 != False:
-            plt.plot(df[row3][2],marker='>',ls='',ms=12,color='yellow',label='Row/Block 3 mean')
-        if row4 != False:
-            plt.plot(df[row4][3],marker='>',ls='',ms=12,color='skyblue',label='Row/Block 4 mean')
-        if row5 != False:
-            plt.plot(df[row5][4],marker='>',ls='',ms=12,color='lightgray',label='Row/Block 5 mean')
-        if row6 != False:
-            plt.plot(df[row6][5],marker='>',ls='',ms=12,color='orange',label='Row/Block 6 mean')
-        plt.xticks(rotation=25)
-        plt.title('Marginal Mean Graph of Blocks or Rows',fontdict={'size':20, 'family':'calibri', 'color':'coral', 'style': 'italic'})
-    plt.legend()
+        _marginal_series_plot(row_means,grand_mean,'>','orange','Row/Block','Marginal Mean Graph of Blocks or Rows')
     return None
 
 def marginal_mean_plot(df,grand_mean,grp1,grp2,grp3=False,grp4=False,grp5=False,grp6=False,
                        row_graph_flg=False,row1=False,row2=False,row3=False,row4=False,row5=False,row6=False):
     """
-    Description: This function is created for plotting the marginal mean graph of a dataset having at most 6 groups/columns and blocks/rows.
-    
+    Description: This function is created for plotting the marginal mean graph of a dataset having at most 6 groups/columns
+                 and blocks/rows. It is kept for the existing notebooks, ``marginal_means_plot`` handles any number of levels.
+
     Input parameter:
         1. df : DataFrame having treatment or group data
         2. grand_mean : Overall mean of groups or str
-        3. grp1 : Column or Treatment 1 or str
-        4. grp2 : Column or Treatment 2 or str
-        5. grp3 : Column or Treatment 3 or str
-        6. grp4 : Column or Treatment 4 or str
-        7. grp5 : Column or Treatment 5 or str
-        8. grp6 : Column or Treatment 6 or str
-    
+        3. grp1 .. grp6 : Column or Treatment 1 .. 6 or str
+        4. row_graph_flg : If True, the marginal mean graph of the rows selected by row1 .. row6 is plotted too
+
     Output: Generate the Marginal Mean Graphs
     """
-    plt.figure(figsize=(10,7))
+    groups = [grp for grp in [grp1,grp2,grp3,grp4,grp5,grp6] if grp is not False]
+    col_means, _, _ = marginal_means(df,cols=groups)
     with plt.style.context("classic"):
-        plt.axhline(grand_mean,linestyle='--',color='black',label='Grand Mean')
-        plt.plot(np.mean(df[grp1]),marker='*',ls='',ms=12,color='red',label='Grp({}) mean'.format(grp1))
-        plt.plot(np.mean(df[grp2]),marker='*',ls='',ms=12,color='green',label='Grp({}) mean'.format(grp2))
-        if grp3 != False:
-            plt.plot(np.mean(df[grp3]),marker='*',ls='',ms=12,color='blue',label='Grp({}) mean'.format(grp3))
-        if grp4 != False:
-            plt.plot(np.mean(df[grp4]),marker='*',ls='',ms=12,color='brown',label='Grp({}) mean'.format(grp4))
-        if grp5 != False:
-            plt.plot(np.mean(df[grp5]),marker='*',ls='',ms=12,color='purple',label='Grp({}) mean'.format(grp5))
-        if grp6 != False:
-            plt.plot(np.mean(df[grp6]),marker='*',ls='',ms=12,color='coral',label='Grp({}) mean'.format(grp6))
-        plt.xticks(rotation=25)
-        plt.title('Marginal Mean Graph',fontdict={'size':22, 'family':'calibri', 'color':'coral', 'style': 'italic'})
-    plt.legend()
-    
+        _marginal_series_plot(col_means,grand_mean,'*','red','Grp','Marginal Mean Graph')
+
     if row_graph_flg!=False:
-        marginal_row_mean_plot(df=df,grand_mean=grand_mean,row1=row1,row2=row2,row3=row3,row4=row4,row5=row5,row6=row6)
-    return None
\ No newline at end of file
+        marginal_row_mean_plot(df=df[groups],grand_mean=grand_mean,row1=row1,row2=row2,row3=row3,row4=row4,row5=row5,row6=row6)
+    return None
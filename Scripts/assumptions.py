@@ -0,0 +1,398 @@
+# Importing Packages
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import scipy.special as special
+from . import dist_cache
+
+# Tests run by ``normality_tests`` and ``homogeneity_tests``
+NORMALITY_TESTS = ['shapiro', 'dagostino', 'anderson']
+HOMOGENEITY_TESTS = ['levene', 'brown_forsythe', 'bartlett']
+
+# Coefficients of Royston's (1995) algorithm AS R94, as in ``scipy.stats.shapiro``
+_SW_C1 = [0., 0.221157, -0.147981, -2.071190, 4.434685, -2.706056]
+_SW_C2 = [0., 0.042981, -0.293762, -1.752461, 5.682633, -3.582633]
+_SW_C3 = [0.5440, -0.39978, 0.025054, -6.714e-4]
+_SW_C4 = [1.3822, -0.77857, 0.062767, -0.0020322]
+_SW_C5 = [-1.5861, -0.31082, -0.083751, 0.0038915]
+_SW_C6 = [-0.4803, -0.082676, 0.0030302]
+_SW_G = [-2.273, 0.459]
+
+def _poly(coefs,x):
+    """
+    Description: This function evaluates the polynomial coefs[0] + coefs[1] * x + ... (Horner's rule).
+    """
+    result = np.zeros_like(np.asarray(x,dtype=float)) + coefs[-1]
+    for coef in coefs[-2::-1]:
+        result = result * x + coef
+    return result
+
+def _shapiro_coefficients(n_obs):
+    """
+    Description: This function returns the antisymmetric Shapiro-Wilk coefficients of a sample of ``n_obs`` (>= 3) sorted
+                 observations (Royston's approximation).
+    """
+    half = n_obs // 2
+    # Expected normal order statistics of the upper half, largest first
+    m = -special.ndtri((np.arange(1,half + 1) - 0.375) / (n_obs + 0.25))
+    summ2 = 2 * np.sum(m**2)
+    ssumm2 = np.sqrt(summ2)
+    rsn = 1 / np.sqrt(n_obs)
+    a = np.empty(half)
+    a1 = _poly(_SW_C1,rsn) + m[0] / ssumm2
+    if n_obs > 5:
+        a2 = m[1] / ssumm2 + _poly(_SW_C2,rsn)
+        fac = np.sqrt((summ2 - 2 * m[0]**2 - 2 * m[1]**2) / (1 - 2 * a1**2 - 2 * a2**2))
+        a[1] = a2
+        a[2:] = m[2:] / fac
+    else:
+        fac = np.sqrt((summ2 - 2 * m[0]**2) / (1 - 2 * a1**2))
+        a[1:] = m[1:] / fac
+    a[0] = np.sqrt(0.5) if n_obs == 3 else a1
+    coefs = np.zeros(n_obs)
+    coefs[:half] = -a
+    coefs[n_obs - half:] = a[::-1]
+    return coefs
+
+def _shapiro_pvalue(w_stat,counts):
+    """
+    Description: This function calculates the p-values of Shapiro-Wilk statistics with Royston's normalizing transform.
+    """
+    n = counts.astype(float)
+    p_value = np.full(w_stat.shape,np.nan)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        y = np.log1p(-w_stat)
+        small = (counts > 3) & (counts <= 11)
+        gamma = _poly(_SW_G,n)
+        # Below 12 observations log(1 - W) is transformed again
+        y_small = -np.log(gamma - y)
+        mean = np.where(small,_poly(_SW_C3,n),_poly(_SW_C5,np.log(n)))
+        std = np.where(small,np.exp(_poly(_SW_C4,n)),np.exp(_poly(_SW_C6,np.log(n))))
+        z = (np.where(small,y_small,y) - mean) / std
+        large_pv = dist_cache.sf('norm',z)
+        p_value = np.where(counts > 3,large_pv,p_value)
+        p_value = np.where(small & (y >= gamma),1e-19,p_value)
+        exact = (6 / np.pi) * (np.arcsin(np.sqrt(w_stat)) - np.pi / 3)
+        p_value = np.where(counts == 3,np.maximum(exact,0.),p_value)
+    return p_value
+
+def _anderson_pvalue(a2_stat,counts):
+    """
+    Description: This function calculates the p-values of Anderson-Darling statistics (normal with estimated mean and
+                 variance) from the D'Agostino & Stephens (1986) approximation, as ``statsmodels``' ``normal_ad``.
+    """
+    a2 = a2_stat * (1 + 0.75 / counts + 2.25 / counts**2)
+    with np.errstate(over='ignore',invalid='ignore'):
+        p_value = np.where(a2 >= 0.6,np.exp(1.2937 - 5.709 * a2 + 0.0186 * a2**2),
+                  np.where(a2 >= 0.34,np.exp(0.9177 - 4.279 * a2 - 1.38 * a2**2),
+                  np.where(a2 >= 0.2,1 - np.exp(-8.318 + 42.796 * a2 - 59.938 * a2**2),
+                           1 - np.exp(-13.436 + 101.14 * a2 - 223.73 * a2**2))))
+    return np.where(np.isnan(a2),np.nan,p_value)
+
+def _dagostino(counts,m2,m3,m4):
+    """
+    Description: This function calculates D'Agostino and Pearson's K2 statistic (``scipy.stats.normaltest``) from the
+                 biased central moments of every group. Groups with fewer than 8 observations give NaN.
+    """
+    n = np.where(counts >= 8,counts,np.nan).astype(float)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        # Skewness test
+        b2 = m3 / m2**1.5
+        y = b2 * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+        beta2 = (3.0 * (n**2 + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9)))
+        w2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(w2))
+        alpha = np.sqrt(2.0 / (w2 - 1))
+        y = np.where(y == 0,1.,y)
+        z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha)**2 + 1))
+
+        # Kurtosis test
+        b2 = m4 / m2**2
+        mean_b2 = 3.0 * (n - 1) / (n + 1)
+        var_b2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.) * (n + 3) * (n + 5))
+        x = (b2 - mean_b2) / var_b2**0.5
+        sqrtbeta1 = 6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9)) * ((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3)))**0.5
+        a_coef = 6.0 + 8.0 / sqrtbeta1 * (2.0 / sqrtbeta1 + (1 + 4.0 / (sqrtbeta1**2))**0.5)
+        term1 = 1 - 2 / (9.0 * a_coef)
+        denom = 1 + x * (2 / (a_coef - 4.0))**0.5
+        term2 = np.sign(denom) * np.where(denom == 0.0,np.nan,((1 - 2.0 / a_coef) / np.abs(denom))**(1 / 3))
+        z_kurt = (term1 - term2) / (2 / (9.0 * a_coef))**0.5
+    k2 = z_skew**2 + z_kurt**2
+    return k2, dist_cache.sf('chi2',k2,2)
+
+def _grouped_pass(values,codes,n_groups):
+    """
+    Description: This function sorts one response by (group, value) once and derives every grouped statistic the tests
+                 need -- counts, means, medians, biased central moments and the rank of every observation in its group.
+
+    Return: Dictionary of the grouped arrays and of the sorted observations
+    """
+    keep = ~np.isnan(values) & (codes >= 0)
+    values, codes = values[keep], codes[keep]
+    order = np.lexsort((values,codes))
+    values, codes = values[order], codes[order]
+    counts = np.bincount(codes,minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    with np.errstate(invalid='ignore',divide='ignore'):
+        means = np.bincount(codes,weights=values,minlength=n_groups) / counts
+        dev = values - means[codes]
+        dev2 = dev * dev
+        ss = np.bincount(codes,weights=dev2,minlength=n_groups)
+        m3 = np.bincount(codes,weights=dev2 * dev,minlength=n_groups) / counts
+        m4 = np.bincount(codes,weights=dev2 * dev2,minlength=n_groups) / counts
+    present = counts > 0
+    lower = np.where(present,starts + (counts - 1) // 2,0)
+    upper = np.where(present,starts + counts // 2,0)
+    medians = np.where(present,(values[lower] + values[upper]) / 2 if values.size else np.nan,np.nan)
+    return {'values': values, 'codes': codes, 'counts': counts, 'starts': starts, 'ranks': np.arange(values.size) - starts[codes],
+            'means': means, 'ss': ss, 'm3': m3, 'm4': m4, 'medians': medians}
+
+def _normality_arrays(grouped,tests):
+    """
+    Description: This function runs the normality tests of every group of one response from its grouped pass.
+
+    Return: (groups x 2 * tests) array of statistic and p-value per test
+    """
+    values, codes, counts = grouped['values'], grouped['codes'], grouped['counts']
+    ranks, starts, n_groups = grouped['ranks'], grouped['starts'], len(counts)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        m2 = grouped['ss'] / counts
+        variances = np.where(counts > 1,grouped['ss'] / (counts - 1),np.nan)
+    out = []
+    for test in tests:
+        if test == 'shapiro':
+            # Coefficients only depend on the group size, one table per distinct size
+            weights = np.zeros(values.size)
+            sizes = np.unique(counts[counts >= 3])
+            if sizes.size:
+                table = np.concatenate([_shapiro_coefficients(int(size)) for size in sizes])
+                group_offset = np.full(n_groups,-1)
+                group_offset[counts >= 3] = (np.cumsum(sizes) - sizes)[np.searchsorted(sizes,counts[counts >= 3])]
+                offset = group_offset[codes]
+                tested = offset >= 0
+                weights[tested] = table[offset[tested] + ranks[tested]]
+            with np.errstate(invalid='ignore',divide='ignore'):
+                numer = np.bincount(codes,weights=weights * (values - grouped['means'][codes]),minlength=n_groups)**2
+                w_stat = np.where((counts >= 3) & (grouped['ss'] > 0),numer / grouped['ss'],np.nan)
+            w_stat = np.minimum(w_stat,1.)
+            out += [w_stat, _shapiro_pvalue(w_stat,counts)]
+        elif test == 'dagostino':
+            out += list(_dagostino(counts,m2,grouped['m3'],grouped['m4']))
+        elif test == 'anderson':
+            with np.errstate(invalid='ignore',divide='ignore'):
+                std_vals = (values - grouped['means'][codes]) / np.sqrt(variances)[codes]
+                # Observation i is paired with observation n + 1 - i of its group
+                mirror = std_vals[starts[codes] + counts[codes] - 1 - ranks]
+                terms = (2 * ranks + 1) * (special.log_ndtr(std_vals) + special.log_ndtr(-mirror))
+                a2_stat = -counts - np.bincount(codes,weights=terms,minlength=n_groups) / counts
+            a2_stat = np.where((counts >= 3) & (variances > 0),a2_stat,np.nan)
+            out += [a2_stat, _anderson_pvalue(a2_stat,counts)]
+        else:
+            raise ValueError('invalid normality test')
+    return np.column_stack(out) if out else np.empty((n_groups,0))
+
+def _homogeneity_arrays(grouped,tests):
+    """
+    Description: This function runs the variance homogeneity tests across the groups of one response from its grouped
+                 pass. Groups without observations are left out.
+
+    Return: Array of statistic and p-value per test
+    """
+    values, codes = grouped['values'], grouped['codes']
+    present = grouped['counts'] > 0
+    counts = grouped['counts']
+    n_total, k = values.size, np.count_nonzero(present)
+    out = []
+    for test in tests:
+        with np.errstate(invalid='ignore',divide='ignore'):
+            if test in ['levene', 'brown_forsythe']:
+                center = grouped['means'] if test == 'levene' else grouped['medians']
+                abs_dev = np.abs(values - center[codes])
+                group_dev = np.bincount(codes,weights=abs_dev,minlength=len(counts)) / counts
+                grand_dev = abs_dev.mean()
+                between = np.sum((counts * (group_dev - grand_dev)**2)[present])
+                within = np.sum((abs_dev - group_dev[codes])**2)
+                stat = (n_total - k) * between / ((k - 1) * within)
+                p_value = dist_cache.sf('f',stat,(k - 1,n_total - k)) if k > 1 and n_total > k else np.nan
+            elif test == 'bartlett':
+                dof = (counts - 1)[present]
+                variances = grouped['ss'][present] / dof
+                pooled = np.sum(grouped['ss'][present]) / (n_total - k)
+                numer = (n_total - k) * np.log(pooled) - np.sum(dof * np.log(variances))
+                denom = 1 + (np.sum(1. / dof) - 1. / (n_total - k)) / (3 * (k - 1))
+                stat = numer / denom
+                p_value = dist_cache.sf('chi2',stat,k - 1) if k > 1 else np.nan
+            else:
+                raise ValueError('invalid homogeneity test')
+        out += [stat, p_value]
+    return np.array(out,dtype=float)
+
+def _column_block(task):
+    """
+    Description: This function is the task executed for a block of response columns (in a worker process when
+                 ``n_jobs`` is given). It runs one grouped pass per column and the requested tests.
+    """
+    values, codes, n_groups, normality, homogeneity = task
+    norm_out, homog_out = [], []
+    for col in range(values.shape[1]):
+        grouped = _grouped_pass(values[:,col],codes,n_groups)
+        norm_out.append(np.column_stack([grouped['counts'],_normality_arrays(grouped,normality)]))
+        homog_out.append(_homogeneity_arrays(grouped,homogeneity))
+    return norm_out, homog_out
+
+def _run_tests(values,groups,normality,homogeneity,n_jobs,block_cols):
+    """
+    Description: This function factorizes the groups once, splits the response columns into blocks and runs the blocks
+                 in one process or spread across ``n_jobs`` processes.
+
+    Returns:
+        - List of (groups x 1 + 2 * normality tests) arrays, one per response
+        - List of (2 * homogeneity tests) arrays, one per response
+        - Response names, group levels and the single response flag
+    """
+    names = None
+    if isinstance(values,pd.DataFrame):
+        names = list(values.columns)
+    elif isinstance(values,pd.Series):
+        names = [values.name]
+    values = np.asarray(values,dtype=float)
+    single = values.ndim == 1
+    if single:
+        values = values[:,None]
+    if names is None:
+        names = list(range(values.shape[1]))
+    if groups is None:
+        codes, levels = np.zeros(values.shape[0],dtype=np.intp), pd.Index(['all'])
+    else:
+        codes, levels = pd.factorize(np.asarray(groups),sort=True)
+    tasks = [(values[:,start:start + block_cols],codes,len(levels),normality,homogeneity)
+             for start in range(0,values.shape[1],block_cols)]
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs is None or n_jobs == 1 or len(tasks) == 1:
+        results = [_column_block(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=int(n_jobs)) as executor:
+            results = list(executor.map(_column_block,tasks))
+    norm_out = [arr for block in results for arr in block[0]]
+    homog_out = [arr for block in results for arr in block[1]]
+    return norm_out, homog_out, names, levels, single
+
+def _normality_frame(norm_out,names,levels,single,normality):
+    """
+    Description: This function builds the normality table, indexed by group (one response) or by (response, group).
+    """
+    columns = ['n'] + [name for test in normality for name in ['{}_stat'.format(test),'{}_p'.format(test)]]
+    frame = pd.DataFrame(np.vstack(norm_out),columns=columns)
+    frame['n'] = frame['n'].astype(np.int64)
+    if single:
+        frame.index = pd.Index(levels,name='group')
+    else:
+        frame.index = pd.MultiIndex.from_product([names,levels],names=['response','group'])
+    return frame
+
+def normality_tests(values,groups=None,tests=('shapiro','dagostino','anderson'),n_jobs=None,block_cols=64):
+    """
+    Description: This function runs the normality tests of every group of every response at once. One sort per response
+                 gives the order statistics, means and central moments of all its groups, and the tests are vectorized
+                 over the groups:
+                    - "shapiro" : Shapiro-Wilk W with Royston's p-value (as ``scipy.stats.shapiro``), 3 or more observations
+                    - "dagostino" : D'Agostino and Pearson's K2 (as ``scipy.stats.normaltest``), 8 or more observations
+                    - "anderson" : Anderson-Darling A2 (as ``scipy.stats.anderson``) with the D'Agostino & Stephens
+                                   p-value approximation, 3 or more observations
+
+    Input Parameters: It accepts below inputs:
+        1. values : Observations. Either a 1-D array/Series (one response) or a 2-D array/DataFrame with one column per
+                    response (e.g. thousands of metrics), all sharing the same grouping. NaN's are dropped per response.
+        2. groups : Group label (factor combination) of every observation. By default every response is one group.
+        3. tests : Normality tests to be run (by default all of ``NORMALITY_TESTS``)
+        4. n_jobs : Number of worker processes across blocks of response columns (None means a single process, -1 all CPUs)
+        5. block_cols : Number of response columns per task (by default 64)
+
+    Return: DataFrame indexed by group (one response) or (response, group) with the number of observations and the
+            statistic and p-value of every test (NaN when a group is too small or constant)
+    """
+    tests = list(tests)
+    norm_out, _, names, levels, single = _run_tests(values,groups,tests,[],n_jobs,block_cols)
+    return _normality_frame(norm_out,names,levels,single,tests)
+
+def homogeneity_tests(values,groups,tests=('levene','brown_forsythe','bartlett'),n_jobs=None,block_cols=64):
+    """
+    Description: This function runs the variance homogeneity tests across the groups of every response at once, from the
+                 group counts, means, medians and variances of one grouped pass per response:
+                    - "levene" : Levene's test centered on the group means (``scipy.stats.levene(center='mean')``)
+                    - "brown_forsythe" : Levene's test centered on the group medians (``center='median'``)
+                    - "bartlett" : Bartlett's test (``scipy.stats.bartlett``)
+
+    Input Parameters: It accepts below inputs:
+        1. values : Observations, 1-D (one response) or 2-D (one column per response), see ``normality_tests``
+        2. groups : Group label of every observation. Groups need at least 2 observations.
+        3. tests : Homogeneity tests to be run (by default all of ``HOMOGENEITY_TESTS``)
+        4. n_jobs : Number of worker processes across blocks of response columns
+        5. block_cols : Number of response columns per task (by default 64)
+
+    Return: DataFrame indexed by response with the statistic and p-value of every test
+    """
+    tests = list(tests)
+    _, homog_out, names, _, _ = _run_tests(values,groups,[],tests,n_jobs,block_cols)
+    columns = [name for test in tests for name in ['{}_stat'.format(test),'{}_p'.format(test)]]
+    return pd.DataFrame(np.vstack(homog_out),columns=columns,index=pd.Index(names,name='response'))
+
+def assumption_checks(values,groups,alpha=0.05,normality='shapiro',homogeneity='levene',n_jobs=None,block_cols=64):
+    """
+    Description: This function is the ANOVA pre-flight gate. It runs one normality test on every group and one
+                 homogeneity test across the groups of every response, and tells whether the parametric ANOVA can be used
+                 or a nonparametric test (e.g. Kruskal-Wallis) should be used instead.
+
+    Input Parameters: It accepts below inputs:
+        1. values : Observations, 1-D (one response) or 2-D (one column per response), see ``normality_tests``
+        2. groups : Group label (treatment or factor combination) of every observation
+        3. alpha : Level of significance of both checks (by default 0.05)
+        4. normality : Normality test, any of ``NORMALITY_TESTS`` (by default "shapiro")
+        5. homogeneity : Homogeneity test, any of ``HOMOGENEITY_TESTS`` (by default "levene")
+        6. n_jobs : Number of worker processes across blocks of response columns
+        7. block_cols : Number of response columns per task (by default 64)
+
+    Return: DataFrame indexed by response with the columns
+                - n_groups : Number of groups with observations
+                - min_normality_p : Smallest normality p-value of the groups
+                - non_normal_groups : Number of groups whose normality is rejected at ``alpha``
+                - homogeneity_p : p-value of the homogeneity test
+                - normal, equal_var : Pass (True) or fail (False) of every check (a NaN p-value fails)
+                - parametric : True when both checks pass
+                - path : "anova" when parametric, "nonparametric" otherwise
+    """
+    if normality not in NORMALITY_TESTS or homogeneity not in HOMOGENEITY_TESTS:
+        raise ValueError('invalid test')
+    norm_out, homog_out, names, _, _ = _run_tests(values,groups,[normality],[homogeneity],n_jobs,block_cols)
+    counts = np.vstack([arr[:,0] for arr in norm_out])
+    norm_p = np.vstack([arr[:,2] for arr in norm_out])
+    norm_p = np.where(counts > 0,norm_p,np.inf)
+    homog_p = np.array([arr[1] for arr in homog_out])
+    min_p = np.min(norm_p,axis=1)
+    normal = ~np.isnan(norm_p).any(axis=1) & (min_p > alpha)
+    equal_var = homog_p > alpha
+    parametric = normal & equal_var
+    return pd.DataFrame({'n_groups': np.count_nonzero(counts > 0,axis=1), 'min_normality_p': min_p,
+                         'non_normal_groups': np.count_nonzero(norm_p <= alpha,axis=1), 'homogeneity_p': homog_p,
+                         'normal': normal, 'equal_var': equal_var, 'parametric': parametric,
+                         'path': np.where(parametric,'anova','nonparametric')},index=pd.Index(names,name='response'))
+
+def assumption_checks_wide(df,cols=None,alpha=0.05,normality='shapiro',homogeneity='levene'):
+    """
+    Description: This function runs ``assumption_checks`` on wide data having one column per treatment (like the
+                 ``ANOVA_questions/ch08_all`` files), the columns may have different lengths (NaN padded).
+
+    Input Parameters: It accepts below inputs:
+        1. df : Pandas DataFrame having one column per treatment
+        2. cols : List of treatment columns (by default every column)
+        3. alpha, normality, homogeneity : See ``assumption_checks``
+
+    Return: One row gate table (see ``assumption_checks``)
+    """
+    cols = list(df.columns) if cols is None else list(cols)
+    values = np.asarray(df[cols],dtype=float)
+    groups = np.broadcast_to(np.asarray(cols,dtype=object),values.shape)
+    return assumption_checks(values.ravel(),groups.ravel(),alpha=alpha,normality=normality,homogeneity=homogeneity)
@@ -0,0 +1,290 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+from . import dist_cache
+
+def _z_pvalue(test_stat,alternative):
+    """
+    Description: This function converts an array of Z test statistics into p-values in one vectorized call.
+
+    Input Parameters: It accepts below inputs:
+        1. test_stat : Array of Z test statistics
+        2. alternative : Kind of tail test. Accepts the same values as ``one_porportion_ztest`` and ``ztest_notpooled``
+                            a) "smaller" / "s" : Left tail test
+                            b) "larger" / "l" : Right tail test
+                            c) "two-sided" / "2-sided" / "2s" : Both tail test
+
+    Return: Array of p-values with the same shape as ``test_stat``
+    """
+    if alternative in ['two-sided', '2-sided', '2s']:
+        p_val = 2 * dist_cache.sf('norm',np.abs(test_stat))
+    elif alternative in ['larger', 'l']:
+        p_val = dist_cache.sf('norm',test_stat)
+    elif alternative in ['smaller', 's']:
+        p_val = dist_cache.cdf('norm',test_stat)
+    else:
+        raise ValueError('invalid alternative')
+    return p_val
+
+def _masked_moments(x,axis=0):
+    """
+    Description: This function calculates the number of observations, mean and variance (ddof=0) of every column while ignoring NaN's.
+                 NaN's are handled by a boolean mask, so no per-column copy or ``dropna`` is needed.
+
+    Input Parameters: It accepts below inputs:
+        1. x : 2-D (or 1-D) float array of samples, one test per column
+        2. axis : Axis along which the observations of one test are laid out (by default 0)
+
+    Returns: Per-column
+                - Number of non-null observations
+                - Mean
+                - Variance
+    """
+    mask = ~np.isnan(x)
+    if mask.all():
+        # Fast path, nothing to mask
+        x_mean = x.mean(axis)
+        nobs = np.full(np.shape(x_mean),x.shape[axis],dtype=float)
+        return nobs, x_mean, x.var(axis)
+    nobs = mask.sum(axis).astype(float)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        x_mean = np.where(mask,x,0.).sum(axis) / nobs
+        dev = np.where(mask,x - np.expand_dims(x_mean,axis),0.)
+        x_var = (dev * dev).sum(axis) / nobs
+    return nobs, x_mean, x_var
+
+def _proportion_z(n,smp_prop_mean,pop_proportion,alternative):
+    """
+    Description: This function performs the one proportion Z tests from the number of observations and the mean sample
+                 proportion of every test.
+
+    Return: Test Statistic and P-value arrays
+    """
+    pops_diff = (smp_prop_mean - pop_proportion)
+    denom = np.sqrt((pop_proportion * (1 - np.asarray(pop_proportion))) / n)
+
+    with np.errstate(invalid='ignore',divide='ignore'):
+        test_stat = np.divide(pops_diff,denom)
+    p_val = _z_pvalue(test_stat,alternative)
+    return test_stat, p_val
+
+def _notpooled_z(moments1,moments2,value,alternative,ddof):
+    """
+    Description: This function performs the not pooled Z tests from the (number of observations, mean, variance with
+                 ddof=0) of every sample, ``moments2`` being None for the one sample test.
+
+    Return: Test Statistic and P-value arrays
+    """
+    nobs1, x1_mean, x1_var = moments1
+    with np.errstate(invalid='ignore',divide='ignore'):
+        if moments2 is not None:
+            nobs2, x2_mean, x2_var = moments2
+            var_not_pooled = ((x1_var/nobs1) + (x2_var/nobs2))
+        else:
+            var_not_pooled = x1_var / (nobs1 - ddof)
+            x2_mean = 0
+
+        std_diff = np.sqrt(var_not_pooled)
+        z_stat = (x1_mean - x2_mean - value) / std_diff
+    p_val = _z_pvalue(z_stat,alternative)
+    return z_stat, p_val
+
+def one_porportion_ztest_batch(smp_porportion,pop_proportion,alternative='two-sided',nan_policy=False,axis=0):
+    """
+    Description: This function is the batched version of ``one_porportion_ztest``. Every column of the input is one
+                 sample proportion array and all the tests are performed in one vectorized pass.
+
+    Input Parameters: It accepts below parameters:
+        1. smp_porportion : 2-D array (observations x tests). Columns may have different lengths by padding them with NaN.
+        2. pop_proportion : Proportion accepted as the Null Hypothesis. Either a scalar or one value per test.
+        3. alternative : Kind of tail test -- "smaller", "larger" or "two-sided" (default)
+        4. nan_policy : Same meaning as in ``one_porportion_ztest``
+                            a) "mean" : Null values are replaced with the mean of their column
+                            b) "median" : Null values are replaced with the median of their column
+                            c) Any other value drops the Null values of every column
+        5. axis : Axis along which the observations of one test are laid out (by default 0)
+
+    Return: It returns below two arrays (one value per test):
+                1. Test Statistic
+                2. P-value of the Test Statistic
+    """
+    if alternative not in ['smaller', 'larger', 'two-sided']:
+        raise ValueError('invalid alternative')
+
+    smp_prop = np.asarray(smp_porportion,dtype=float)
+    nobs, smp_prop_mean, _ = _masked_moments(smp_prop,axis=axis)
+
+    if nan_policy in ['mean', 'median']:
+        # Filling with the column mean keeps the mean as it is, only n changes
+        n = np.full_like(smp_prop_mean,smp_prop.shape[axis],dtype=float)
+        if nan_policy == 'median':
+            fill_val = np.nanmedian(smp_prop,axis=axis)
+            smp_prop_mean = ((smp_prop_mean * nobs) + (fill_val * (n - nobs))) / n
+    else:
+        n = nobs
+
+    return _proportion_z(n,smp_prop_mean,pop_proportion,alternative)
+
+def ztest_notpooled_batch(x1,x2=None,value=0,alternative='two-sided',usevar='notpooled',ddof=1.,axis=0):
+    """
+    Description: This function is the batched version of ``ztest_notpooled``. Every column of ``x1`` (and ``x2``) is one
+                 sample and all the Z tests are performed in one vectorized pass. NaN's are excluded through masks.
+
+    Input Parameters: It accepts below inputs:
+        1. x1 : 2-D array (observations x tests) of the first sample. Shorter samples are padded with NaN.
+        2. x2 : 2-D array (observations x tests) of the second independent sample or None for the one sample test
+        3. value : Mean (one sample) or difference in means (two samples) under the Null Hypothesis. Scalar or one value per test.
+        4. alternative : Kind of tail test -- "two-sided" (default), "larger" or "smaller"
+        5. usevar : Only ``notpooled`` is implemented
+        6. ddof : Degrees of freedom used for the variance of the mean in the one sample case
+        7. axis : Axis along which the observations of one test are laid out (by default 0)
+
+    Return: It returns below two arrays (one value per test):
+                1. Test Statistic
+                2. P-value of the Test Statistic
+    """
+    if usevar != 'notpooled':
+        raise NotImplementedError('only usevar="not-pooled" is implemented')
+
+    moments1 = _masked_moments(np.asarray(x1,dtype=float),axis=axis)
+    moments2 = None if x2 is None else _masked_moments(np.asarray(x2,dtype=float),axis=axis)
+    return _notpooled_z(moments1,moments2,value,alternative,ddof)
+
+def long_to_wide(df,group_col,value_col,groups=None):
+    """
+    Description: This function converts a long-format DataFrame (one row per observation) into a 2-D NaN padded array
+                 having one column per group, which is the layout expected by the batched tests.
+
+    Input Parameters: It accepts below inputs:
+        1. df : Long-format Pandas DataFrame
+        2. group_col : Column holding the group key (metric, segment etc.)
+        3. value_col : Column holding the observations
+        4. groups : Optional list of group labels for fixing the order (and selection) of output columns
+
+    Returns:
+        - Group labels (one per column)
+        - 2-D array (observations x groups)
+    """
+    codes, labels = pd.factorize(df[group_col],sort=True)
+    values = np.asarray(df[value_col],dtype=float)
+    if groups is not None:
+        remap = pd.Index(groups).get_indexer(labels)
+        codes = np.where(codes >= 0,remap[codes],-1)
+        labels = pd.Index(groups)
+    keep = codes >= 0
+    codes, values = codes[keep], values[keep]
+
+    # Position of every observation inside its own group
+    order = np.argsort(codes,kind='stable')
+    counts = np.bincount(codes,minlength=len(labels))
+    starts = np.concatenate(([0],np.cumsum(counts)[:-1]))
+    rows = np.empty_like(order)
+    rows[order] = np.arange(len(order)) - np.repeat(starts,counts)
+
+    wide = np.full((counts.max() if len(counts) else 0,len(labels)),np.nan)
+    wide[rows,codes] = values
+    return np.asarray(labels), wide
+
+def _grouped_moments(df,group_col,value_col,groups=None):
+    """
+    Description: This function reduces a long-format DataFrame to the number of rows, number of non-null observations,
+                 mean and variance (ddof=0) of every group with ``np.bincount`` over the group codes, so the memory used
+                 grows with the number of rows and never with (largest group x number of groups).
+
+    Input Parameters: It accepts below inputs:
+        1. df : Long-format Pandas DataFrame
+        2. group_col : Column holding the group key
+        3. value_col : Column holding the observations
+        4. groups : Optional list of group labels for fixing the order (and selection) of the groups
+
+    Returns:
+        - Group labels
+        - Number of rows of every group (NaN's included)
+        - Tuple (number of non-null observations, mean, variance) of every group
+        - Group codes and values of the non-null observations
+    """
+    codes, labels = pd.factorize(df[group_col],sort=True)
+    if groups is not None:
+        remap = pd.Index(groups).get_indexer(labels)
+        codes = np.where(codes >= 0,remap[codes],-1)
+        labels = pd.Index(groups)
+    n_grp = len(labels)
+    values = np.asarray(df[value_col],dtype=float)
+    rows = np.bincount(codes[codes >= 0],minlength=n_grp).astype(float)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    nobs = np.bincount(codes,minlength=n_grp).astype(float)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        mean = np.bincount(codes,weights=values,minlength=n_grp) / nobs
+        dev = values - mean[codes]
+        var = np.bincount(codes,weights=dev * dev,minlength=n_grp) / nobs
+    return np.asarray(labels), rows, (nobs, mean, var), (codes, values)
+
+def _grouped_median(codes,values,n_grp):
+    """
+    Description: This function returns the median of every group from one sort by (group, value).
+    """
+    order = np.lexsort((values,codes))
+    values = values[order]
+    counts = np.bincount(codes,minlength=n_grp)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+    lower = np.where(present,starts + (counts - 1) // 2,0)
+    upper = np.where(present,starts + counts // 2,0)
+    if not values.size:
+        return np.full(n_grp,np.nan)
+    return np.where(present,(values[lower] + values[upper]) / 2,np.nan)
+
+def grouped_one_porportion_ztest(df,group_col,value_col,pop_proportion,alternative='two-sided',nan_policy=False):
+    """
+    Description: This function performs ``one_porportion_ztest`` for every group of a long-format DataFrame in one pass
+                 of grouped sums (see ``_grouped_moments``).
+
+    Input Parameters: It accepts below inputs:
+        1. df : Long-format Pandas DataFrame
+        2. group_col : Column holding the group key
+        3. value_col : Column holding the sample proportions
+        4. pop_proportion : Proportion accepted as the Null Hypothesis (scalar or one value per group, in sorted group order)
+        5. alternative : Kind of tail test -- "smaller", "larger" or "two-sided" (default)
+        6. nan_policy : Same meaning as in ``one_porportion_ztest``, the Null values being the NaN rows of each group
+
+    Return: DataFrame indexed by group with ``test_stat`` and ``p_value`` columns
+    """
+    if alternative not in ['smaller', 'larger', 'two-sided']:
+        raise ValueError('invalid alternative')
+    labels, rows, (nobs, smp_prop_mean, _), (codes, values) = _grouped_moments(df,group_col,value_col)
+    n = nobs
+    if nan_policy in ['mean', 'median']:
+        # Filling with the group mean keeps the mean as it is, only n changes
+        n = rows
+        if nan_policy == 'median':
+            fill_val = _grouped_median(codes,values,len(labels))
+            with np.errstate(invalid='ignore'):
+                smp_prop_mean = np.where(nobs < rows,((smp_prop_mean * nobs) + (fill_val * (n - nobs))) / n,smp_prop_mean)
+    test_stat, p_val = _proportion_z(n,smp_prop_mean,pop_proportion,alternative)
+    return pd.DataFrame({'test_stat': test_stat, 'p_value': p_val},index=pd.Index(labels,name=group_col))
+
+def grouped_ztest_notpooled(df1,group_col,value_col,df2=None,value=0,alternative='two-sided',ddof=1.):
+    """
+    Description: This function performs ``ztest_notpooled`` for every group of long-format DataFrame(s) in one pass of
+                 grouped sums (see ``_grouped_moments``). In the two sample case the groups of ``df1`` and ``df2`` are
+                 matched on their keys.
+
+    Input Parameters: It accepts below inputs:
+        1. df1 : Long-format Pandas DataFrame of the first sample
+        2. group_col : Column holding the group key (same name in both DataFrames)
+        3. value_col : Column holding the observations (same name in both DataFrames)
+        4. df2 : Long-format Pandas DataFrame of the second sample or None for the one sample test
+        5. value : Mean or difference in means under the Null Hypothesis
+        6. alternative : Kind of tail test -- "two-sided" (default), "larger" or "smaller"
+        7. ddof : Degrees of freedom used for the variance of the mean in the one sample case
+
+    Return: DataFrame indexed by group with ``test_stat`` and ``p_value`` columns
+    """
+    groups = None
+    if df2 is not None:
+        groups = np.intersect1d(pd.unique(df1[group_col]),pd.unique(df2[group_col]))
+    labels, _, moments1, _ = _grouped_moments(df1,group_col,value_col,groups=groups)
+    moments2 = None if df2 is None else _grouped_moments(df2,group_col,value_col,groups=groups)[2]
+    z_stat, p_val = _notpooled_z(moments1,moments2,value,alternative,ddof)
+    return pd.DataFrame({'test_stat': z_stat, 'p_value': p_val},index=pd.Index(labels,name=group_col))
@@ -0,0 +1,318 @@
+# Importing Packages
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from .stats_tests import one_porportion_ztest, chi_square_one_pop, ztest_notpooled, f_dist_test
+from .batched_tests import one_porportion_ztest_batch, ztest_notpooled_batch
+from .bootstrap import bootstrap_distribution, sampling_distribution
+
+# Sample sizes and batch counts of the full suite
+SIZES = [int(1e2), int(1e4), int(1e6), int(1e8)]
+BATCHES = [1, int(1e2), int(1e4), int(1e5)]
+# Quick suite used by default
+QUICK_SIZES = [int(1e2), int(1e4), int(1e6)]
+QUICK_BATCHES = [1, int(1e2), int(1e4)]
+# Cases needing more than this many values (size x batch) are skipped
+MAX_ELEMENTS = int(1e8)
+# Cumulative import time budgets (seconds) of the modules used by short-lived workers
+IMPORT_BUDGETS = {'stats_tests': 0.5, 'dist_cache': 0.5, 'instrumentation': 0.5}
+# Dependencies that importing a budgeted module must never load
+HEAVY_MODULES = ['pandas', 'scipy.stats', 'matplotlib', 'seaborn', 'stemgraphic', 'statsmodels']
+
+def _best_time(func,repeat=3):
+    """
+    Description: This function runs the given function ``repeat`` times and returns the best wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def _peak_memory_mb(func):
+    """
+    Description: This function runs the given function once under ``tracemalloc`` and returns its peak allocation in MB.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+def bench_batched_ztests(n_tests=10000,n_obs=200,nan_frac=0.01,repeat=3,seed=44):
+    """
+    Description: This function compares the per-test cost of the scalar ``one_porportion_ztest``/``ztest_notpooled`` loops
+                 with their batched versions on synthetic data.
+
+    Input Parameters: It accepts below inputs:
+        1. n_tests : Number of tests (metrics x segments) to be performed
+        2. n_obs : Number of observations per test
+        3. nan_frac : Fraction of observations replaced with NaN
+        4. repeat : Number of repetitions, the best timing is reported
+        5. seed : Seed of the random number generator
+
+    Return: Dictionary of per-test cost (micro-seconds) for every function and the max absolute difference between
+            the scalar and batched results.
+    """
+    rng = np.random.default_rng(seed)
+    props = rng.binomial(1,0.3,size=(n_obs,n_tests)).astype(float)
+    props[rng.random(props.shape) < nan_frac] = np.nan
+    x1 = rng.normal(10,2,size=(n_obs,n_tests))
+    x2 = rng.normal(10.2,3,size=(n_obs,n_tests))
+
+    results = {}
+    scalar_prop = lambda: [one_porportion_ztest(props[:,i],0.3) for i in range(n_tests)]
+    batch_prop = lambda: one_porportion_ztest_batch(props,0.3)
+    scalar_z = lambda: [ztest_notpooled(x1[:,i],x2[:,i]) for i in range(n_tests)]
+    batch_z = lambda: ztest_notpooled_batch(x1,x2)
+
+    for name, func in [('one_porportion_ztest',scalar_prop),('one_porportion_ztest_batch',batch_prop),
+                       ('ztest_notpooled',scalar_z),('ztest_notpooled_batch',batch_z)]:
+        results[name] = (_best_time(func,repeat=repeat) / n_tests) * 1e6
+
+    results['max_abs_diff_prop'] = np.nanmax(np.abs(np.array(scalar_prop()) - np.array(batch_prop()).T))
+    results['max_abs_diff_z'] = np.nanmax(np.abs(np.array(scalar_z()) - np.array(batch_z()).T))
+    return results
+
+def _make_case(name,size,batch,seed):
+    """
+    Description: This function generates the synthetic data of one case from a fixed seed and returns the callable to be timed.
+                 For the scalar tests a batch of ``batch`` tests of ``size`` observations is run (batch 1 calls the scalar
+                 function, more than 1 the batched one where it exists). For the workflows ``batch`` is the number of
+                 resamples/samples.
+
+    Return: Callable, or None when the case does not apply
+    """
+    rng = np.random.default_rng(seed)
+    if name == 'one_porportion_ztest':
+        data = rng.binomial(1,0.3,size=(size,batch)).astype(float)
+        if batch == 1:
+            return lambda: one_porportion_ztest(data[:,0],0.3)
+        return lambda: one_porportion_ztest_batch(data,0.3)
+    if name == 'ztest_notpooled':
+        x1, x2 = rng.normal(10,2,size=(size,batch)), rng.normal(10.2,3,size=(size,batch))
+        if batch == 1:
+            return lambda: ztest_notpooled(x1[:,0],x2[:,0])
+        return lambda: ztest_notpooled_batch(x1,x2)
+    if name == 'chi_square_one_pop':
+        if batch != 1:
+            return None
+        data = rng.normal(10,2,size=size)
+        return lambda: chi_square_one_pop(2.,0.95,'lr',sample_data=data)
+    if name == 'f_dist_test':
+        if batch != 1:
+            return None
+        x1, x2 = rng.normal(10,2,size=size), rng.normal(10,2.5,size=size)
+        return lambda: f_dist_test(x1,x2,cal_x1_x2_var=True)
+    if name == 'bootstrap_mean':
+        sample = rng.lognormal(3,1,size=size)
+        return lambda: bootstrap_distribution(sample,np.mean,n_resamples=batch,seed=seed)
+    if name == 'clt':
+        pop_scores = rng.lognormal(3,1,size=size)
+        return lambda: sampling_distribution(pop_scores,50,num_samples=batch,seed=seed)
+    raise ValueError('invalid case')
+
+CASES = ['one_porportion_ztest','chi_square_one_pop','ztest_notpooled','f_dist_test','bootstrap_mean','clt']
+
+def run_suite(cases=None,sizes=None,batches=None,repeat=3,seed=44,max_elements=MAX_ELEMENTS,verbose=True):
+    """
+    Description: This function runs the benchmark suite and records the wall time and peak memory of every case.
+
+    Input Parameters: It accepts below inputs:
+        1. cases : List of case names (by default ``CASES``)
+        2. sizes : List of sample sizes (by default ``QUICK_SIZES``, use ``SIZES`` for the full 1e2..1e8 grid)
+        3. batches : List of batch counts (by default ``QUICK_BATCHES``, use ``BATCHES`` for the full 1..1e5 grid)
+        4. repeat : Number of timed repetitions, the best one is kept
+        5. seed : Seed of the synthetic data
+        6. max_elements : Cases needing more than this many values (size x batch) are skipped
+        7. verbose : Print every result
+
+    Return: Dictionary {case id: {'time_s': ..., 'peak_mb': ...}} where the case id is "name[size=..,batch=..]"
+    """
+    cases = CASES if cases is None else cases
+    sizes = QUICK_SIZES if sizes is None else sizes
+    batches = QUICK_BATCHES if batches is None else batches
+    results = {}
+    for name in cases:
+        for size in sizes:
+            for batch in batches:
+                # Workflows build one (batch x 50) or (batch x size) index block per chunk, the tests hold size x batch values
+                elements = batch * (50 if name == 'clt' else size)
+                if elements > max_elements:
+                    continue
+                func = _make_case(name,size,batch,seed)
+                if func is None:
+                    continue
+                case_id = '{}[size={},batch={}]'.format(name,size,batch)
+                results[case_id] = {'time_s': _best_time(func,repeat=repeat), 'peak_mb': _peak_memory_mb(func)}
+                if verbose:
+                    print("{:<55} {:>12.6f} s {:>10.2f} MB".format(case_id,results[case_id]['time_s'],results[case_id]['peak_mb']))
+    return results
+
+def save_baseline(results,path):
+    """
+    Description: This function saves the suite results as a JSON baseline, with the machine details.
+    """
+    payload = {'machine': {'python': sys.version.split()[0], 'numpy': np.__version__, 'platform': platform.platform()},
+               'results': results}
+    with open(path,'w') as baseline_file:
+        json.dump(payload,baseline_file,indent=2,sort_keys=True)
+
+def compare_baseline(results,path,threshold=0.25,min_time=1e-4):
+    """
+    Description: This function compares the suite results with a saved JSON baseline.
+
+    Input Parameters: It accepts below inputs:
+        1. results : Output of ``run_suite``
+        2. path : Path of the JSON baseline
+        3. threshold : Allowed relative regression of time and peak memory (by default 0.25 i.e. 25%)
+        4. min_time : Cases faster than this (in seconds) in the baseline are not checked for time, they are too noisy
+
+    Return: List of regression messages (empty when nothing regressed)
+    """
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    regressions = []
+    for case_id, current in results.items():
+        if case_id not in baseline:
+            continue
+        base = baseline[case_id]
+        if base['time_s'] >= min_time and current['time_s'] > base['time_s'] * (1 + threshold):
+            regressions.append('{} time {:.6f}s > baseline {:.6f}s'.format(case_id,current['time_s'],base['time_s']))
+        if current['peak_mb'] > max(base['peak_mb'],0.01) * (1 + threshold):
+            regressions.append('{} peak memory {:.2f}MB > baseline {:.2f}MB'.format(case_id,current['peak_mb'],base['peak_mb']))
+    return regressions
+
+def import_time(module,repeat=3):
+    """
+    Description: This function measures the cold import of a submodule of the package in fresh interpreters with
+                 ``python -X importtime`` and lists the modules it loads.
+
+    Input Parameters: It accepts below inputs:
+        1. module : Name of the submodule, e.g. "stats_tests"
+        2. repeat : Number of fresh interpreters, the best timing is reported
+
+    Return: Dictionary {'time_s': cumulative import time of the package and the submodule, 'modules': sorted list of the
+            modules imported}
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    target = '{}.{}'.format(__package__,module)
+    timings, imported = [], set()
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable,'-X','importtime','-c','import ' + target],cwd=root,capture_output=True,
+                              text=True,check=True)
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or line.endswith('imported package'):
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            imported.add(name.strip())
+            # Top level entries of the package (nested ones are already in their parent's cumulative time)
+            if name[1:2] != ' ' and name.strip().split('.')[0] == __package__:
+                total += int(cumulative)
+        timings.append(total / 1e6)
+    return {'time_s': min(timings), 'modules': sorted(imported)}
+
+def check_import_budgets(budgets=None,heavy_modules=None,repeat=3,verbose=True):
+    """
+    Description: This function enforces the import budgets -- every budgeted submodule must import within its budget
+                 without loading any of the heavy dependencies.
+
+    Input Parameters: It accepts below inputs:
+        1. budgets : Dictionary {submodule: seconds} (by default ``IMPORT_BUDGETS``)
+        2. heavy_modules : Forbidden dependencies (by default ``HEAVY_MODULES``)
+        3. repeat : Number of fresh interpreters per submodule
+        4. verbose : Print every result
+
+    Return: List of violation messages (empty when every budget is met)
+    """
+    budgets = IMPORT_BUDGETS if budgets is None else budgets
+    heavy_modules = HEAVY_MODULES if heavy_modules is None else heavy_modules
+    violations = []
+    for module, budget in budgets.items():
+        result = import_time(module,repeat=repeat)
+        loaded = [name for name in heavy_modules if name in result['modules']]
+        if verbose:
+            print("{:<30} {:>10.4f} s (budget {:.4f} s)".format(module,result['time_s'],budget))
+        if result['time_s'] > budget:
+            violations.append('{} imports in {:.4f}s > budget {:.4f}s'.format(module,result['time_s'],budget))
+        if loaded:
+            violations.append('{} loads {}'.format(module,', '.join(loaded)))
+    return violations
+
+def main(argv=None):
+    """
+    Description: Command line entry point.
+
+        python -m Scripts.benchmarks batched                                   -> scalar vs batched z-tests
+        python -m Scripts.benchmarks suite --save baseline.json                -> run the suite and save a baseline
+        python -m Scripts.benchmarks suite --compare baseline.json --threshold 0.2
+                                                                               -> fail (exit 1) on regressions
+        python -m Scripts.benchmarks suite --full                              -> 1e2..1e8 sizes and 1..1e5 batches
+        python -m Scripts.benchmarks imports --budget 0.3                      -> fail (exit 1) when a worker module
+                                                                                  imports slower or loads heavy stacks
+    """
+    parser = argparse.ArgumentParser(description='Benchmarks of the statistical tests')
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('batched')
+    suite = sub.add_parser('suite')
+    suite.add_argument('--cases',nargs='+',default=None,choices=CASES)
+    suite.add_argument('--sizes',nargs='+',type=float,default=None)
+    suite.add_argument('--batches',nargs='+',type=float,default=None)
+    suite.add_argument('--full',action='store_true')
+    suite.add_argument('--repeat',type=int,default=3)
+    suite.add_argument('--seed',type=int,default=44)
+    suite.add_argument('--max-elements',type=float,default=MAX_ELEMENTS)
+    suite.add_argument('--save',default=None)
+    suite.add_argument('--compare',default=None)
+    suite.add_argument('--threshold',type=float,default=0.25)
+    imports = sub.add_parser('imports')
+    imports.add_argument('--modules',nargs='+',default=None,choices=list(IMPORT_BUDGETS))
+    imports.add_argument('--budget',type=float,default=None)
+    imports.add_argument('--repeat',type=int,default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'imports':
+        modules = list(IMPORT_BUDGETS) if args.modules is None else args.modules
+        budgets = {module: IMPORT_BUDGETS[module] if args.budget is None else args.budget for module in modules}
+        violations = check_import_budgets(budgets,repeat=args.repeat)
+        for message in violations:
+            print('BUDGET :: ' + message)
+        return 1 if violations else 0
+
+    if args.command == 'suite':
+        sizes = SIZES if args.full else QUICK_SIZES
+        batches = BATCHES if args.full else QUICK_BATCHES
+        if args.sizes is not None:
+            sizes = [int(val) for val in args.sizes]
+        if args.batches is not None:
+            batches = [int(val) for val in args.batches]
+        results = run_suite(cases=args.cases,sizes=sizes,batches=batches,repeat=args.repeat,seed=args.seed,
+                            max_elements=int(args.max_elements))
+        if args.save is not None:
+            save_baseline(results,args.save)
+        if args.compare is not None:
+            regressions = compare_baseline(results,args.compare,threshold=args.threshold)
+            for message in regressions:
+                print('REGRESSION :: ' + message)
+            return 1 if regressions else 0
+        return 0
+
+    for key, val in bench_batched_ztests().items():
+        if key.startswith('max_abs_diff'):
+            print("{:<30} : {:.3e}".format(key,val))
+        else:
+            print("{:<30} : {:.3f} us/test".format(key,val))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
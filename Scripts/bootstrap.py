@@ -0,0 +1,327 @@
+# Importing Packages
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from scipy.stats import norm as z_nm
+
+# Moments returned by ``sampling_distribution``
+SAMPLING_MOMENTS = ['mean', 'std', 'var', 'skew', 'kurtosis']
+
+# Parent sample shared with the worker processes (set by ``_attach_shared_sample``)
+_worker_shm = None
+_worker_data = None
+
+def _rows_per_chunk(n_obs,chunk_size=None,max_memory_mb=256):
+    """
+    Description: This function decides how many resamples are materialized at a time so that the index matrix and the
+                 gathered resamples stay below the memory cap.
+
+    Input Parameters: It accepts below inputs:
+        1. n_obs : Number of observations in one resample
+        2. chunk_size : Requested number of resamples per chunk (None means as many as the memory cap allows)
+        3. max_memory_mb : Memory cap in MB. Every resampled value needs 24 bytes (uniform draw, index and gathered value).
+
+    Return: Number of resamples per chunk (at least 1)
+    """
+    cap_rows = max(1,int((max_memory_mb * 2**20) // (24 * n_obs)))
+    if chunk_size is None:
+        return cap_rows
+    return max(1,min(int(chunk_size),cap_rows))
+
+def _resample_stats(data,statistic,rng,n_resamples,rows,samp_size=None):
+    """
+    Description: This function draws ``n_resamples`` bootstrap resamples of ``data`` from ``rng`` in chunks of ``rows``
+                 resamples and reduces every resample with ``statistic``. Resamples hold ``samp_size`` observations
+                 (by default as many as ``data``).
+
+                 Indices are derived from uniform doubles (one 64-bit draw each), so the random stream consumed is the same
+                 whatever the chunk size is and the output does not depend on ``rows``.
+
+    Return: Array holding the statistic of every resample
+    """
+    n_obs = data.shape[0]
+    samp_size = n_obs if samp_size is None else int(samp_size)
+    boot_stats = np.empty(n_resamples,dtype=float)
+    for start in range(0,n_resamples,rows):
+        stop = min(start + rows,n_resamples)
+        idx = rng.random((stop - start,samp_size))
+        idx *= n_obs
+        idx = idx.astype(np.intp)
+        np.minimum(idx,n_obs - 1,out=idx)
+        boot_stats[start:stop] = statistic(data[idx],axis=-1)
+    return boot_stats
+
+def _attach_shared_sample(shm_name,shape,dtype):
+    """
+    Description: This function is the initializer of every worker process. It attaches the parent sample placed in
+                 shared memory by the parent process, so the sample is never pickled into the tasks.
+    """
+    global _worker_shm, _worker_data
+    try:
+        _worker_shm = shared_memory.SharedMemory(name=shm_name,track=False)
+    except TypeError:
+        # Python < 3.13 has no ``track`` flag, the parent process owns (and unlinks) the block
+        _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_data = np.ndarray(shape,dtype=dtype,buffer=_worker_shm.buf)
+
+def _block_stats(statistic,block_seed,n_block,rows,samp_size=None):
+    """
+    Description: This function is the task executed by the worker processes. It bootstraps one block of resamples
+                 from the shared parent sample using the block's own child seed.
+    """
+    return _resample_stats(_worker_data,statistic,np.random.default_rng(block_seed),n_block,rows,samp_size)
+
+def _parallel_resample_stats(data,statistic,seed,n_resamples,rows,n_jobs,block_size,samp_size=None):
+    """
+    Description: This function splits the resamples into fixed blocks of ``block_size`` resamples and seeds every block
+                 with its own ``SeedSequence.spawn`` child. The blocks (and so the result) do not depend on ``n_jobs``,
+                 which only decides how many processes work through them.
+
+    Return: Array holding the statistic of every resample
+    """
+    if isinstance(seed,np.random.Generator):
+        seed = seed.integers(2**63)
+    seed_seq = seed if isinstance(seed,np.random.SeedSequence) else np.random.SeedSequence(seed)
+    starts = list(range(0,n_resamples,block_size))
+    block_seeds = seed_seq.spawn(len(starts))
+    block_sizes = [min(block_size,n_resamples - start) for start in starts]
+    boot_stats = np.empty(n_resamples,dtype=float)
+
+    if n_jobs == 1:
+        for start, block_seed, n_block in zip(starts,block_seeds,block_sizes):
+            boot_stats[start:start + n_block] = _resample_stats(data,statistic,np.random.default_rng(block_seed),n_block,rows,
+                                                                           samp_size)
+        return boot_stats
+
+    shm = shared_memory.SharedMemory(create=True,size=max(1,data.nbytes))
+    try:
+        np.ndarray(data.shape,dtype=data.dtype,buffer=shm.buf)[:] = data
+        with ProcessPoolExecutor(max_workers=n_jobs,initializer=_attach_shared_sample,
+                                 initargs=(shm.name,data.shape,data.dtype)) as executor:
+            futures = [executor.submit(_block_stats,statistic,block_seed,n_block,rows,samp_size)
+                       for block_seed, n_block in zip(block_seeds,block_sizes)]
+            for start, n_block, future in zip(starts,block_sizes,futures):
+                boot_stats[start:start + n_block] = future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+    return boot_stats
+
+def bootstrap_distribution(data,statistic=np.mean,n_resamples=10000,seed=None,chunk_size=None,max_memory_mb=256,n_jobs=None,block_size=10000):
+    """
+    Description: This function generates the bootstrap distribution of a statistic. It replaces the per-iteration
+                 ``np.random.choice`` + ``np.mean`` loop with chunked, vectorized resampling.
+
+    Input Parameters: It accepts below inputs:
+        1. data : One dimensional array containing the parent sample (NaN's are dropped)
+        2. statistic : Reducing function accepting an ``axis`` keyword like ``np.mean``, ``np.median`` or ``np.std``.
+                       It is applied along the last axis of a (resamples x observations) array.
+        3. n_resamples : Number of bootstrap resamples (by default 10000)
+        4. seed : Seed, ``numpy.random.SeedSequence`` or ``numpy.random.Generator`` for reproducible results
+        5. chunk_size : Number of resamples generated at a time. It only affects speed and memory, never the result.
+        6. max_memory_mb : Upper bound (in MB) of the memory used by one chunk, per process (by default 256)
+        7. n_jobs : Number of worker processes. It expects below values:
+                        a) None : Single process, single random stream (default)
+                        b) Positive int : Resamples are split into seeded blocks (see ``block_size``) and spread across
+                                          ``n_jobs`` processes. The result is bit-identical for every value of ``n_jobs``.
+                        c) -1 : Use all the CPUs
+                    ``statistic`` must be picklable (a module level function) when ``n_jobs`` is more than 1.
+        8. block_size : Number of resamples per seeded block when ``n_jobs`` is given (by default 10000)
+
+    Return: Array of ``n_resamples`` bootstrap statistics
+    """
+    data = np.asarray(data,dtype=float)
+    data = data[~np.isnan(data)]
+    rows = _rows_per_chunk(data.shape[0],chunk_size=chunk_size,max_memory_mb=max_memory_mb)
+    if n_jobs is None:
+        rng = np.random.default_rng(seed)
+        return _resample_stats(data,statistic,rng,int(n_resamples),rows)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    return _parallel_resample_stats(data,statistic,seed,int(n_resamples),rows,int(n_jobs),int(block_size))
+
+def _jackknife_stats(data,statistic,max_memory_mb=256):
+    """
+    Description: This function calculates the leave-one-out (jackknife) values of the statistic in memory-capped chunks.
+                 For ``np.mean`` the closed form (sum - x_i)/(n - 1) is used.
+
+    Return: Array of ``n`` jackknife statistics
+    """
+    n_obs = data.shape[0]
+    if statistic is np.mean:
+        return (data.sum() - data) / (n_obs - 1)
+    jack_stats = np.empty(n_obs,dtype=float)
+    base = np.arange(n_obs - 1)
+    rows = _rows_per_chunk(n_obs - 1,max_memory_mb=max_memory_mb)
+    for start in range(0,n_obs,rows):
+        left_out = np.arange(start,min(start + rows,n_obs))
+        # Row i holds every index except i
+        idx = base + (base >= left_out[:,None])
+        jack_stats[start:start + len(left_out)] = statistic(data[idx],axis=-1)
+    return jack_stats
+
+def percentile_ci(boot_stats,loc=0.95):
+    """
+    Description: This function calculates the percentile confidence interval from a bootstrap distribution.
+
+    Input Parameters: It accepts below inputs:
+        1. boot_stats : Bootstrap distribution of the statistic
+        2. loc : Level of confidence (by default 0.95)
+
+    Returns: Lower and Upper confidence limits
+    """
+    alpha_by_2 = (1 - loc) / 2
+    lower, upper = np.percentile(boot_stats,[alpha_by_2 * 100,(1 - alpha_by_2) * 100])
+    return lower, upper
+
+def basic_ci(boot_stats,theta_hat,loc=0.95):
+    """
+    Description: This function calculates the basic (reverse percentile) confidence interval from a bootstrap distribution.
+
+    Input Parameters: It accepts below inputs:
+        1. boot_stats : Bootstrap distribution of the statistic
+        2. theta_hat : Statistic of the parent sample
+        3. loc : Level of confidence (by default 0.95)
+
+    Returns: Lower and Upper confidence limits
+    """
+    lower, upper = percentile_ci(boot_stats,loc=loc)
+    return (2 * theta_hat) - upper, (2 * theta_hat) - lower
+
+def bca_ci(boot_stats,theta_hat,jack_stats,loc=0.95):
+    """
+    Description: This function calculates the bias-corrected and accelerated (BCa) confidence interval.
+
+    Input Parameters: It accepts below inputs:
+        1. boot_stats : Bootstrap distribution of the statistic
+        2. theta_hat : Statistic of the parent sample
+        3. jack_stats : Jackknife (leave-one-out) values of the statistic
+        4. loc : Level of confidence (by default 0.95)
+
+    Returns: Lower and Upper confidence limits
+    """
+    alpha_by_2 = (1 - loc) / 2
+    # Bias correction
+    z0 = z_nm.ppf(np.mean(boot_stats < theta_hat))
+    # Acceleration
+    jack_diff = jack_stats.mean() - jack_stats
+    denom = 6 * (np.sum(jack_diff**2)**1.5)
+    accel = np.sum(jack_diff**3) / denom if denom > 0 else 0.
+
+    z_alpha = z_nm.ppf([alpha_by_2,1 - alpha_by_2])
+    adj_alpha = z_nm.cdf(z0 + (z0 + z_alpha) / (1 - accel * (z0 + z_alpha)))
+    lower, upper = np.percentile(boot_stats,adj_alpha * 100)
+    return lower, upper
+
+def bootstrap_ci(data,statistic=np.mean,n_resamples=10000,loc=0.95,method='percentile',seed=None,chunk_size=None,max_memory_mb=256,
+                 n_jobs=None,block_size=10000):
+    """
+    Description: This function calculates the bootstrap confidence interval of a statistic.
+
+    Input Parameters: It accepts below inputs:
+        1. data : One dimensional array containing the parent sample (NaN's are dropped)
+        2. statistic : Reducing function accepting an ``axis`` keyword (by default ``np.mean``)
+        3. n_resamples : Number of bootstrap resamples (by default 10000)
+        4. loc : Level of confidence (by default 0.95)
+        5. method : Kind of confidence interval. It expects below values:
+                        a) "percentile" : Percentile interval (default)
+                        b) "basic" : Basic or reverse percentile interval
+                        c) "bca" : Bias-corrected and accelerated interval
+        6. seed : Seed, ``numpy.random.SeedSequence`` or ``numpy.random.Generator`` for reproducible results
+        7. chunk_size : Number of resamples generated at a time. It only affects speed and memory, never the result.
+        8. max_memory_mb : Upper bound (in MB) of the memory used by one chunk, per process (by default 256)
+        9. n_jobs : Number of worker processes, see ``bootstrap_distribution`` (by default None i.e. single process)
+        10. block_size : Number of resamples per seeded block when ``n_jobs`` is given (by default 10000)
+
+    Returns:
+        - Lower confidence limit
+        - Upper confidence limit
+        - Bootstrap distribution of the statistic
+    """
+    if method not in ['percentile', 'basic', 'bca']:
+        raise ValueError('invalid method')
+
+    data = np.asarray(data,dtype=float)
+    data = data[~np.isnan(data)]
+    boot_stats = bootstrap_distribution(data,statistic=statistic,n_resamples=n_resamples,seed=seed,
+                                        chunk_size=chunk_size,max_memory_mb=max_memory_mb,n_jobs=n_jobs,block_size=block_size)
+    if method == 'percentile':
+        lower, upper = percentile_ci(boot_stats,loc=loc)
+    else:
+        theta_hat = statistic(data,axis=-1)
+        if method == 'basic':
+            lower, upper = basic_ci(boot_stats,theta_hat,loc=loc)
+        else:
+            jack_stats = _jackknife_stats(data,statistic,max_memory_mb=max_memory_mb)
+            lower, upper = bca_ci(boot_stats,theta_hat,jack_stats,loc=loc)
+    return lower, upper, boot_stats
+
+def _distribution_summary(stats,moments,quantiles):
+    """
+    Description: This function reduces a sampling distribution to the requested moments (``std``/``var`` with ddof 1,
+                 ``kurtosis`` is the excess kurtosis) and quantiles.
+    """
+    summary = {}
+    mean = stats.mean()
+    dev = stats - mean
+    with np.errstate(invalid='ignore',divide='ignore'):
+        m2 = np.mean(dev**2)
+        var = np.sum(dev**2) / (stats.size - 1) if stats.size > 1 else np.nan
+        values = {'mean': mean, 'std': np.sqrt(var), 'var': var,
+                  'skew': np.mean(dev**3) / m2**1.5 if 'skew' in moments else None,
+                  'kurtosis': np.mean(dev**4) / m2**2 - 3 if 'kurtosis' in moments else None}
+    for moment in moments:
+        summary[moment] = values[moment]
+    if len(quantiles):
+        for q, value in zip(quantiles,np.quantile(stats,quantiles)):
+            summary['q{:g}'.format(q)] = value
+    return summary
+
+def sampling_distribution(pop_data,samp_sizes,num_samples=10000,statistic=np.mean,moments=('mean','std'),quantiles=None,
+                          seed=None,chunk_size=None,max_memory_mb=256,n_jobs=None,block_size=10000):
+    """
+    Description: This function simulates the sampling distribution of a statistic (Central Limit Theorem), the library
+                 version of the ``clt`` helper of ``Bootstrapping.ipynb``. For every sample size the ``num_samples``
+                 samples are drawn with replacement from the population as (samples x sample size) index blocks in
+                 memory-capped chunks, reduced with ``statistic`` and only the requested moments and quantiles of the
+                 sampling distribution are returned -- neither the samples nor the loop over them are kept.
+
+    Input Parameters: It accepts below inputs:
+        1. pop_data : One dimensional array containing the population (NaN's are dropped)
+        2. samp_sizes : Sample size, or list of sample sizes swept in one call
+        3. num_samples : Number of samples drawn for every sample size (by default 10000)
+        4. statistic : Reducing function accepting an ``axis`` keyword (by default ``np.mean``)
+        5. moments : Moments of the sampling distribution, any of ``SAMPLING_MOMENTS`` (by default mean and std)
+        6. quantiles : Optional list of quantiles of the sampling distribution, e.g. [0.025, 0.975]
+        7. seed : Seed or ``numpy.random.SeedSequence``. Every sample size gets its own spawned child, so its result
+                  does not depend on the other sizes of the sweep.
+        8. chunk_size : Number of samples generated at a time. It only affects speed and memory, never the result.
+        9. max_memory_mb : Upper bound (in MB) of the memory used by one chunk, per process (by default 256)
+        10. n_jobs : Number of worker processes, see ``bootstrap_distribution`` (by default None i.e. single process)
+        11. block_size : Number of samples per seeded block when ``n_jobs`` is given (by default 10000)
+
+    Return: DataFrame indexed by the sample size with one column per moment and quantile (e.g. "q0.025")
+    """
+    moments = list(moments)
+    if any(moment not in SAMPLING_MOMENTS for moment in moments):
+        raise ValueError('invalid moment')
+    quantiles = [] if quantiles is None else list(quantiles)
+    pop_data = np.asarray(pop_data,dtype=float)
+    pop_data = pop_data[~np.isnan(pop_data)]
+    sizes = [int(size) for size in np.atleast_1d(samp_sizes)]
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    seed_seq = seed if isinstance(seed,np.random.SeedSequence) else np.random.SeedSequence(seed)
+    rows = {}
+    for size, size_seed in zip(sizes,seed_seq.spawn(len(sizes))):
+        n_rows = _rows_per_chunk(size,chunk_size=chunk_size,max_memory_mb=max_memory_mb)
+        if n_jobs is None:
+            stats = _resample_stats(pop_data,statistic,np.random.default_rng(size_seed),int(num_samples),n_rows,size)
+        else:
+            stats = _parallel_resample_stats(pop_data,statistic,size_seed,int(num_samples),n_rows,int(n_jobs),
+                                             int(block_size),size)
+        rows[size] = _distribution_summary(stats,moments,quantiles)
+    return pd.DataFrame.from_dict(rows,orient='index').rename_axis('samp_size')
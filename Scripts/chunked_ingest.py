@@ -0,0 +1,152 @@
+# Importing Packages
+import re
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from .accumulators import grouped_moments
+from .stats_tests import one_porportion_ztest, ztest_notpooled, f_dist_test
+
+def iter_csv_chunks(path,usecols,dtype=None,chunksize=1000000,engine='pandas'):
+    """
+    Description: This function reads a CSV file in chunks, parsing only the needed columns, so the peak memory is bounded
+                 by the chunk size and not by the file size.
+
+    Input Parameters: It accepts below inputs:
+        1. path : Path of the CSV file
+        2. usecols : List of columns to be parsed, every other column is skipped by the parser
+        3. dtype : Optional dictionary of column dtypes (e.g. {'State': 'category', 'Positive': 'float64'})
+        4. chunksize : Number of rows per chunk for the pandas engine, approximate for pyarrow (by default 1e6)
+        5. engine : CSV reader to be used. It expects below values:
+                        a) "pandas" : ``pd.read_csv(chunksize=...)`` (default)
+                        b) "pyarrow" : Streaming ``pyarrow.csv.open_csv`` reader (requires pyarrow)
+
+    Return: Generator of Pandas DataFrame chunks having only ``usecols``
+    """
+    if engine == 'pandas':
+        for chunk in pd.read_csv(path,usecols=usecols,dtype=dtype,chunksize=chunksize):
+            yield chunk
+    elif engine == 'pyarrow':
+        try:
+            from pyarrow import csv as pa_csv
+        except ImportError as import_error:
+            raise ImportError('engine="pyarrow" requires the pyarrow package') from import_error
+        # Rough block size so one record batch holds about ``chunksize`` rows
+        read_options = pa_csv.ReadOptions(block_size=max(1 << 20,int(chunksize) * 64))
+        convert_options = pa_csv.ConvertOptions(include_columns=list(usecols))
+        reader = pa_csv.open_csv(path,read_options=read_options,convert_options=convert_options)
+        for batch in reader:
+            chunk = batch.to_pandas()
+            if dtype is not None:
+                chunk = chunk.astype(dtype)
+            yield chunk
+    else:
+        raise ValueError('invalid engine')
+
+def _query_columns(path,query):
+    """
+    Description: This function returns the columns of a CSV file referenced by a ``DataFrame.query`` string, read from
+                 the header line only. A column counts as referenced when its name appears in the query as a whole word
+                 or between backticks.
+    """
+    header = pd.read_csv(path,nrows=0).columns
+    return [col for col in header if '`{}`'.format(col) in query
+            or re.search(r'(?<![\w.]){}(?!\w)'.format(re.escape(str(col))),query)]
+
+def read_grouped_moments(path,group_col,value_col=None,ratio_cols=None,dtype=None,chunksize=1000000,engine='pandas',query=None,
+                         query_cols=None):
+    """
+    Description: This function streams a CSV file and accumulates per-group sufficient statistics (count, mean, M2)
+                 of one value column, e.g. the per-state daily positivity rate of ``StatewiseTestingDetails.csv``.
+
+    Input Parameters: It accepts below inputs:
+        1. path : Path of the CSV file
+        2. group_col : Column holding the group key (e.g. 'State')
+        3. value_col : Column holding the observations. Either this or ``ratio_cols`` has to be given.
+        4. ratio_cols : Tuple of (numerator column, denominator column). The observation of every row is numerator/denominator
+                        (e.g. ('Positive','TotalSamples') for the positivity rate). Rows with a zero denominator are skipped.
+        5. dtype : Optional dictionary of column dtypes passed to the reader
+        6. chunksize : Number of rows per chunk (by default 1e6)
+        7. engine : CSV reader, "pandas" (default) or "pyarrow"
+        8. query : Optional ``DataFrame.query`` string applied on every chunk (e.g. "Date >= '2021-01-01'")
+        9. query_cols : Columns referenced by ``query``. By default they are found in the header of the file. Only
+                        these columns are parsed on top of the group and value columns.
+
+    Return: ``grouped_moments`` accumulator having one entry per group
+    """
+    if (value_col is None) == (ratio_cols is None):
+        raise ValueError('give exactly one of value_col or ratio_cols')
+    value_cols = [value_col] if value_col is not None else list(ratio_cols)
+    usecols = [group_col] + value_cols
+    if query is not None:
+        # Columns referenced in the query have to be parsed as well
+        query_cols = _query_columns(path,query) if query_cols is None else list(query_cols)
+        usecols += [col for col in query_cols if col not in usecols]
+
+    moments = grouped_moments()
+    for chunk in iter_csv_chunks(path,usecols=usecols,dtype=dtype,chunksize=chunksize,engine=engine):
+        if query is not None:
+            chunk = chunk.query(query)
+        if value_col is not None:
+            values = np.asarray(chunk[value_col],dtype=float)
+        else:
+            denom = np.asarray(chunk[ratio_cols[1]],dtype=float)
+            with np.errstate(invalid='ignore',divide='ignore'):
+                values = np.where(denom > 0,np.asarray(chunk[ratio_cols[0]],dtype=float) / denom,np.nan)
+        moments.update(chunk[group_col],values)
+    return moments
+
+def grouped_two_pop_tests(moments,pairs=None,reference=None,test='ztest',value=0,alternative='two-sided',loc=0.95):
+    """
+    Description: This function runs a two-population test from ``stats_tests`` for pairs of groups using only the
+                 accumulated sufficient statistics (e.g. state vs. state positivity rates).
+
+    Input Parameters: It accepts below inputs:
+        1. moments : ``grouped_moments`` accumulator (e.g. from ``read_grouped_moments``)
+        2. pairs : Optional list of (group1, group2) tuples to be tested
+        3. reference : Optional group tested against every other group. If neither ``pairs`` nor ``reference`` is given,
+                       every pair of groups is tested.
+        4. test : Kind of test. It expects below values:
+                    a) "ztest" : ``ztest_notpooled`` on the group means (default)
+                    b) "ftest" : ``f_dist_test`` on the group variances
+        5. value : Difference in means under the Null Hypothesis (ztest only)
+        6. alternative : Kind of tail test -- "two-sided" (default), "larger" or "smaller"
+        7. loc : Level of confidence (ftest only)
+
+    Return: DataFrame with one row per pair -- group1, group2, n1, n2, test_stat and p_value
+    """
+    if test not in ['ztest', 'ftest']:
+        raise ValueError('invalid test')
+    if pairs is None:
+        if reference is not None:
+            pairs = [(reference, label) for label in moments.labels if label != reference]
+        else:
+            pairs = list(combinations(moments.labels,2))
+
+    rows = []
+    for grp1, grp2 in pairs:
+        acc1, acc2 = moments.get(grp1), moments.get(grp2)
+        if test == 'ztest':
+            test_stat, p_value = ztest_notpooled(acc1,acc2,value=value,alternative=alternative)
+        else:
+            test_stat, p_value = f_dist_test(acc1,acc2,loc=loc,alternative=alternative)[:2]
+        rows.append((grp1,grp2,acc1.count,acc2.count,test_stat,p_value))
+    return pd.DataFrame(rows,columns=['group1','group2','n1','n2','test_stat','p_value'])
+
+def grouped_proportion_tests(moments,pop_proportion,alternative='two-sided'):
+    """
+    Description: This function runs ``one_porportion_ztest`` for every group of a ``grouped_moments`` accumulator of
+                 sample proportions against the proportion accepted as the Null Hypothesis.
+
+    Input Parameters: It accepts below inputs:
+        1. moments : ``grouped_moments`` accumulator of sample proportions
+        2. pop_proportion : Proportion accepted as the Null Hypothesis
+        3. alternative : Kind of tail test -- "smaller", "larger" or "two-sided" (default)
+
+    Return: DataFrame indexed by group with n, test_stat and p_value columns
+    """
+    rows = []
+    for label in moments.labels:
+        acc = moments.get(label)
+        test_stat, p_value = one_porportion_ztest(acc,pop_proportion,alternative=alternative)
+        rows.append((acc.count,test_stat,p_value))
+    return pd.DataFrame(rows,columns=['n','test_stat','p_value'],index=pd.Index(moments.labels,name='group'))
@@ -0,0 +1,207 @@
+# Importing Packages
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Default location of the cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'),'.cache','statistical_testing_python')
+
+def _file_digest(path,block_size=2**20):
+    """
+    Description: This function returns the BLAKE2b digest of the content of a file, read in blocks.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path,'rb') as source:
+        for block in iter(lambda: source.read(block_size),b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_source(path,read_kwargs):
+    """
+    Description: This function parses a source file, ``pd.read_excel`` for .xls/.xlsx files and ``pd.read_csv`` otherwise.
+    """
+    if os.path.splitext(path)[1].lower() in ['.xls', '.xlsx']:
+        return pd.read_excel(path,**read_kwargs)
+    return pd.read_csv(path,**read_kwargs)
+
+def _column_array(series):
+    """
+    Description: This function converts a column into the array stored in the cache. Numeric, boolean and datetime columns
+                 keep their dtype, text columns become fixed-width unicode arrays (missing values are stored as '').
+
+    Returns:
+        - NumPy array
+        - Kind of column ("numeric" or "text")
+    """
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series) or pd.api.types.is_datetime64_dtype(series):
+        return series.to_numpy(), 'numeric'
+    return np.asarray(series.fillna('').astype(str).to_numpy(),dtype=str), 'text'
+
+def _write_entry(frame,entry_dir,engine,compression):
+    """
+    Description: This function writes the parsed DataFrame in the columnar format of the cache, one ``.npy`` file per column
+                 or one Arrow IPC file, and returns the column metadata.
+    """
+    columns = []
+    if engine == 'npy':
+        for pos, name in enumerate(frame.columns):
+            values, kind = _column_array(frame[name])
+            file_name = 'col_{}.npy'.format(pos)
+            np.save(os.path.join(entry_dir,file_name),values,allow_pickle=False)
+            columns.append({'name': str(name), 'file': file_name, 'kind': kind, 'dtype': values.dtype.str})
+        return columns
+
+    # pyarrow is only needed for the Arrow engine
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    arrays, names = [], []
+    for name in frame.columns:
+        values, kind = _column_array(frame[name])
+        arrays.append(pa.array(values))
+        names.append(str(name))
+        columns.append({'name': str(name), 'kind': kind, 'dtype': values.dtype.str})
+    table = pa.Table.from_arrays(arrays,names=names)
+    options = pa_ipc.IpcWriteOptions(compression=compression)
+    with pa_ipc.new_file(os.path.join(entry_dir,'data.arrow'),table.schema,options=options) as writer:
+        writer.write_table(table)
+    return columns
+
+def _pointer_path(cache_dir,path):
+    """
+    Description: This function returns the file remembering the last known size, modification time and digest of a source,
+                 and its cache entries by parsing options.
+    """
+    source_key = hashlib.blake2b(os.path.abspath(path).encode(),digest_size=16).hexdigest()
+    return os.path.join(cache_dir,'sources',source_key + '.json')
+
+def cache_dataset(path,cache_dir=None,engine='npy',compression=None,read_kwargs=None):
+    """
+    Description: This function converts a CSV/XLS source once into the columnar cache and returns the cache entry.
+                 The entry is keyed by the content hash of the source (plus the engine and the parsing options), so any
+                 change of the source gives a new entry and the stale ones are removed. The hash is only recomputed when
+                 the size or the modification time of the source changed.
+
+    Input Parameters: It accepts below inputs:
+        1. path : Path of the source (.csv, .txt, .xls or .xlsx)
+        2. cache_dir : Cache directory (by default ``DEFAULT_CACHE_DIR``)
+        3. engine : Storage format. It expects below values:
+                        a) "npy" : One ``.npy`` file per column, memory-mapped on load (default)
+                        b) "arrow" : One Arrow IPC file (needs ``pyarrow``), memory-mapped on load
+        4. compression : Arrow IPC compression ("lz4" or "zstd"). Compressed files are smaller but are decompressed on
+                         load, i.e. not zero-copy. Ignored by the "npy" engine.
+        5. read_kwargs : Dictionary of keyword arguments of ``pd.read_csv``/``pd.read_excel``
+
+    Return: Path of the cache entry directory
+    """
+    if engine not in ['npy', 'arrow']:
+        raise ValueError('invalid engine')
+    cache_dir = DEFAULT_CACHE_DIR if cache_dir is None else cache_dir
+    read_kwargs = {} if read_kwargs is None else read_kwargs
+    pointer_path = _pointer_path(cache_dir,path)
+    stat = os.stat(path)
+
+    pointer = None
+    if os.path.exists(pointer_path):
+        with open(pointer_path) as pointer_file:
+            pointer = json.load(pointer_file)
+    if pointer is not None and pointer['size'] == stat.st_size and pointer['mtime_ns'] == stat.st_mtime_ns:
+        digest = pointer['digest']
+    else:
+        digest = _file_digest(path)
+
+    options_key = hashlib.blake2b(json.dumps([engine,compression,read_kwargs],sort_keys=True,default=str).encode(),
+                                  digest_size=8).hexdigest()
+    entry_key = '{}-{}'.format(digest,options_key)
+    entry_dir = os.path.join(cache_dir,'entries',entry_key)
+
+    if not os.path.exists(os.path.join(entry_dir,'meta.json')):
+        frame = _read_source(path,read_kwargs)
+        os.makedirs(os.path.join(cache_dir,'entries'),exist_ok=True)
+        # Written in a temporary directory and renamed, so a reader never sees a partial entry
+        tmp_dir = tempfile.mkdtemp(dir=os.path.join(cache_dir,'entries'))
+        try:
+            columns = _write_entry(frame,tmp_dir,engine,compression)
+            meta = {'source': os.path.abspath(path), 'digest': digest, 'engine': engine, 'compression': compression,
+                    'n_rows': len(frame), 'columns': columns}
+            with open(os.path.join(tmp_dir,'meta.json'),'w') as meta_file:
+                json.dump(meta,meta_file,indent=2)
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.replace(tmp_dir,entry_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir,ignore_errors=True)
+            raise
+
+    # Invalidation :: the entries of the previous content of this source are removed, the entries of the current
+    # content with other options (engine, compression, read_kwargs) are kept
+    entries = {} if pointer is None else dict(pointer.get('entries',{}))
+    if pointer is not None and pointer['digest'] != digest:
+        for stale_key in entries.values():
+            shutil.rmtree(os.path.join(cache_dir,'entries',stale_key),ignore_errors=True)
+        entries = {}
+    if pointer is None or [entries.get(options_key),pointer['size'],pointer['mtime_ns']] != [entry_key,stat.st_size,stat.st_mtime_ns]:
+        entries[options_key] = entry_key
+        os.makedirs(os.path.dirname(pointer_path),exist_ok=True)
+        with open(pointer_path,'w') as pointer_file:
+            json.dump({'source': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                       'digest': digest, 'entries': entries},pointer_file)
+    return entry_dir
+
+def load_columns(path,cache_dir=None,engine='npy',compression=None,read_kwargs=None):
+    """
+    Description: This function returns the columns of a source from the cache (converting it first if needed) as
+                 read-only memory-mapped NumPy arrays. Nothing is parsed or copied, the OS pages the data in on access.
+                 These arrays can be given directly to the tests of ``stats_tests``/``batched_tests``.
+
+    Input Parameters: It accepts the same inputs as ``cache_dataset``.
+
+    Return: Dictionary {column name: array} in the column order of the source
+    """
+    entry_dir = cache_dataset(path,cache_dir=cache_dir,engine=engine,compression=compression,read_kwargs=read_kwargs)
+    with open(os.path.join(entry_dir,'meta.json')) as meta_file:
+        meta = json.load(meta_file)
+    if meta['engine'] == 'npy':
+        return {col['name']: np.load(os.path.join(entry_dir,col['file']),mmap_mode='r') for col in meta['columns']}
+
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    table = pa_ipc.open_file(pa.memory_map(os.path.join(entry_dir,'data.arrow'),'r')).read_all()
+    columns = {}
+    for col in meta['columns']:
+        chunked = table.column(col['name'])
+        if col['kind'] == 'numeric' and chunked.num_chunks == 1 and chunked.null_count == 0:
+            columns[col['name']] = chunked.chunk(0).to_numpy(zero_copy_only=True)
+        else:
+            columns[col['name']] = np.asarray(chunked.to_numpy(),dtype=col['dtype'])
+    return columns
+
+def load_dataset(path,cache_dir=None,engine='npy',compression=None,read_kwargs=None):
+    """
+    Description: This function is the cached replacement of ``pd.read_csv``/``pd.read_excel``. The DataFrame is built on
+                 top of the memory-mapped columns of ``load_columns``, one block per column, so the numeric columns are
+                 not copied (text columns become object columns, which pandas always copies).
+
+    Input Parameters: It accepts the same inputs as ``cache_dataset``.
+
+    Return: Pandas DataFrame
+    """
+    columns = load_columns(path,cache_dir=cache_dir,engine=engine,compression=compression,read_kwargs=read_kwargs)
+    series = [pd.Series(values,name=name,copy=False) for name, values in columns.items()]
+    if not series:
+        return pd.DataFrame()
+    # One block per column: the frame is never consolidated, which would copy the mapped columns into one array.
+    # pandas >= 3 never copies here (copy-on-write) and deprecates the ``copy`` keyword.
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return pd.concat(series,axis=1)
+    return pd.concat(series,axis=1,copy=False)
+
+def clear_cache(cache_dir=None):
+    """
+    Description: This function removes every entry of the cache.
+    """
+    cache_dir = DEFAULT_CACHE_DIR if cache_dir is None else cache_dir
+    shutil.rmtree(cache_dir,ignore_errors=True)
@@ -0,0 +1,186 @@
+# Importing Packages
+from functools import lru_cache
+import numpy as np
+
+# Distributions served by the cache
+DISTRIBUTIONS = ['norm', 'chi2', 'f', 't']
+
+# Absolute error tolerated by the interpolated p-value tables
+PVALUE_TABLE_TOL = 1e-6
+
+_settings = {'use_tables': False, 'maxsize': 4096}
+
+def _dof_key(dof):
+    """
+    Description: This function turns the degrees of freedom (None, scalar or tuple) into a hashable tuple.
+    """
+    if dof is None:
+        return ()
+    if np.ndim(dof) == 0:
+        return (float(dof),)
+    return tuple(float(val) for val in dof)
+
+def _distribution(dist):
+    """
+    Description: This function returns the ``scipy.stats`` distribution object. ``scipy.stats`` (about a second to import)
+                 is only loaded here, i.e. for critical values, p-value tables and unusual degrees of freedom.
+    """
+    if dist not in DISTRIBUTIONS:
+        raise ValueError('invalid distribution')
+    import scipy.stats as scipy_stats
+    return getattr(scipy_stats,dist)
+
+def _exact(dist,x,dof,upper=False):
+    """
+    Description: This function evaluates the exact CDF (or survival function when ``upper``) with the ``scipy.special``
+                 functions that ``scipy.stats`` itself calls for these distributions (same values, a fraction of the
+                 import and call cost). Degrees of freedom that are not finite and positive go through ``scipy.stats``.
+    """
+    if all(0 < val < np.inf for val in dof) and dist in DISTRIBUTIONS:
+        import scipy.special as special
+        x = np.asarray(x,dtype=float)
+        if dist == 'norm':
+            return special.ndtr(-x) if upper else special.ndtr(x)
+        if dist == 't':
+            return special.stdtr(dof[0],-x) if upper else special.stdtr(dof[0],x)
+        # Outside of the support (x < 0) the CDF is 0 as in ``scipy.stats``
+        x = np.maximum(x,0.)
+        if dist == 'chi2':
+            return special.chdtrc(dof[0],x) if upper else special.chdtr(dof[0],x)
+        return special.fdtrc(dof[0],dof[1],x) if upper else special.fdtr(dof[0],dof[1],x)
+    distribution = _distribution(dist)
+    return distribution.sf(x,*dof) if upper else distribution.cdf(x,*dof)
+
+def _critical_values(dist,dof,loc,tail):
+    """
+    Description: This function inverts the CDF for the critical value(s) of a test. It is wrapped by an LRU cache.
+
+    Input Parameters: It accepts below inputs:
+        1. dist : Name of the distribution -- "norm", "chi2", "f" or "t"
+        2. dof : Tuple of degrees of freedom (empty for "norm")
+        3. loc : Level of confidence
+        4. tail : "left", "right" or "two-sided"
+
+    Return: Critical value for one tail tests, (left, right) critical values for the two-sided test
+    """
+    distribution = _distribution(dist)
+    alpha = 1 - loc
+    if tail == 'left':
+        return float(distribution.ppf(alpha,*dof))
+    if tail == 'right':
+        return float(distribution.ppf(loc,*dof))
+    if tail == 'two-sided':
+        return float(distribution.ppf(alpha/2,*dof)), float(distribution.ppf(1 - alpha/2,*dof))
+    raise ValueError('invalid tail')
+
+def _build_pvalue_table(dist,dof,tol):
+    """
+    Description: This function tabulates the CDF of a distribution on a grid between its 1e-10 and 1 - 1e-10 quantiles.
+                 The grid is refined until the linear interpolation error checked at the mid-points is below ``tol``.
+                 It is wrapped by an LRU cache.
+
+    Return: Tuple (grid, cdf values), or None when the tolerance cannot be met with 2**16 points (the exact CDF is used then)
+    """
+    distribution = _distribution(dist)
+    lower, upper = distribution.ppf([1e-10,1 - 1e-10],*dof)
+    n_points = 1025
+    while n_points <= 2**16 + 1:
+        grid = np.linspace(lower,upper,n_points)
+        cdf_vals = distribution.cdf(grid,*dof)
+        mid = (grid[1:] + grid[:-1]) / 2
+        error = np.max(np.abs(distribution.cdf(mid,*dof) - (cdf_vals[1:] + cdf_vals[:-1]) / 2))
+        if error <= tol:
+            return grid, cdf_vals
+        n_points = (n_points - 1) * 2 + 1
+    return None
+
+_critical_cache = lru_cache(maxsize=_settings['maxsize'])(_critical_values)
+_table_cache = lru_cache(maxsize=256)(_build_pvalue_table)
+
+def set_cache_size(maxsize):
+    """
+    Description: This function changes the LRU bound of the critical value cache (the cache is emptied).
+    """
+    global _critical_cache
+    _settings['maxsize'] = maxsize
+    _critical_cache = lru_cache(maxsize=maxsize)(_critical_values)
+
+def use_pvalue_tables(flag=True):
+    """
+    Description: This function switches the interpolated p-value tables on or off (off by default). When on, ``cdf`` and
+                 ``sf`` interpolate the tabulated CDF of the (distribution, dof) with an absolute error of at most
+                 ``PVALUE_TABLE_TOL`` inside the tabulated range and fall back to the exact function outside of it.
+    """
+    _settings['use_tables'] = bool(flag)
+
+def clear_cache():
+    """
+    Description: This function empties the critical value and p-value table caches and resets their counters.
+    """
+    _critical_cache.cache_clear()
+    _table_cache.cache_clear()
+
+def cache_info():
+    """
+    Description: This function returns the hit/miss counters of the caches.
+    Return: Dictionary {'critical_values': {...}, 'pvalue_tables': {...}} with hits, misses, maxsize and currsize
+    """
+    return {name: cache.cache_info()._asdict()
+            for name, cache in [('critical_values',_critical_cache),('pvalue_tables',_table_cache)]}
+
+def critical_value(dist,loc,tail,dof=None):
+    """
+    Description: This function returns the memoized critical value(s) of a test, keyed on (distribution, dof, loc, tail).
+
+    Input Parameters: It accepts below inputs:
+        1. dist : Name of the distribution -- "norm", "chi2", "f" or "t"
+        2. loc : Level of confidence
+        3. tail : "left", "right" or "two-sided"
+        4. dof : Degrees of freedom -- None for "norm", a number for "chi2"/"t" and (dof1, dof2) for "f"
+
+    Return: Critical value for one tail tests, (left, right) critical values for the two-sided test
+    """
+    return _critical_cache(dist,_dof_key(dof),float(loc),tail)
+
+def _tabulated(dist,x,dof):
+    """
+    Description: This function interpolates the CDF from the cached table when tables are switched on.
+    Return: Array of CDF values with NaN where the table cannot be used, or None if no table applies
+    """
+    if not _settings['use_tables']:
+        return None
+    table = _table_cache(dist,dof,PVALUE_TABLE_TOL)
+    if table is None:
+        return None
+    grid, cdf_vals = table
+    x = np.asarray(x,dtype=float)
+    inside = (x >= grid[0]) & (x <= grid[-1])
+    return np.where(inside,np.interp(x,grid,cdf_vals),np.nan)
+
+def cdf(dist,x,dof=None):
+    """
+    Description: This function returns the CDF (left tail p-value) of ``x`` without building a frozen distribution.
+    """
+    dof = _dof_key(dof)
+    approx = _tabulated(dist,x,dof)
+    if approx is None:
+        return _exact(dist,x,dof)
+    exact_needed = np.isnan(approx)
+    if exact_needed.any():
+        approx = np.where(exact_needed,_exact(dist,x,dof),approx)
+    return approx if np.ndim(approx) else float(approx)
+
+def sf(dist,x,dof=None):
+    """
+    Description: This function returns the survival function (right tail p-value) of ``x`` without building a frozen distribution.
+    """
+    dof = _dof_key(dof)
+    approx = _tabulated(dist,x,dof)
+    if approx is None:
+        return _exact(dist,x,dof,upper=True)
+    exact_needed = np.isnan(approx)
+    if exact_needed.any():
+        approx = np.where(exact_needed,_exact(dist,x,dof,upper=True),1. - approx)
+    else:
+        approx = 1. - approx
+    return approx if np.ndim(approx) else float(approx)
@@ -0,0 +1,201 @@
+# Importing Packages
+import json
+import time
+from contextlib import contextmanager
+from . import dist_cache
+
+# Instrumentation is off by default, the hooks then only cost one call returning None
+_settings = {'enabled': False}
+# Records of every instrumented function {name: {...}}, see ``snapshot``
+_records = {}
+
+class _call_timer:
+    """
+    Description: This class times the phases of one call of an instrumented function. It is created by ``start`` only
+                 when the instrumentation is enabled.
+    """
+    __slots__ = ('name','input_size','start','last','phases','cache_hits','cache_misses')
+
+    def __init__(self,name,input_size):
+        """
+        Description: This function is created for starting the clock of one call and remembering the counters of the
+                     ``dist_cache`` critical value cache, so the hits of this call can be attributed to it.
+        """
+        info = dist_cache._critical_cache.cache_info()
+        self.name = name
+        self.input_size = input_size
+        self.cache_hits = info.hits
+        self.cache_misses = info.misses
+        self.phases = []
+        self.start = self.last = time.perf_counter()
+
+    def mark(self,phase):
+        """
+        Description: This function closes the current phase -- the time since the previous mark (or the start) is
+                     booked under ``phase``.
+        """
+        now = time.perf_counter()
+        self.phases.append((phase,now - self.last))
+        self.last = now
+
+    def finish(self,phase=None):
+        """
+        Description: This function closes the last phase (when ``phase`` is given) and adds the call to the records of
+                     its function.
+        """
+        if phase is not None:
+            self.mark(phase)
+        info = dist_cache._critical_cache.cache_info()
+        record = _records.get(self.name)
+        if record is None:
+            record = _records[self.name] = {'calls': 0, 'seconds': 0., 'input_size': 0, 'max_input_size': 0,
+                                            'cache_hits': 0, 'cache_misses': 0, 'phases': {}}
+        record['calls'] += 1
+        record['seconds'] += self.last - self.start
+        if self.input_size is not None:
+            record['input_size'] += int(self.input_size)
+            record['max_input_size'] = max(record['max_input_size'],int(self.input_size))
+        record['cache_hits'] += info.hits - self.cache_hits
+        record['cache_misses'] += info.misses - self.cache_misses
+        for name, seconds in self.phases:
+            phase_record = record['phases'].setdefault(name,{'calls': 0, 'seconds': 0.})
+            phase_record['calls'] += 1
+            phase_record['seconds'] += seconds
+
+def enable(flag=True):
+    """
+    Description: This function switches the instrumentation on or off (off by default).
+    """
+    _settings['enabled'] = bool(flag)
+
+def is_enabled():
+    """
+    Description: This function returns True when the instrumentation is on.
+    """
+    return _settings['enabled']
+
+def reset():
+    """
+    Description: This function clears the records of every function.
+    """
+    _records.clear()
+
+def start(name,input_size=None):
+    """
+    Description: This function is the hook called at the top of an instrumented function. Phases are then closed with
+                 ``timer.mark(phase)`` and the call with ``timer.finish(phase)``, both guarded by ``timer is not None``.
+
+    Input Parameters: It accepts below inputs:
+        1. name : Name of the function
+        2. input_size : Number of observations of the call (optional)
+
+    Return: Timer of the call, or None when the instrumentation is off
+    """
+    if not _settings['enabled']:
+        return None
+    return _call_timer(name,input_size)
+
+def snapshot():
+    """
+    Description: This function returns the records of every function and the counters of the ``dist_cache`` caches.
+
+    Return: Dictionary {'functions': {name: {calls, seconds, input_size, max_input_size, cache_hits, cache_misses,
+            phases: {phase: {calls, seconds}}}}, 'dist_cache': ``dist_cache.cache_info()``}
+    """
+    functions = {name: dict(record,phases={phase: dict(values) for phase, values in record['phases'].items()})
+                 for name, record in _records.items()}
+    return {'functions': functions, 'dist_cache': dist_cache.cache_info()}
+
+def to_prometheus(snap=None,prefix='stats_tests'):
+    """
+    Description: This function formats a snapshot in the Prometheus text exposition format.
+
+    Input Parameters: It accepts below inputs:
+        1. snap : Snapshot (by default the current one, see ``snapshot``)
+        2. prefix : Prefix of the metric names
+
+    Return: Text of the metrics
+    """
+    snap = snapshot() if snap is None else snap
+    metrics = [('calls_total','counter','Number of calls',[]),
+               ('seconds_total','counter','Wall time of the calls in seconds',[]),
+               ('input_size_total','counter','Number of observations given to the calls',[]),
+               ('input_size_max','gauge','Largest number of observations of one call',[]),
+               ('cache_hits_total','counter','Critical value cache hits of the calls',[]),
+               ('cache_misses_total','counter','Critical value cache misses of the calls',[]),
+               ('phase_calls_total','counter','Number of times a phase was run',[]),
+               ('phase_seconds_total','counter','Wall time of a phase in seconds',[]),
+               ('dist_cache_hits_total','counter','Hits of the dist_cache caches',[]),
+               ('dist_cache_misses_total','counter','Misses of the dist_cache caches',[]),
+               ('dist_cache_size','gauge','Number of entries of the dist_cache caches',[])]
+    samples = {name: values for name, _, _, values in metrics}
+    for name, record in sorted(snap['functions'].items()):
+        label = 'function="{}"'.format(name)
+        for metric, key in [('calls_total','calls'),('seconds_total','seconds'),('input_size_total','input_size'),
+                            ('input_size_max','max_input_size'),('cache_hits_total','cache_hits'),
+                            ('cache_misses_total','cache_misses')]:
+            samples[metric].append((label,record[key]))
+        for phase, values in sorted(record['phases'].items()):
+            phase_label = '{},phase="{}"'.format(label,phase)
+            samples['phase_calls_total'].append((phase_label,values['calls']))
+            samples['phase_seconds_total'].append((phase_label,values['seconds']))
+    for cache, info in sorted(snap['dist_cache'].items()):
+        label = 'cache="{}"'.format(cache)
+        samples['dist_cache_hits_total'].append((label,info['hits']))
+        samples['dist_cache_misses_total'].append((label,info['misses']))
+        samples['dist_cache_size'].append((label,info['currsize']))
+
+    lines = []
+    for name, kind, help_text, values in metrics:
+        if not values:
+            continue
+        metric_name = '{}_{}'.format(prefix,name)
+        lines += ['# HELP {} {}'.format(metric_name,help_text), '# TYPE {} {}'.format(metric_name,kind)]
+        lines += ['{}{{{}}} {}'.format(metric_name,label,repr(float(value))) for label, value in values]
+    return '\n'.join(lines) + '\n'
+
+def export_snapshot(path,fmt='json',snap=None):
+    """
+    Description: This function writes a snapshot to a file.
+
+    Input Parameters: It accepts below inputs:
+        1. path : Path of the output file
+        2. fmt : "json" (default) or "prometheus" (text exposition format, e.g. for the node exporter textfile collector)
+        3. snap : Snapshot (by default the current one, see ``snapshot``)
+
+    Return: The snapshot written
+    """
+    if fmt not in ['json', 'prometheus']:
+        raise ValueError('invalid format')
+    snap = snapshot() if snap is None else snap
+    with open(path,'w') as out_file:
+        if fmt == 'json':
+            json.dump(snap,out_file,indent=2,sort_keys=True)
+        else:
+            out_file.write(to_prometheus(snap))
+    return snap
+
+@contextmanager
+def profiling(path=None,fmt='json'):
+    """
+    Description: This function is a context manager profiling the enclosed block (e.g. one batch job). The records are
+                 cleared and the instrumentation switched on when entering it, and the previous state is restored when
+                 leaving it. Calls made in worker processes are not recorded.
+
+    Input Parameters: It accepts below inputs:
+        1. path : Optional file receiving the snapshot when leaving the block
+        2. fmt : "json" (default) or "prometheus", see ``export_snapshot``
+
+    Return: Dictionary filled with the snapshot of the block when leaving it
+    """
+    was_enabled = _settings['enabled']
+    reset()
+    enable()
+    profile = {}
+    try:
+        yield profile
+    finally:
+        _settings['enabled'] = was_enabled
+        profile.update(snapshot())
+        if path is not None:
+            export_snapshot(path,fmt=fmt,snap=profile)
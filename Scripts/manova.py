@@ -0,0 +1,189 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+import scipy.stats as scipy_stats
+
+# Names of the multivariate statistics, as in statsmodels' ``mv_test``
+STATISTICS = ["Wilks' lambda", "Pillai's trace", "Hotelling-Lawley trace", "Roy's greatest root"]
+
+def design_matrix(data,terms,categorical=None):
+    """
+    Description: This function builds the design matrix of a linear model once, like the formula interfaces of
+                 statsmodels: an intercept, numeric terms (covariates) as they are and categorical terms treatment coded
+                 against their first (sorted) level.
+
+    Input Parameters: It accepts below inputs:
+        1. data : Pandas DataFrame
+        2. terms : List of the columns used as terms (factors and covariates)
+        3. categorical : List of the terms to be treated as categorical. By default the non-numeric ones.
+
+    Returns:
+        - Design matrix (observations x parameters)
+        - Dictionary {term name: list of its parameter columns}, starting with 'Intercept'
+        - List of parameter names
+    """
+    if categorical is None:
+        categorical = [term for term in terms if not pd.api.types.is_numeric_dtype(data[term])]
+    columns = [np.ones(len(data))]
+    names = ['Intercept']
+    term_cols = {'Intercept': [0]}
+    for term in terms:
+        if term in categorical:
+            codes, levels = pd.factorize(data[term],sort=True)
+            dummies = (codes[:,None] == np.arange(1,len(levels))).astype(float)
+            term_name = 'C({})'.format(term)
+            term_cols[term_name] = list(range(len(names),len(names) + dummies.shape[1]))
+            names += ['{}[T.{}]'.format(term_name,level) for level in levels[1:]]
+            columns += list(dummies.T)
+        else:
+            term_cols[term] = [len(names)]
+            names.append(term)
+            columns.append(np.asarray(data[term],dtype=float))
+    return np.column_stack(columns), term_cols, names
+
+def _multivariate_stats(theta,p,q,df_resid,tolerance=1e-8):
+    """
+    Description: This function calculates the four multivariate statistics and their F approximations for a batch of
+                 hypotheses (same as statsmodels' ``multivariate_stats``), vectorized over the batch.
+
+    Input Parameters: It accepts below inputs:
+        1. theta : (batch x responses) eigenvalues of inv(E + H) H
+        2. p : Rank of E + H (number of responses)
+        3. q : Rank of the contrast
+        4. df_resid : Residual degrees of freedom
+
+    Return: (batch x 4 x 5) array -- statistic x (Value, Num DF, Den DF, F Value, Pr > F)
+    """
+    theta = np.where(theta > tolerance,theta,0.)
+    lam = theta / (1 - theta)
+    v = df_resid
+    s = min(p,q)
+    m = (abs(p - q) - 1) / 2
+    n = (v - p - 1) / 2
+    out = np.empty(theta.shape[:1] + (4,5))
+
+    # Wilks' lambda
+    wilks = np.prod(1 - theta,axis=-1)
+    r = v - (p - q + 1) / 2
+    u = (p * q - 2) / 4
+    t = np.sqrt((p * p * q * q - 4) / (p * p + q * q - 5)) if p * p + q * q - 5 > 0 else 1
+    df1, df2 = p * q, r * t - 2 * u
+    lmd = np.power(wilks,1 / t)
+    out[:,0] = np.column_stack([wilks,np.full_like(wilks,df1),np.full_like(wilks,df2),(1 - lmd) / lmd * df2 / df1,
+                                np.zeros_like(wilks)])
+
+    # Pillai's trace
+    pillai = theta.sum(axis=-1)
+    df1, df2 = s * (2 * m + s + 1), s * (2 * n + s + 1)
+    out[:,1] = np.column_stack([pillai,np.full_like(pillai,df1),np.full_like(pillai,df2),df2 / df1 * pillai / (s - pillai),
+                                np.zeros_like(pillai)])
+
+    # Hotelling-Lawley trace
+    hotelling = lam.sum(axis=-1)
+    if n > 0:
+        b = (p + 2 * n) * (q + 2 * n) / 2 / (2 * n + 1) / (n - 1)
+        df1 = p * q
+        df2 = 4 + (p * q + 2) / (b - 1)
+        c = (df2 - 2) / 2 / n
+        f_hotelling = df2 / df1 * hotelling / c
+    else:
+        df1, df2 = s * (2 * m + s + 1), s * (s * n + 1)
+        f_hotelling = df2 / df1 / s * hotelling
+    out[:,2] = np.column_stack([hotelling,np.full_like(hotelling,df1),np.full_like(hotelling,df2),f_hotelling,
+                                np.zeros_like(hotelling)])
+
+    # Roy's greatest root
+    roy = lam.max(axis=-1)
+    df1 = max(p,q)
+    df2 = v - df1 + q
+    out[:,3] = np.column_stack([roy,np.full_like(roy,df1),np.full_like(roy,df2),df2 / df1 * roy,np.zeros_like(roy)])
+
+    out[:,:,4] = scipy_stats.f.sf(out[:,:,3],out[:,:,1],out[:,:,2])
+    return out
+
+def mv_test_arrays(responses,design,term_cols):
+    """
+    Description: This function tests every term of a multivariate linear model for a batch of response sets sharing the
+                 same design matrix, with batched linear algebra:
+                    - B = pinv(X) Y for all the response sets at once (one matrix product)
+                    - E = R'R from the residuals, one (responses x responses) matrix per set (batched product)
+                    - H = (LB)' inv(L inv(X'X) L') (LB) for every term, L selecting the term's parameters
+                    - eigenvalues of inv(E) H from the Cholesky factor of E (batched symmetric eigenvalues)
+
+    Input Parameters: It accepts below inputs:
+        1. responses : (observations x responses) array for one set or (sets x observations x responses) array
+        2. design : Design matrix (see ``design_matrix``)
+        3. term_cols : Dictionary {term name: list of its parameter columns}
+
+    Return: Dictionary {term name: (sets x 4 x 5) array of statistics (see ``_multivariate_stats``)}
+    """
+    responses = np.asarray(responses,dtype=float)
+    if responses.ndim == 2:
+        responses = responses[None]
+    n_sets, n_obs, n_resp = responses.shape
+    pinv_x = np.linalg.pinv(design)
+    xtx_inv = pinv_x @ pinv_x.T
+    df_resid = n_obs - np.linalg.matrix_rank(design)
+
+    # Responses side by side, (observations x sets*responses), so one product fits every set
+    y_flat = responses.transpose(1,0,2).reshape(n_obs,n_sets * n_resp)
+    params = pinv_x @ y_flat
+    resid = (y_flat - design @ params).reshape(n_obs,n_sets,n_resp).transpose(1,2,0)
+    err_sscp = resid @ resid.transpose(0,2,1)
+    params = params.reshape(-1,n_sets,n_resp).transpose(1,0,2)
+
+    chol_inv = np.linalg.inv(np.linalg.cholesky(err_sscp))
+    results = {}
+    for term, cols in term_cols.items():
+        contrast = params[:,cols,:]
+        t_inv = np.linalg.inv(xtx_inv[np.ix_(cols,cols)])
+        hyp_sscp = contrast.transpose(0,2,1) @ t_inv @ contrast
+        # Eigenvalues of inv(E) H are those of the symmetric C^-1 H C^-T (E = C C')
+        lam = np.linalg.eigvalsh(chol_inv @ hyp_sscp @ chol_inv.transpose(0,2,1))
+        lam = np.clip(lam,0.,None)
+        results[term] = _multivariate_stats(lam / (1 + lam),n_resp,np.linalg.matrix_rank(t_inv),df_resid)
+    return results
+
+def manova(data,responses,terms,categorical=None):
+    """
+    Description: This function fits the MANOVA/MANCOVA (ANCOVA for one response) of one or many response sets on the same
+                 terms and tests every term, the numbers being those of ``MANOVA.from_formula(...).mv_test()``. The design
+                 matrix is built once and all the response sets having the same number of responses are fitted together.
+
+    Input Parameters: It accepts below inputs:
+        1. data : Pandas DataFrame
+        2. responses : List of response columns (one set), or list of such lists (many sets)
+        3. terms : List of factor/covariate columns (see ``design_matrix``)
+        4. categorical : List of the terms to be treated as categorical (by default the non-numeric ones)
+
+    Return: DataFrame with columns Value, Num DF, Den DF, F Value and Pr > F, indexed by (term, statistic) for one set
+            and by (set, term, statistic) for many sets. Rows with a NaN in any used column are dropped.
+    """
+    single = all(isinstance(col,str) for col in responses)
+    sets = [list(responses)] if single else [list(res) for res in responses]
+    used = list(dict.fromkeys([col for res in sets for col in res] + list(terms)))
+    data = data.dropna(subset=used)
+    design, term_cols, _ = design_matrix(data,terms,categorical)
+
+    columns = ['Value','Num DF','Den DF','F Value','Pr > F']
+    set_stats = [None] * len(sets)
+    by_size = {}
+    for pos, res in enumerate(sets):
+        by_size.setdefault(len(res),[]).append(pos)
+    resp_cols = list(dict.fromkeys([col for res in sets for col in res]))
+    resp_values = data[resp_cols].to_numpy(dtype=float)
+    col_pos = {col: i for i, col in enumerate(resp_cols)}
+    for positions in by_size.values():
+        idx = np.array([[col_pos[col] for col in sets[pos]] for pos in positions])
+        # (sets x observations x responses) gathered from one array
+        batch = resp_values[:,idx].transpose(1,0,2)
+        # (sets x terms x statistics x 5)
+        stats = np.stack(list(mv_test_arrays(batch,design,term_cols).values()),axis=1)
+        for i, pos in enumerate(positions):
+            set_stats[pos] = stats[i]
+    values = np.stack(set_stats).reshape(-1,len(columns))
+    if single:
+        index = pd.MultiIndex.from_product([list(term_cols),STATISTICS])
+    else:
+        index = pd.MultiIndex.from_product([[' + '.join(res) for res in sets],list(term_cols),STATISTICS])
+    return pd.DataFrame(values,index=index,columns=columns)
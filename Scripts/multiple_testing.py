@@ -0,0 +1,303 @@
+# Importing Packages
+import os
+import shutil
+import tempfile
+import numpy as np
+
+# Methods accepted by ``adjust_pvalues`` and ``adjust_pvalues_external``
+METHODS = ['bh', 'by', 'holm', 'bonferroni', 'storey']
+
+def _as_pvalues(p_values):
+    """
+    Description: This function returns the p-values as a flat float array. A path to a ``.npy`` file is memory-mapped
+                 (read-only) instead of being loaded.
+    """
+    if isinstance(p_values,(str,os.PathLike)):
+        p_values = np.load(p_values,mmap_mode='r')
+    return np.asarray(p_values,dtype=float).ravel()
+
+def _output(out,shape):
+    """
+    Description: This function returns the array receiving the adjusted p-values. A path creates a ``.npy`` memory-map.
+    """
+    if out is None:
+        return np.empty(shape)
+    if isinstance(out,(str,os.PathLike)):
+        return np.lib.format.open_memmap(out,mode='w+',dtype=float,shape=shape)
+    return out
+
+def storey_pi0(p_values,lambda_=0.5):
+    """
+    Description: This function estimates the proportion of true Null Hypotheses (Storey) as the share of p-values above
+                 ``lambda_`` divided by 1 - ``lambda_``, at most 1.
+
+    Input Parameters: It accepts below inputs:
+        1. p_values : Array or path of a ``.npy`` file of p-values (NaN's are ignored)
+        2. lambda_ : Tuning parameter (by default 0.5)
+
+    Return: Estimated pi0 (NaN when there is no p-value)
+    """
+    p_values = _as_pvalues(p_values)
+    n_tests = np.count_nonzero(~np.isnan(p_values))
+    if n_tests == 0:
+        return np.nan
+    return min(1.,np.count_nonzero(p_values > lambda_) / ((1 - lambda_) * n_tests))
+
+def _sorted_adjust(sorted_p,ranks,n_tests,method,carry,factor=1.):
+    """
+    Description: This function adjusts a run of sorted p-values whose 1-based ranks (among all the tests) are ``ranks``.
+                 Step-up methods (BH, BY, Storey) take the cumulative min from the top and step-down Holm the cumulative
+                 max from the bottom, ``carry`` being the running min/max of the neighbouring run (or None).
+
+    Return: Adjusted sorted p-values
+    """
+    if method == 'holm':
+        adj = np.maximum.accumulate((n_tests - ranks + 1) * sorted_p)
+        if carry is not None:
+            np.maximum(adj,carry,out=adj)
+    else:
+        adj = np.minimum.accumulate(((factor * n_tests) / ranks * sorted_p)[::-1])[::-1]
+        if carry is not None:
+            np.minimum(adj,carry,out=adj)
+    return np.minimum(adj,1.)
+
+def _method_factor(method,n_tests,pi0):
+    """
+    Description: This function returns the constant multiplying the BH adjustment -- c(m) = sum(1/i) for BY and pi0 for Storey.
+    """
+    if method == 'by':
+        return np.sum(1. / np.arange(1,n_tests + 1))
+    if method == 'storey':
+        return pi0
+    return 1.
+
+def adjust_pvalues(p_values,method='bh',lambda_=0.5,out=None):
+    """
+    Description: This function corrects a set of p-values for multiplicity with one sort and one cumulative min/max pass.
+
+    Input Parameters: It accepts below inputs:
+        1. p_values : Array of p-values or path of a ``.npy`` file (memory-mapped). NaN's are not counted as tests and
+                      stay NaN.
+        2. method : Correction method. It expects below values:
+                        a) "bh" : Benjamini-Hochberg false discovery rate (default)
+                        b) "by" : Benjamini-Yekutieli false discovery rate under any dependence
+                        c) "holm" : Holm step-down family-wise error rate
+                        d) "bonferroni" : Bonferroni family-wise error rate
+                        e) "storey" : Storey q-values (BH scaled by the estimated pi0, see ``storey_pi0``)
+        3. lambda_ : Tuning parameter of the Storey pi0 estimate (by default 0.5)
+        4. out : Optional output array, or path of a ``.npy`` file written as a memory-map
+
+    Return: Adjusted p-values in the original order (flat array)
+    """
+    if method not in METHODS:
+        raise ValueError('invalid method')
+    p_values = _as_pvalues(p_values)
+    adj = _output(out,p_values.shape)
+    valid = ~np.isnan(p_values)
+    n_tests = int(np.count_nonzero(valid))
+    if method == 'bonferroni':
+        np.minimum(p_values * n_tests,1.,out=adj)
+        return adj
+
+    order = np.argsort(p_values,kind='stable')[:n_tests]
+    pi0 = storey_pi0(p_values,lambda_) if method == 'storey' else 1.
+    ranks = np.arange(1,n_tests + 1,dtype=float)
+    adj[:] = np.nan
+    adj[order] = _sorted_adjust(p_values[order],ranks,n_tests,method,None,_method_factor(method,n_tests,pi0))
+    return adj
+
+# (p-value, position) pairs of the bucket files
+PAIR_DTYPE = np.dtype([('p','f8'),('pos','i8')])
+
+def _value_bins(p_values,key_min,key_max,n_bins):
+    """
+    Description: This function returns the histogram bin of every p-value, the bins being uniform over the bit patterns
+                 of the floats between ``key_min`` and ``key_max`` (``float.view(int64)``, which is monotonic for
+                 non-negative floats). The bins are then about log-scaled -- ``n_bins / 1024`` bins per power of two --
+                 so p-values crowded close to 0 are spread over many bins, and two different floats can always be told
+                 apart, which lets an oversized bucket be split until only ties remain.
+    """
+    keys = (np.asarray(p_values,dtype=float) + 0.).view(np.int64)
+    scaled = (keys - key_min) / float(key_max - key_min + 1) * n_bins
+    return np.clip(scaled.astype(np.int64),0,n_bins - 1)
+
+def _bucket_edges(bin_counts,bucket_size):
+    """
+    Description: This function groups consecutive histogram bins into buckets of at most ``bucket_size`` p-values, a bin
+                 holding more than that being a bucket of its own (it is split again later). There is one
+                 ``searchsorted`` per bucket, not one step per bin.
+
+    Return: Bucket of every bin
+    """
+    cum_counts = np.cumsum(bin_counts)
+    edges = [0]
+    while edges[-1] < len(bin_counts):
+        first = edges[-1]
+        base = cum_counts[first - 1] if first else 0
+        edges.append(max(int(np.searchsorted(cum_counts,base + bucket_size,side='right')),first + 1))
+    return np.repeat(np.arange(len(edges) - 1),np.diff(edges))
+
+def _partition(pair_chunks,bins_of,bucket_of_bin,work_dir,name):
+    """
+    Description: This function writes the (p-value, position) pairs into one file per bucket. A file is only open while
+                 one chunk is appended to it, so the number of buckets is not limited by the open file limit.
+
+    Returns: Per bucket
+                - Path of the file
+                - Number of pairs
+                - Smallest p-value
+                - Largest p-value
+    """
+    n_buckets = int(bucket_of_bin[-1]) + 1
+    paths = [os.path.join(work_dir,'{}_{}.bin'.format(name,i)) for i in range(n_buckets)]
+    counts = np.zeros(n_buckets,dtype=np.int64)
+    p_min = np.full(n_buckets,np.inf)
+    p_max = np.full(n_buckets,-np.inf)
+    for pairs in pair_chunks:
+        buckets = bucket_of_bin[bins_of(pairs['p'])]
+        order = np.argsort(buckets,kind='stable')
+        bounds = np.searchsorted(buckets[order],np.arange(n_buckets + 1))
+        for i in np.flatnonzero(np.diff(bounds)):
+            bucket_pairs = pairs[order[bounds[i]:bounds[i + 1]]]
+            with open(paths[i],'ab') as bucket_file:
+                bucket_pairs.tofile(bucket_file)
+            counts[i] += bucket_pairs.size
+            p_min[i] = min(p_min[i],bucket_pairs['p'].min())
+            p_max[i] = max(p_max[i],bucket_pairs['p'].max())
+    return paths, counts, p_min, p_max
+
+def _file_chunks(path,count,chunk_size):
+    """
+    Description: This function reads the pairs of a bucket file one chunk at a time.
+    """
+    for start in range(0,count,chunk_size):
+        yield np.fromfile(path,dtype=PAIR_DTYPE,count=min(chunk_size,count - start),offset=start * PAIR_DTYPE.itemsize)
+
+def _adjust_bucket(path,count,p_min,p_max,rank_offset,carry,adj,n_tests,method,factor,bucket_size,chunk_size,n_bins):
+    """
+    Description: This function adjusts the p-values of one bucket file, whose 1-based ranks start after ``rank_offset``,
+                 and writes them at their positions of the output. A bucket holding at most ``bucket_size`` pairs is
+                 sorted in memory. A larger one is either only ties (every adjusted value is then the same and is
+                 streamed out chunk by chunk) or split again on a finer histogram of its own value range.
+
+    Return: Running min (step-up methods) or max (Holm) carried to the next bucket
+    """
+    if count <= bucket_size:
+        pairs = np.fromfile(path,dtype=PAIR_DTYPE)
+        pairs = pairs[np.argsort(pairs['p'],kind='stable')]
+        ranks = np.arange(rank_offset + 1,rank_offset + count + 1,dtype=float)
+        bucket_adj = _sorted_adjust(pairs['p'],ranks,n_tests,method,carry,factor)
+        # Writing in position order keeps the memory-map access sequential
+        by_position = np.argsort(pairs['pos'])
+        adj[pairs['pos'][by_position]] = bucket_adj[by_position]
+        return bucket_adj[-1] if method == 'holm' else bucket_adj[0]
+
+    if p_min == p_max:
+        # Ties :: the step-up value of the highest rank, or the step-down value of the lowest one, for all of them
+        rank = rank_offset + (1. if method == 'holm' else count)
+        tie_adj = _sorted_adjust(np.array([p_min]),np.array([rank]),n_tests,method,carry,factor)[0]
+        for pairs in _file_chunks(path,count,chunk_size):
+            adj[np.sort(pairs['pos'])] = tie_adj
+        return tie_adj
+
+    key_min, key_max = (np.array([p_min,p_max]) + 0.).view(np.int64)
+    bins_of = lambda p: _value_bins(p,key_min,key_max,n_bins)
+    bin_counts = np.zeros(n_bins,dtype=np.int64)
+    for pairs in _file_chunks(path,count,chunk_size):
+        bin_counts += np.bincount(bins_of(pairs['p']),minlength=n_bins)
+    sub_paths, sub_counts, sub_min, sub_max = _partition(_file_chunks(path,count,chunk_size),bins_of,
+                                                         _bucket_edges(bin_counts,bucket_size),os.path.dirname(path),
+                                                         os.path.basename(path)[:-4])
+    os.remove(path)
+    return _adjust_buckets(sub_paths,sub_counts,sub_min,sub_max,rank_offset,carry,adj,n_tests,method,factor,
+                           bucket_size,chunk_size,n_bins)
+
+def _adjust_buckets(paths,counts,p_min,p_max,rank_offset,carry,adj,n_tests,method,factor,bucket_size,chunk_size,n_bins):
+    """
+    Description: This function adjusts consecutive buckets, from the top for the step-up methods (cumulative min) and
+                 from the bottom for Holm (cumulative max), carrying the running min/max across them.
+
+    Return: Running min/max after the last bucket
+    """
+    offsets = rank_offset + np.cumsum(counts) - counts
+    bucket_order = range(len(paths)) if method == 'holm' else range(len(paths) - 1,-1,-1)
+    for i in bucket_order:
+        if counts[i] == 0:
+            continue
+        carry = _adjust_bucket(paths[i],int(counts[i]),p_min[i],p_max[i],int(offsets[i]),carry,adj,n_tests,method,
+                               factor,bucket_size,chunk_size,n_bins)
+        if os.path.exists(paths[i]):
+            os.remove(paths[i])
+    return carry
+
+def adjust_pvalues_external(path,out_path,method='bh',lambda_=0.5,bucket_size=2**24,chunk_size=2**22,tmp_dir=None):
+    """
+    Description: This function is the external-memory version of ``adjust_pvalues`` for p-value sets larger than RAM.
+                 Only one chunk or one bucket is held in memory at a time:
+                    1. One streaming pass builds a fine, about log-scaled histogram of the p-values (see ``_value_bins``),
+                       which gives the number of tests, Storey's pi0 and buckets of at most ``bucket_size`` p-values.
+                    2. A second pass partitions the (p-value, position) pairs into one temporary file per bucket.
+                    3. The buckets are sorted one at a time, from the top for the step-up methods (cumulative min) and
+                       from the bottom for Holm (cumulative max), carrying the running min/max across buckets, and the
+                       adjusted values are written at their positions of the output memory-map. A bucket still larger
+                       than ``bucket_size`` (p-values crowded in one bin) is split again on its own value range, and a
+                       bucket of tied p-values is adjusted without sorting.
+
+    Input Parameters: It accepts below inputs:
+        1. path : Path of the ``.npy`` file of p-values (memory-mapped, NaN's are not counted as tests)
+        2. out_path : Path of the ``.npy`` file receiving the adjusted p-values (same order)
+        3. method : "bh", "by", "holm", "bonferroni" or "storey" (see ``adjust_pvalues``)
+        4. lambda_ : Tuning parameter of the Storey pi0 estimate (by default 0.5)
+        5. bucket_size : Largest number of p-values sorted in memory at a time (by default 2**24 i.e. 256 MB of pairs)
+        6. chunk_size : Number of p-values read at a time (by default 2**22)
+        7. tmp_dir : Directory of the bucket files (by default the system temporary directory)
+
+    Return: Memory-map of the adjusted p-values
+    """
+    if method not in METHODS:
+        raise ValueError('invalid method')
+    p_values = np.load(path,mmap_mode='r').ravel()
+    adj = np.lib.format.open_memmap(out_path,mode='w+',dtype=float,shape=p_values.shape)
+    n_bins = 2**20
+    key_min, key_max = (np.array([0.,1.]) + 0.).view(np.int64)
+    bins_of = lambda p: _value_bins(p,key_min,key_max,n_bins)
+
+    # Pass 1 :: histogram, number of tests and Storey's count (NaN's are written to the output on the way)
+    bin_counts = np.zeros(n_bins,dtype=np.int64)
+    above_lambda = 0
+    for start in range(0,p_values.size,chunk_size):
+        chunk = np.asarray(p_values[start:start + chunk_size],dtype=float)
+        valid = chunk[~np.isnan(chunk)]
+        bin_counts += np.bincount(bins_of(valid),minlength=n_bins)
+        above_lambda += np.count_nonzero(valid > lambda_)
+        adj[start:start + chunk_size] = np.where(np.isnan(chunk),np.nan,0.)
+    n_tests = int(bin_counts.sum())
+    pi0 = min(1.,above_lambda / ((1 - lambda_) * n_tests)) if n_tests else 1.
+    factor = _method_factor(method,n_tests,pi0)
+
+    if method == 'bonferroni':
+        for start in range(0,p_values.size,chunk_size):
+            adj[start:start + chunk_size] = np.minimum(np.asarray(p_values[start:start + chunk_size],dtype=float) * n_tests,1.)
+        adj.flush()
+        return adj
+
+    def source_pairs():
+        for start in range(0,p_values.size,chunk_size):
+            chunk = np.asarray(p_values[start:start + chunk_size],dtype=float)
+            positions = np.flatnonzero(~np.isnan(chunk))
+            pairs = np.empty(positions.size,dtype=PAIR_DTYPE)
+            pairs['p'] = chunk[positions]
+            pairs['pos'] = positions + start
+            yield pairs
+
+    work_dir = tempfile.mkdtemp(dir=tmp_dir)
+    try:
+        # Pass 2 :: partition (p-value, position) pairs into the bucket files
+        paths, counts, p_min, p_max = _partition(source_pairs(),bins_of,_bucket_edges(bin_counts,bucket_size),
+                                                 work_dir,'bucket')
+        # Pass 3 :: sort and adjust every bucket
+        _adjust_buckets(paths,counts,p_min,p_max,0,None,adj,n_tests,method,factor,bucket_size,chunk_size,n_bins)
+    finally:
+        shutil.rmtree(work_dir,ignore_errors=True)
+    adj.flush()
+    return adj
@@ -0,0 +1,292 @@
+# Importing Packages
+import os
+from itertools import combinations, islice
+from math import comb
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import scipy.stats as scipy_stats
+from .bootstrap import _rows_per_chunk
+
+# Statistic name -> number of samples it accepts (None means any number > 1)
+_STATISTICS = {'mean_diff': 2, 'median_diff': 2, 't': 2, 'f': None}
+
+# Largest number of splits enumerated by the exact test
+MAX_EXACT_SPLITS = 10**7
+
+# Pooled data and test settings of the worker processes (set by ``_init_worker``)
+_worker_state = None
+
+def _pooled_totals(data,statistic):
+    """
+    Description: This function returns the parts of the statistic which do not change with the permutation, computed once
+                 from the pooled data -- the grand mean and the total sum of squares for "f", None otherwise.
+    """
+    if statistic != 'f':
+        return None
+    grand_mean = data.mean(axis=0)
+    return grand_mean, ((data - grand_mean)**2).sum(axis=0)
+
+def _group_stats(perm_data,sizes,statistic,totals=None):
+    """
+    Description: This function calculates the statistic of a batch of permuted datasets at once. Every row of
+                 ``perm_data`` is one permutation of the pooled observations, the groups being the consecutive slices of
+                 ``sizes`` observations.
+
+    Input Parameters: It accepts below inputs:
+        1. perm_data : (permutations x observations) or (permutations x observations x metrics) array
+        2. sizes : Number of observations of every group
+        3. statistic : Name of the statistic (see ``permutation_test``) or callable
+        4. totals : Permutation invariant parts of the statistic (see ``_pooled_totals``), by default computed from
+                    the first row of ``perm_data``
+
+    Return: (permutations,) or (permutations x metrics) array of statistics
+    """
+    bounds = np.cumsum(sizes)[:-1]
+    groups = np.split(perm_data,bounds,axis=1)
+    if callable(statistic):
+        return statistic(*groups,axis=1)
+    if statistic == 'mean_diff':
+        return groups[0].mean(axis=1) - groups[1].mean(axis=1)
+    if statistic == 'median_diff':
+        return np.median(groups[0],axis=1) - np.median(groups[1],axis=1)
+    if statistic == 't':
+        # Not pooled statistic, same as ``ztest_notpooled`` (variances with ddof=0)
+        var_sum = groups[0].var(axis=1) / sizes[0] + groups[1].var(axis=1) / sizes[1]
+        return (groups[0].mean(axis=1) - groups[1].mean(axis=1)) / np.sqrt(var_sum)
+    if statistic == 'f':
+        # One-way ANOVA F, only the between groups term changes with the permutation
+        n_obs, n_grp = perm_data.shape[1], len(sizes)
+        grand_mean, ss_total = _pooled_totals(perm_data[0],statistic) if totals is None else totals
+        ss_between = sum(size * (grp.mean(axis=1) - grand_mean)**2 for size, grp in zip(sizes,groups))
+        with np.errstate(invalid='ignore',divide='ignore'):
+            return (ss_between / (n_grp - 1)) / ((ss_total - ss_between) / (n_obs - n_grp))
+    raise ValueError('invalid statistic')
+
+def _extreme_counts(perm_stats,observed,alternative):
+    """
+    Description: This function counts the permuted statistics at least as extreme as the observed one (with a relative
+                 tolerance of 1e-12 so that ties caused by rounding are counted).
+
+    Return: Count per metric
+    """
+    tol = np.abs(observed) * 1e-12
+    if alternative == 'two-sided':
+        extreme = np.abs(perm_stats) >= np.abs(observed) - tol
+    elif alternative == 'larger':
+        extreme = perm_stats >= observed - tol
+    elif alternative == 'smaller':
+        extreme = perm_stats <= observed + tol
+    else:
+        raise ValueError('invalid alternative')
+    return extreme.sum(axis=0)
+
+def _permuted_block(data,sizes,statistic,totals,observed,alternative,rng,n_block,rows):
+    """
+    Description: This function draws ``n_block`` random permutations of the pooled data in chunks of ``rows`` permutations
+                 and counts the extreme statistics.
+
+    Return: Count per metric
+    """
+    n_obs = data.shape[0]
+    counts = np.zeros(np.shape(observed),dtype=np.int64)
+    for start in range(0,n_block,rows):
+        n_rows = min(rows,n_block - start)
+        if data.ndim == 1:
+            perm_data = rng.permuted(np.broadcast_to(data,(n_rows,n_obs)),axis=1)
+        else:
+            perm_data = data[rng.permuted(np.broadcast_to(np.arange(n_obs),(n_rows,n_obs)),axis=1)]
+        counts += _extreme_counts(_group_stats(perm_data,sizes,statistic,totals),observed,alternative)
+    return counts
+
+def _init_worker(data,sizes,statistic,totals,observed,alternative,rows):
+    """
+    Description: This function is the initializer of every worker process, the pooled data is sent once per process
+                 instead of once per block.
+    """
+    global _worker_state
+    _worker_state = (data,sizes,statistic,totals,observed,alternative,rows)
+
+def _worker_block(block_seed,n_block):
+    """
+    Description: This function is the task executed by the worker processes, one seeded block of permutations.
+    """
+    data, sizes, statistic, totals, observed, alternative, rows = _worker_state
+    return _permuted_block(data,sizes,statistic,totals,observed,alternative,np.random.default_rng(block_seed),n_block,rows)
+
+def _exact_counts(data,sizes,statistic,totals,observed,alternative,rows):
+    """
+    Description: This function enumerates every split of the pooled data into the two groups (``comb(n, n1)`` of them)
+                 in chunks of ``rows`` splits and counts the extreme statistics.
+
+    Return: Tuple (count per metric, number of splits)
+    """
+    n_obs = data.shape[0]
+    counts = np.zeros(np.shape(observed),dtype=np.int64)
+    n_splits = 0
+    splits = combinations(range(n_obs),sizes[0])
+    while True:
+        chunk = np.array(list(islice(splits,rows)),dtype=np.intp)
+        if chunk.size == 0:
+            break
+        # Members of the first group come first, the rest keep their order
+        in_first = np.zeros((chunk.shape[0],n_obs),dtype=bool)
+        in_first[np.arange(chunk.shape[0])[:,None],chunk] = True
+        idx = np.argsort(~in_first,axis=1,kind='stable')
+        counts += _extreme_counts(_group_stats(data[idx],sizes,statistic,totals),observed,alternative)
+        n_splits += chunk.shape[0]
+    return counts, n_splits
+
+def _test_output(observed,p_value,n_used):
+    """
+    Description: This function returns the outputs of a test with the same types for the exact and Monte Carlo tests --
+                 Python float/int for one metric and NumPy arrays for many metrics.
+    """
+    if np.ndim(observed) == 0:
+        return float(observed), float(p_value), int(n_used)
+    return np.asarray(observed,dtype=float), np.asarray(p_value,dtype=float), np.broadcast_to(n_used,np.shape(observed)).astype(np.int64)
+
+def _decided(counts,n_used,alpha,stop_risk):
+    """
+    Description: This function tells for which metrics the Monte Carlo p-value is clearly below or above ``alpha``,
+                 i.e. when the Clopper-Pearson interval of level 1 - ``stop_risk`` of the p-value excludes ``alpha``.
+    """
+    lower = np.where(counts > 0,scipy_stats.beta.ppf(stop_risk / 2,counts,n_used - counts + 1),0.)
+    upper = np.where(counts < n_used,scipy_stats.beta.ppf(1 - stop_risk / 2,counts + 1,n_used - counts),1.)
+    return (upper < alpha) | (lower > alpha)
+
+def permutation_test(samples,statistic='mean_diff',alternative=None,n_permutations=10000,alpha=0.05,early_stop=True,
+                     stop_risk=1e-3,exact='auto',seed=None,n_jobs=None,block_size=1000,max_memory_mb=256):
+    """
+    Description: This function performs a permutation test of the samples, either exact (every split of the pooled data)
+                 or Monte Carlo. Permutations are drawn as (permutations x observations) matrices and reduced with
+                 vectorized statistics. With ``early_stop`` the Monte Carlo test is sequential: permutations are drawn in
+                 seeded blocks of ``block_size`` and it stops as soon as the p-value is clearly below or above ``alpha``.
+
+    Input Parameters: It accepts below inputs:
+        1. samples : List of 2 or more samples. Every sample is either a 1-D array (NaN's are dropped) or a
+                     (observations x metrics) array, in which case every metric is tested on the same permutations
+                     (rows having a NaN are dropped).
+        2. statistic : Test statistic. It expects below values:
+                        a) "mean_diff" : Difference of the means (two samples, default)
+                        b) "median_diff" : Difference of the medians (two samples)
+                        c) "t" : Not pooled Z statistic of ``ztest_notpooled`` (two samples)
+                        d) "f" : One-way ANOVA F statistic (k samples)
+                        e) Callable ``func(*groups, axis=1)`` returning one statistic per row of the (permutations x n_g) groups
+        3. alternative : "two-sided", "larger" or "smaller" (by default "larger" for "f" and "two-sided" otherwise)
+        4. n_permutations : Maximum number of Monte Carlo permutations (by default 10000)
+        5. alpha : Level of significance used by the early stopping (by default 0.05)
+        6. early_stop : If True (default), stop once the p-value is decided with a risk of ``stop_risk``
+        7. stop_risk : Probability that the early stopping takes the wrong side of ``alpha`` (by default 1e-3)
+        8. exact : It expects below values:
+                        a) "auto" : Exact test when two samples have at most ``n_permutations`` splits (default)
+                        b) True : Exact test (two samples only, at most ``MAX_EXACT_SPLITS`` splits)
+                        c) False : Monte Carlo test
+        9. seed : Seed or ``numpy.random.SeedSequence`` for reproducible results
+        10. n_jobs : Number of worker processes working through the blocks (None or 1 means a single process, -1 all
+                     the CPUs). The blocks are seeded with ``SeedSequence.spawn`` and the stopping rule is checked block
+                     by block in order, so the result does not depend on ``n_jobs``.
+        11. block_size : Number of permutations per seeded block (by default 1000)
+        12. max_memory_mb : Upper bound (in MB) of the permuted data held at a time, per process (by default 256)
+
+    Returns:
+        - Observed statistic
+        - P-value. Exact test: share of the splits at least as extreme. Monte Carlo: (count + 1) / (permutations + 1).
+        - Number of permutations actually used
+      For multi-metric samples every output is an array with one value per metric.
+    """
+    samples = [np.asarray(smp,dtype=float) for smp in samples]
+    if samples[0].ndim == 1:
+        samples = [smp[~np.isnan(smp)] for smp in samples]
+    else:
+        samples = [smp[~np.isnan(smp).any(axis=1)] for smp in samples]
+    sizes = [smp.shape[0] for smp in samples]
+    n_samples = _STATISTICS.get(statistic) if not callable(statistic) else None
+    if n_samples is not None and len(samples) != n_samples:
+        raise ValueError('statistic {} needs {} samples'.format(statistic,n_samples))
+    if alternative is None:
+        alternative = 'larger' if statistic == 'f' else 'two-sided'
+
+    data = np.concatenate(samples,axis=0)
+    n_obs = data.shape[0]
+    totals = _pooled_totals(data,statistic)
+    observed = _group_stats(data[None],sizes,statistic,totals)[0]
+    per_perm = n_obs if data.ndim == 1 else n_obs * (data.shape[1] + 1)
+    rows = _rows_per_chunk(per_perm,max_memory_mb=max_memory_mb)
+
+    if exact == 'auto':
+        exact = len(samples) == 2 and comb(n_obs,sizes[0]) <= n_permutations
+    if exact:
+        if len(samples) != 2:
+            raise ValueError('the exact test is available for two samples')
+        n_splits = comb(n_obs,sizes[0])
+        if n_splits > MAX_EXACT_SPLITS:
+            raise ValueError('the exact test would enumerate {} splits (more than MAX_EXACT_SPLITS = {}), use the Monte '
+                             'Carlo test'.format(n_splits,MAX_EXACT_SPLITS))
+        counts, n_used = _exact_counts(data,sizes,statistic,totals,observed,alternative,rows)
+        return _test_output(observed,counts / n_used,n_used)
+
+    seed_seq = seed if isinstance(seed,np.random.SeedSequence) else np.random.SeedSequence(seed)
+    n_blocks = -(-int(n_permutations) // block_size)
+    block_seeds = seed_seq.spawn(n_blocks)
+    block_sizes = [min(block_size,int(n_permutations) - i * block_size) for i in range(n_blocks)]
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = 1 if n_jobs is None else max(1,int(n_jobs))
+
+    counts = np.zeros(np.shape(observed),dtype=np.int64)
+    n_used = np.zeros(np.shape(observed),dtype=np.int64)
+    active = np.ones(np.shape(observed),dtype=bool)
+
+    def _accumulate(block_counts,n_block):
+        # Metrics already decided keep their counts
+        counts[...] = np.where(active,counts + block_counts,counts)
+        n_used[...] = np.where(active,n_used + n_block,n_used)
+        if early_stop:
+            active[...] = active & ~_decided(counts,n_used,alpha,stop_risk)
+        return active.any()
+
+    if n_jobs == 1:
+        for block_seed, n_block in zip(block_seeds,block_sizes):
+            block_counts = _permuted_block(data,sizes,statistic,totals,observed,alternative,np.random.default_rng(block_seed),
+                                           n_block,rows)
+            if not _accumulate(block_counts,n_block):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs,initializer=_init_worker,
+                                 initargs=(data,sizes,statistic,totals,observed,alternative,rows)) as executor:
+            # Rounds of n_jobs blocks, the blocks are accumulated in order so the stopping point matches one process
+            for start in range(0,n_blocks,n_jobs):
+                futures = [executor.submit(_worker_block,block_seed,n_block)
+                           for block_seed, n_block in zip(block_seeds[start:start + n_jobs],block_sizes[start:start + n_jobs])]
+                still_active = True
+                for future, n_block in zip(futures,block_sizes[start:start + n_jobs]):
+                    still_active = _accumulate(future.result(),n_block)
+                    if not still_active:
+                        break
+                if not still_active:
+                    for future in futures:
+                        future.cancel()
+                    break
+
+    return _test_output(observed,(counts + 1) / (n_used + 1),n_used)
+
+def two_sample_permutation_test(x1,x2,statistic='mean_diff',alternative='two-sided',n_permutations=10000,alpha=0.05,
+                                early_stop=True,exact='auto',seed=None,n_jobs=None):
+    """
+    Description: This function is the two samples permutation test, the distribution-free counterpart of ``ztest_notpooled``
+                 for skewed data. See ``permutation_test`` for the inputs.
+
+    Returns: Observed statistic, P-value and number of permutations used
+    """
+    return permutation_test([x1,x2],statistic=statistic,alternative=alternative,n_permutations=n_permutations,alpha=alpha,
+                            early_stop=early_stop,exact=exact,seed=seed,n_jobs=n_jobs)
+
+def k_sample_permutation_test(samples,n_permutations=10000,alpha=0.05,early_stop=True,seed=None,n_jobs=None):
+    """
+    Description: This function is the k samples permutation test of the one-way ANOVA F statistic, the distribution-free
+                 counterpart of ``anova.one_way_anova``. See ``permutation_test`` for the inputs.
+
+    Returns: Observed F statistic, P-value and number of permutations used
+    """
+    return permutation_test(samples,statistic='f',alternative='larger',n_permutations=n_permutations,alpha=alpha,
+                            early_stop=early_stop,exact=False,seed=seed,n_jobs=n_jobs)
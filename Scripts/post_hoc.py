@@ -0,0 +1,165 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+import scipy.stats as scipy_stats
+from scipy.interpolate import PchipInterpolator
+from .anova import group_summary
+from .multiple_testing import adjust_pvalues
+
+def _studentized_range_sf(q_stats,k,dof,n_nodes=256):
+    """
+    Description: This function evaluates the studentized range survival function for many statistics at once.
+                 ``scipy_stats.studentized_range`` integrates numerically on every call, so for large batches the
+                 log survival function is evaluated on ``n_nodes`` points spanning the observed statistics and
+                 interpolated with a monotone (PCHIP) spline, with an absolute error around 1e-6.
+
+    Input Parameters: It accepts below inputs:
+        1. q_stats : Array of studentized range statistics
+        2. k : Number of groups
+        3. dof : Residual degrees of freedom
+        4. n_nodes : Number of exact evaluations used for the interpolation (by default 256)
+
+    Return: Array of p-values
+    """
+    q_stats = np.asarray(q_stats,dtype=float)
+    if q_stats.size <= n_nodes:
+        return scipy_stats.studentized_range.sf(q_stats,k,dof)
+    # Infinite statistics (e.g. a zero pooled variance) have a p-value of 0, NaN's stay NaN
+    p_values = np.where(q_stats == np.inf,0.,np.nan)
+    finite = np.isfinite(q_stats)
+    q_finite = q_stats[finite]
+    if q_finite.size == 0:
+        return p_values
+    q_min, q_max = q_finite.min(), q_finite.max()
+    if q_max <= q_min:
+        # All the statistics are equal, the interpolation nodes would not be strictly increasing
+        unique, inverse = np.unique(q_finite,return_inverse=True)
+        p_values[finite] = scipy_stats.studentized_range.sf(unique,k,dof)[inverse]
+        return p_values
+    nodes = np.linspace(q_min,q_max,n_nodes)
+    log_sf = np.log(np.clip(scipy_stats.studentized_range.sf(nodes,k,dof),1e-300,1.))
+    p_values[finite] = np.exp(PchipInterpolator(nodes,log_sf)(q_finite))
+    return p_values
+
+def pairwise_arrays(summary,method='tukey',alpha=0.05,mse=None,df_resid=None):
+    """
+    Description: This function calculates every pairwise comparison of the group means as NumPy broadcasts over the
+                 upper triangle of the (groups x groups) grid.
+
+    Input Parameters: It accepts below inputs:
+        1. summary : DataFrame indexed by group with count, mean and var columns (e.g. ``anova.group_summary``)
+        2. method : Kind of post-hoc analysis. It expects below values:
+                        a) "tukey" : Tukey HSD, studentized range p-values (default)
+                        b) "bonferroni" : Pairwise t tests on the pooled variance, Bonferroni corrected
+                        c) "holm" : Pairwise t tests on the pooled variance, Holm corrected
+                        d) "none" : Pairwise t tests on the pooled variance, uncorrected
+        3. alpha : Level of significance (by default 0.05)
+        4. mse : Pooled variance i.e. mean square of the residuals of the ANOVA (by default computed from ``summary``)
+        5. df_resid : Residual degrees of freedom of the ANOVA (by default N - k)
+
+    Return: Dictionary of arrays, one value per pair -- i, j (group positions), meandiff (mean_j - mean_i), statistic,
+            p_adj, lower, upper and reject
+    """
+    if method not in ['tukey', 'bonferroni', 'holm', 'none']:
+        raise ValueError('invalid method')
+    counts = np.asarray(summary['count'],dtype=float)
+    means = np.asarray(summary['mean'],dtype=float)
+    n_grp = len(means)
+    if df_resid is None:
+        df_resid = counts.sum() - n_grp
+    if mse is None:
+        mse = np.nansum((counts - 1) * np.asarray(summary['var'],dtype=float)) / df_resid
+
+    idx_i, idx_j = np.triu_indices(n_grp,1)
+    meandiff = means[idx_j] - means[idx_i]
+    inv_n = 1. / counts
+    inv_n_sum = inv_n[idx_i] + inv_n[idx_j]
+
+    if method == 'tukey':
+        std_err = np.sqrt((mse / 2.) * inv_n_sum)
+        statistic = np.abs(meandiff) / std_err
+        p_adj = _studentized_range_sf(statistic,n_grp,df_resid)
+        crit = scipy_stats.studentized_range.ppf(1 - alpha,n_grp,df_resid)
+    else:
+        std_err = np.sqrt(mse * inv_n_sum)
+        statistic = meandiff / std_err
+        p_raw = 2 * scipy_stats.t.sf(np.abs(statistic),df_resid)
+        n_pairs = p_raw.size
+        if method == 'bonferroni':
+            p_adj = adjust_pvalues(p_raw,method='bonferroni')
+            crit = scipy_stats.t.ppf(1 - alpha / (2 * n_pairs),df_resid)
+        elif method == 'holm':
+            p_adj = adjust_pvalues(p_raw,method='holm')
+            # Holm has no single critical value, the interval uses the Bonferroni one
+            crit = scipy_stats.t.ppf(1 - alpha / (2 * n_pairs),df_resid)
+        else:
+            p_adj = p_raw
+            crit = scipy_stats.t.ppf(1 - alpha / 2,df_resid)
+
+    margin = crit * std_err
+    return {'i': idx_i, 'j': idx_j, 'meandiff': meandiff, 'statistic': statistic, 'p_adj': p_adj,
+            'lower': meandiff - margin, 'upper': meandiff + margin, 'reject': p_adj < alpha}
+
+def _arrays_to_frame(pairs,labels,rows=None):
+    """
+    Description: This function converts (a selection of rows of) the pairwise arrays into a DataFrame like statsmodels'
+                 ``pairwise_tukeyhsd`` summary.
+    """
+    if rows is None:
+        rows = slice(None)
+    return pd.DataFrame({'group1': labels[pairs['i'][rows]], 'group2': labels[pairs['j'][rows]],
+                         'meandiff': pairs['meandiff'][rows], 'statistic': pairs['statistic'][rows],
+                         'p_adj': pairs['p_adj'][rows], 'lower': pairs['lower'][rows],
+                         'upper': pairs['upper'][rows], 'reject': pairs['reject'][rows]})
+
+def pairwise_comparisons(summary,method='tukey',alpha=0.05,mse=None,df_resid=None,top_k=None,only_reject=False):
+    """
+    Description: This function performs the post-hoc pairwise comparisons from the group means, counts and pooled variance.
+
+    Input Parameters: It accepts below inputs:
+        1. summary : DataFrame indexed by group with count, mean and var columns (e.g. ``anova.group_summary``)
+        2. method : "tukey" (default), "bonferroni", "holm" or "none" (see ``pairwise_arrays``)
+        3. alpha : Level of significance (by default 0.05)
+        4. mse : Pooled variance of the ANOVA (by default computed from ``summary``)
+        5. df_resid : Residual degrees of freedom of the ANOVA (by default N - k)
+        6. top_k : If given, only the ``top_k`` pairs having the smallest adjusted p-values are returned
+        7. only_reject : If True, only the pairs whose Null Hypothesis is rejected are returned
+
+    Return: DataFrame with one row per (returned) pair -- group1, group2, meandiff, statistic, p_adj, lower, upper, reject
+    """
+    pairs = pairwise_arrays(summary,method=method,alpha=alpha,mse=mse,df_resid=df_resid)
+    labels = np.asarray(summary.index)
+    rows = np.arange(pairs['p_adj'].size)
+    if only_reject:
+        rows = rows[pairs['reject']]
+    if top_k is not None and top_k < rows.size:
+        best = np.argpartition(pairs['p_adj'][rows],top_k - 1)[:top_k]
+        rows = rows[best[np.argsort(pairs['p_adj'][rows][best],kind='stable')]]
+    return _arrays_to_frame(pairs,labels,rows)
+
+def iter_pairwise_comparisons(summary,method='tukey',alpha=0.05,mse=None,df_resid=None,chunk_size=100000):
+    """
+    Description: This function is the streaming version of ``pairwise_comparisons``. The statistics are computed once
+                 as arrays and handed out as DataFrame chunks of ``chunk_size`` rows, so the full pairwise DataFrame
+                 (2 million rows for 2,000 groups) is never built.
+
+    Return: Generator of DataFrame chunks (same columns as ``pairwise_comparisons``)
+    """
+    pairs = pairwise_arrays(summary,method=method,alpha=alpha,mse=mse,df_resid=df_resid)
+    labels = np.asarray(summary.index)
+    for start in range(0,pairs['p_adj'].size,chunk_size):
+        yield _arrays_to_frame(pairs,labels,slice(start,start + chunk_size))
+
+def tukey_hsd(values,groups,alpha=0.05,top_k=None):
+    """
+    Description: This function performs the Tukey HSD post-hoc analysis directly on the observations.
+
+    Input Parameters: It accepts below inputs:
+        1. values : 1-D array or Pandas Series of observations
+        2. groups : Group label of every observation
+        3. alpha : Level of significance (by default 0.05)
+        4. top_k : If given, only the ``top_k`` most significant pairs are returned
+
+    Return: DataFrame with one row per pair (see ``pairwise_comparisons``)
+    """
+    return pairwise_comparisons(group_summary(values,groups),method='tukey',alpha=alpha,top_k=top_k)
@@ -0,0 +1,165 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+
+# Columnar layout of a batch of test results
+result_dtype = np.dtype([('statistic','f8'),('p_value','f8'),('crit_low','f8'),('crit_high','f8'),
+                         ('tail','U2'),('loc','f8'),('reject','?')])
+
+# Tail names of the test functions mapped on the ``hyp_test`` ones
+_TAILS = {'l': 'l', 'smaller': 'l', 's': 'l', 'left': 'l',
+          'r': 'r', 'larger': 'r', 'right': 'r',
+          'lr': 'lr', 'two-sided': 'lr', '2-sided': 'lr', '2s': 'lr'}
+
+class test_result:
+    """
+    Description: This class is a compact, non-printing record of one hypothesis test.
+    """
+    __slots__ = ('statistic','p_value','crit_low','crit_high','tail','loc','reject')
+
+    def __init__(self,statistic,p_value,crit_low=np.nan,crit_high=np.nan,tail='lr',loc=0.95,reject=None):
+        """
+        Description: This function is created for initializing the record.
+
+        Input: It accepts below input parameters:
+            1. ``statistic`` : Test statistic
+            2. ``p_value`` : P-value of the test statistic
+            3. ``crit_low`` : Left critical value (NaN if not applicable)
+            4. ``crit_high`` : Right critical value (NaN if not applicable)
+            5. ``tail`` : Kind of tail test -- 'l', 'r' or 'lr' (the test functions' names like 'two-sided' are accepted)
+            6. ``loc`` : Level of confidence
+            7. ``reject`` : Decision. If None it is filled by ``decide``.
+        """
+        self.statistic = float(statistic)
+        self.p_value = float(p_value)
+        self.crit_low = float(crit_low)
+        self.crit_high = float(crit_high)
+        self.tail = _TAILS[tail]
+        self.loc = float(loc)
+        self.reject = reject
+        if reject is None:
+            self.reject = bool(decide(self.as_record(),loc=self.loc)[0])
+
+    def as_record(self):
+        """
+        Description: This function returns the record as a one element structured array (``result_dtype``).
+        """
+        return np.array([(self.statistic,self.p_value,self.crit_low,self.crit_high,self.tail,self.loc,bool(self.reject))],
+                        dtype=result_dtype)
+
+    def __repr__(self):
+        return 'test_result(statistic={:.4f}, p_value={:.4g}, tail={!r}, reject={})'.format(self.statistic,self.p_value,
+                                                                                           self.tail,self.reject)
+
+def from_test_output(output,test,tail,loc=0.95):
+    """
+    Description: This function converts the tuple returned by one of the ``stats_tests`` functions into a ``test_result``.
+
+    Input Parameters: It accepts below inputs:
+        1. output : Tuple returned by the test function
+        2. test : Test function name. It expects below values:
+                    a) "z" : ``one_porportion_ztest`` or ``ztest_notpooled`` -- (statistic, p_value)
+                    b) "chi2" : ``chi_square_one_pop`` -- (statistic, crit, p_value) or (statistic, crit_low, crit_high, p_value)
+                    c) "f" : ``f_dist_test`` -- (statistic, p_value, crit) or (statistic, p_value, crit_low, crit_high)
+        3. tail : Kind of tail test used
+        4. loc : Level of confidence
+
+    Return: ``test_result`` record
+    """
+    tail = _TAILS[tail]
+    crit_low = crit_high = np.nan
+    if test == 'z':
+        statistic, p_value = output
+    elif test == 'chi2':
+        statistic, p_value = output[0], output[-1]
+        crits = output[1:-1]
+    elif test == 'f':
+        statistic, p_value = output[0], output[1]
+        crits = output[2:]
+    else:
+        raise ValueError('invalid test')
+    if test != 'z':
+        if tail == 'lr':
+            crit_low, crit_high = crits
+        elif tail == 'l':
+            crit_low = crits[0]
+        else:
+            crit_high = crits[0]
+    return test_result(statistic,p_value,crit_low,crit_high,tail=tail,loc=loc)
+
+def result_array(statistic,p_value,crit_low=np.nan,crit_high=np.nan,tail='lr',loc=0.95):
+    """
+    Description: This function packs the arrays returned by the batched tests into one structured array of ``result_dtype``
+                 and fills the decision column with ``decide``.
+
+    Return: Structured NumPy array, one record per test
+    """
+    statistic = np.asarray(statistic,dtype=float)
+    records = np.empty(statistic.shape,dtype=result_dtype)
+    records['statistic'] = statistic
+    records['p_value'] = p_value
+    records['crit_low'] = crit_low
+    records['crit_high'] = crit_high
+    records['tail'] = np.vectorize(_TAILS.get,otypes=['U2'])(tail) if np.ndim(tail) else _TAILS[tail]
+    records['loc'] = loc
+    records['reject'] = decide(records)
+    return records
+
+def to_records(results):
+    """
+    Description: This function collects a list of ``test_result`` objects into one structured array of ``result_dtype``.
+    """
+    return np.array([(res.statistic,res.p_value,res.crit_low,res.crit_high,res.tail,res.loc,bool(res.reject))
+                     for res in results],dtype=result_dtype)
+
+def decide(results,loc=None,kind_of_test=None,rule='auto',frame=None,column='reject'):
+    """
+    Description: This function is the vectorized, non-printing version of ``hyp_test`` and ``chi_square_hyp_test``.
+                 It checks p <= alpha (and the sign of the statistic or the critical values, like those functions) for a
+                 whole batch of results at once.
+
+    Input Parameters: It accepts below inputs:
+        1. results : Structured array of ``result_dtype`` (``result_array``/``to_records``)
+        2. loc : Level of confidence. By default the ``loc`` stored in every record.
+        3. kind_of_test : 'l', 'r' or 'lr' for every record. By default the ``tail`` stored in every record.
+        4. rule : Decision rule. It expects below values:
+                    a) "z" : ``hyp_test`` rule -- the statistic has to be on the side of the tail for one tail tests
+                    b) "chi2" : ``chi_square_hyp_test`` rule -- for 'lr' the statistic has to be outside the critical values
+                    c) "auto" : "chi2" for records having critical values and "z" otherwise (default)
+        5. frame : Optional Pandas DataFrame in which the decisions are written as the ``column`` column
+        6. column : Name of the column written in ``frame`` (by default 'reject')
+
+    Return: Boolean array, True where the Null Hypothesis is rejected
+    """
+    results = np.atleast_1d(results)
+    loc = results['loc'] if loc is None else loc
+    tail = results['tail'] if kind_of_test is None else _TAILS[kind_of_test]
+    alpha = 1 - np.asarray(loc)
+    stat, p_value = results['statistic'], results['p_value']
+    crit_low, crit_high = results['crit_low'], results['crit_high']
+    significant = p_value < alpha
+
+    z_reject = np.where(tail == 'l',significant & (stat < 0),
+                        np.where(tail == 'r',significant & (stat > 0),significant))
+    outside = (stat < crit_low) | (stat > crit_high)
+    chi2_reject = np.where(tail == 'lr',significant & outside,significant)
+
+    if rule == 'z':
+        reject = z_reject
+    elif rule == 'chi2':
+        reject = chi2_reject
+    elif rule == 'auto':
+        has_crit = ~(np.isnan(crit_low) & np.isnan(crit_high))
+        reject = np.where(has_crit,chi2_reject,z_reject)
+    else:
+        raise ValueError('invalid rule')
+
+    if frame is not None:
+        frame[column] = reject
+    return reject
+
+def to_frame(results):
+    """
+    Description: This function returns a batch of results as a columnar Pandas DataFrame.
+    """
+    return pd.DataFrame(np.atleast_1d(results))
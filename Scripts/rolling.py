@@ -0,0 +1,378 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+from .batched_tests import _z_pvalue
+
+# Tests available in the rolling mode
+ROLLING_TESTS = ['proportion', 'ztest']
+
+def _chan_merge(n_a,mean_a,m2_a,n_b,mean_b,m2_b):
+    """
+    Description: This function merges two sets of moments (count, mean and M2) with Chan's parallel update, vectorized.
+    """
+    n = n_a + n_b
+    with np.errstate(invalid='ignore',divide='ignore'):
+        weight = np.where(n > 0,n_b / n,0.)
+    delta = np.where((n_a > 0) & (n_b > 0),mean_b - mean_a,0.)
+    mean = np.where(n_a > 0,mean_a + delta * weight,mean_b)
+    m2 = m2_a + m2_b + delta * delta * n_a * weight
+    return n, mean, m2
+
+def _shifted_moments(n,s,ss,shift):
+    """
+    Description: This function converts the sums of shifted observations (count, sum and sum of squares of x - shift)
+                 into the count, mean and M2 of the observations.
+    """
+    with np.errstate(invalid='ignore',divide='ignore'):
+        mean = np.where(n > 0,shift + s / n,np.nan)
+        m2 = np.where(n > 0,np.maximum(ss - s * s / n,0.),0.)
+    return n, mean, m2
+
+def _window_moments(codes,position,counts,values,window,offset):
+    """
+    Description: This function calculates the moments of the trailing window of every row of one column in one
+                 vectorized sweep, without any cumulative sum over the whole series (van Herk/Gil-Werman blocks):
+                    - the rows of every group are cut in blocks of ``window`` rows, laid out as the rows of a 2-D array
+                    - prefix and suffix sums of every block are taken along that array (sums shifted by the block mean)
+                    - the window of a row is the prefix of its block plus the suffix of the previous block, merged with
+                      Chan's update. Every row then costs O(1) whatever the window length.
+
+    Input Parameters: It accepts below inputs:
+        1. codes : Group code of every row (rows sorted by group and time)
+        2. position : Position of every row inside its group
+        3. counts : Number of rows of every group
+        4. values : Observations of every row (NaN's are not counted)
+        5. window : Number of rows (time steps) of the window
+        6. offset : Lag of the window -- the window of row k covers rows k - offset - window + 1 to k - offset
+
+    Returns: Per row
+                - Number of non-null observations of the window
+                - Mean
+                - M2 (sum of squared deviations from the mean)
+    """
+    n_blocks = -(-counts // window)
+    block_start = np.concatenate(([0],np.cumsum(n_blocks)[:-1]))
+    padded = np.full((int(n_blocks.sum()),window),np.nan)
+    padded[block_start[codes] + position // window,position % window] = values
+
+    mask = ~np.isnan(padded)
+    cnt = mask.sum(1)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        shift = np.where(cnt > 0,np.where(mask,padded,0.).sum(1) / cnt,0.)
+    dev = np.where(mask,padded - shift[:,None],0.)
+    sums = [mask.astype(float),dev,dev * dev]
+    prefix = [np.cumsum(arr,axis=1) for arr in sums]
+    suffix = [np.cumsum(arr[:,::-1],axis=1)[:,::-1] for arr in sums]
+
+    hi = position - offset
+    lo = np.maximum(hi - window + 1,0)
+    valid = hi >= 0
+    hi, lo = np.where(valid,hi,0), np.where(valid,lo,0)
+    row_hi = block_start[codes] + hi // window
+    row_lo = block_start[codes] + lo // window
+    n_a, mean_a, m2_a = _shifted_moments(*[arr[row_hi,hi % window] for arr in prefix],shift[row_hi])
+    # Windows starting inside a block (not on its first row) also take the end of that block
+    split = (lo % window) != 0
+    n_b, mean_b, m2_b = _shifted_moments(*[np.where(split,arr[row_lo,lo % window],0.) for arr in suffix],shift[row_lo])
+    n, mean, m2 = _chan_merge(n_a,mean_a,m2_a,n_b,mean_b,m2_b)
+    n = np.where(valid,n,0.)
+    return n, np.where(n > 0,mean,np.nan), np.where(n > 0,m2,0.)
+
+class rolling_window_tests:
+    """
+    Description: This class performs ``one_porportion_ztest`` or ``ztest_notpooled`` over the trailing window of every
+                 group of a time series (e.g. one row per state and day). Every group keeps the last window of
+                 observations in a ring buffer together with the running count, sum and sum of squares of that window,
+                 so a new time step only adds the entering observation and removes the leaving one -- O(1) per step
+                 and per group. The windows are counted in rows (time steps) of a group; missing days should be added
+                 as NaN rows when the window has to be in calendar time.
+
+                 The second sample of the two sample Z test is either a second column or, with ``lag``, the window of
+                 the same column ending ``lag`` steps earlier (e.g. last 7 days against the 7 days before).
+    """
+    __slots__ = ('window','test','pop_proportion','value','alternative','ddof','lag','min_periods','n_cols',
+                 '_channels','labels','_positions','ring','steps','shift','sums')
+
+    def __init__(self,window,test='proportion',pop_proportion=0.5,value=0,alternative='two-sided',ddof=1.,
+                 two_sample=False,lag=None,min_periods=None):
+        """
+        Description: This function is created for initializing an empty rolling test.
+
+        Input Parameters: It accepts below inputs:
+            1. window : Number of time steps of the trailing window
+            2. test : Test performed on every window. It expects below values:
+                        a) "proportion" : ``one_porportion_ztest`` of the sample proportions of the window (default)
+                        b) "ztest" : ``ztest_notpooled``, one sample or two samples (see ``two_sample`` and ``lag``)
+            3. pop_proportion : Proportion accepted as the Null Hypothesis of the proportion test
+            4. value : Mean or difference in means under the Null Hypothesis of the Z test
+            5. alternative : Kind of tail test -- "smaller", "larger" or "two-sided" (default)
+            6. ddof : Degrees of freedom used for the variance of the mean in the one sample Z test
+            7. two_sample : True when a second column holds the second sample of the Z test
+            8. lag : Lag (in steps) of the window of the second sample taken from the same column. ``lag=window``
+                     compares every window with the previous one.
+            9. min_periods : Minimum number of non-null observations in a window (in each sample) for a test, by
+                             default ``window``. Windows with less observations give NaN's.
+
+        Child-Functions:
+            ``backfill`` : Tests every row of a long-format DataFrame and primes the windows for ``append``
+            ``append``   : Adds one time step for a set of groups and tests their new windows
+            ``to_frame`` : Returns the tests of the current window of every group
+        """
+        if test not in ROLLING_TESTS:
+            raise ValueError('invalid test')
+        if alternative not in ['smaller', 'larger', 'two-sided']:
+            raise ValueError('invalid alternative')
+        if int(window) < 1:
+            raise ValueError('window must be a positive integer')
+        if test == 'proportion' and (two_sample or lag is not None):
+            raise ValueError('the proportion test has one sample only')
+        if two_sample and lag is not None:
+            raise ValueError('use either two_sample or lag')
+        self.window = int(window)
+        self.test = test
+        self.pop_proportion = pop_proportion
+        self.value = value
+        self.alternative = alternative
+        self.ddof = ddof
+        self.lag = None if lag is None else int(lag)
+        self.min_periods = self.window if min_periods is None else int(min_periods)
+        self.n_cols = 2 if two_sample else 1
+        # Windows tested {sample: (column, lag)}
+        self._channels = [(0,0)]
+        if two_sample:
+            self._channels.append((1,0))
+        elif lag is not None:
+            self._channels.append((0,self.lag))
+        self._reset()
+
+    def _reset(self):
+        """
+        Description: This function drops every group.
+        """
+        size = self.window + max(lag for _, lag in self._channels)
+        self.labels = []
+        self._positions = {}
+        self.ring = np.full((0,size,self.n_cols),np.nan)
+        self.steps = np.zeros(0,dtype=np.int64)
+        self.shift = np.full((0,self.n_cols),np.nan)
+        self.sums = np.zeros((0,len(self._channels),3))
+
+    def _slots_for(self,keys):
+        """
+        Description: This function returns the array positions of the given group keys, adding new groups when needed.
+        """
+        new_keys = [key for key in keys if key not in self._positions]
+        if new_keys:
+            for key in new_keys:
+                self._positions[key] = len(self.labels)
+                self.labels.append(key)
+            grow = len(new_keys)
+            self.ring = np.concatenate((self.ring,np.full((grow,) + self.ring.shape[1:],np.nan)))
+            self.steps = np.concatenate((self.steps,np.zeros(grow,dtype=np.int64)))
+            self.shift = np.concatenate((self.shift,np.full((grow,self.n_cols),np.nan)))
+            self.sums = np.concatenate((self.sums,np.zeros((grow,) + self.sums.shape[1:])))
+        return np.array([self._positions[key] for key in keys],dtype=np.intp)
+
+    def _refresh(self,slots):
+        """
+        Description: This function recomputes the window sums of some groups from their ring buffers, shifted by the mean
+                     of the buffer. It is run every time a ring buffer wraps around, so the rounding errors of the
+                     add/remove updates never build up and the cost stays O(1) per step on average.
+        """
+        size = self.ring.shape[1]
+        steps = self.steps[slots][:,None]
+        # Time step held by every position of the ring buffers
+        first = steps - size
+        held = first + (np.arange(size)[None,:] - first) % size
+        values = self.ring[slots]
+        for col in range(self.n_cols):
+            col_values = values[:,:,col]
+            mask = ~np.isnan(col_values) & (held >= 0)
+            cnt = mask.sum(1)
+            with np.errstate(invalid='ignore',divide='ignore'):
+                self.shift[slots,col] = np.where(cnt > 0,np.where(mask,col_values,0.).sum(1) / cnt,np.nan)
+        for pos, (col, lag) in enumerate(self._channels):
+            col_values = values[:,:,col]
+            inside = (held >= steps - lag - self.window) & (held < steps - lag) & (held >= 0) & ~np.isnan(col_values)
+            dev = np.where(inside,col_values - self.shift[slots,col][:,None],0.)
+            self.sums[slots,pos] = np.column_stack((inside.sum(1),dev.sum(1),(dev * dev).sum(1)))
+
+    def _tests(self,n1,mean1,m2_1,n2=None,mean2=None,m2_2=None):
+        """
+        Description: This function performs the test of many windows at once from their moments, with the formulas of
+                     ``one_porportion_ztest_batch`` and ``ztest_notpooled_batch`` (variances with ddof=0).
+
+        Returns:
+            - Test Statistic
+            - P-value of the Test Statistic
+        """
+        with np.errstate(invalid='ignore',divide='ignore'):
+            if self.test == 'proportion':
+                denom = np.sqrt((self.pop_proportion * (1 - np.asarray(self.pop_proportion))) / n1)
+                test_stat = np.divide(mean1 - self.pop_proportion,denom)
+                enough = n1 >= self.min_periods
+            elif n2 is None:
+                test_stat = (mean1 - self.value) / np.sqrt((m2_1 / n1) / (n1 - self.ddof))
+                enough = n1 >= self.min_periods
+            else:
+                test_stat = (mean1 - mean2 - self.value) / np.sqrt(m2_1 / n1 / n1 + m2_2 / n2 / n2)
+                enough = (n1 >= self.min_periods) & (n2 >= self.min_periods)
+        test_stat = np.where(enough & (n1 > 0),test_stat,np.nan)
+        return test_stat, _z_pvalue(test_stat,self.alternative)
+
+    def _frame(self,moments,index):
+        """
+        Description: This function lays out the window moments and the tests as a DataFrame.
+        """
+        test_stat, p_val = self._tests(*[arr for sample in moments for arr in sample])
+        columns = {}
+        for pos, (n, mean, _) in enumerate(moments,start=1):
+            columns['nobs{}'.format(pos)] = n.astype(np.int64)
+            columns['mean{}'.format(pos)] = mean
+        columns['test_stat'] = test_stat
+        columns['p_value'] = p_val
+        return pd.DataFrame(columns,index=index)
+
+    def backfill(self,df,group_col,value_col,value_col2=None,time_col=None):
+        """
+        Description: This function tests the trailing window of every row of a long-format DataFrame (one row per group
+                     and time step) for all the groups in one vectorized sweep, and keeps the last windows of every group
+                     so that ``append`` can carry on with the next time steps. Any previous state is dropped.
+
+        Input Parameters: It accepts below inputs:
+            1. df : Long-format Pandas DataFrame (e.g. ``Datasets/StatewiseTestingDetails.csv``)
+            2. group_col : Column holding the group key (e.g. "State")
+            3. value_col : Column holding the observations (sample proportions for the proportion test)
+            4. value_col2 : Column holding the second sample (when ``two_sample`` is True)
+            5. time_col : Column giving the order of the rows inside a group (e.g. parsed dates). By default the rows
+                          are taken in the order of the DataFrame.
+
+        Return: DataFrame aligned on ``df.index`` with the window count and mean of every sample (``nobs1``, ``mean1``,
+                ``nobs2``, ``mean2``), ``test_stat`` and ``p_value``
+        """
+        if (value_col2 is not None) != (self.n_cols == 2):
+            raise ValueError('value_col2 is needed for (and only for) two_sample tests')
+        value_cols = [value_col] if value_col2 is None else [value_col,value_col2]
+        codes, labels = pd.factorize(df[group_col],sort=True)
+        keep = np.flatnonzero(codes >= 0)
+        codes = codes[keep]
+        if time_col is None:
+            order = np.argsort(codes,kind='stable')
+        else:
+            order = np.lexsort((np.asarray(df[time_col])[keep],codes))
+        rows, codes = keep[order], codes[order]
+        values = df[value_cols].to_numpy(dtype=float)[rows]
+
+        counts = np.bincount(codes,minlength=len(labels))
+        starts = np.concatenate(([0],np.cumsum(counts)[:-1]))
+        position = np.arange(len(codes)) - starts[codes]
+
+        moments = [_window_moments(codes,position,counts,values[:,col],self.window,lag) for col, lag in self._channels]
+        out = self._frame(moments,df.index[rows]).reindex(df.index)
+
+        # Last steps of every group into the ring buffers
+        self._reset()
+        slots = self._slots_for(list(labels))
+        size = self.ring.shape[1]
+        last = position >= (counts - size)[codes]
+        self.ring[slots[codes[last]],position[last] % size] = values[last]
+        self.steps[slots] = counts
+        self._refresh(slots)
+        return out
+
+    def append(self,groups,x1,x2=None):
+        """
+        Description: This function adds one time step (the next observation) for a set of groups and tests their new
+                     windows. Every group costs O(1): the entering observation is added to the window sums and the
+                     leaving one is removed.
+
+        Input Parameters: It accepts below inputs:
+            1. groups : List of group keys (each one at most once). New keys start a new group.
+            2. x1 : Observations of the groups (NaN for a missing one)
+            3. x2 : Observations of the second sample (when ``two_sample`` is True)
+
+        Return: DataFrame indexed by group with the step number of the observation, the window count and mean of every
+                sample, ``test_stat`` and ``p_value``
+        """
+        groups = list(groups)
+        if len(set(groups)) != len(groups):
+            raise ValueError('a group can only be given once per step')
+        if (x2 is not None) != (self.n_cols == 2):
+            raise ValueError('x2 is needed for (and only for) two_sample tests')
+        values = np.asarray(x1,dtype=float).reshape(-1,1)
+        if x2 is not None:
+            values = np.column_stack((values,np.asarray(x2,dtype=float)))
+        slots = self._slots_for(groups)
+        steps = self.steps[slots]
+        size = self.ring.shape[1]
+
+        # Groups seen without any observation so far are shifted by their first one
+        unset = np.isnan(self.shift[slots]) & ~np.isnan(values)
+        self.shift[slots] = np.where(unset,values,self.shift[slots])
+
+        for pos, (col, lag) in enumerate(self._channels):
+            shift = self.shift[slots,col]
+            enter_step = steps - lag
+            if lag == 0:
+                entering = values[:,col]
+            else:
+                entering = np.where(enter_step >= 0,self.ring[slots,enter_step % size,col],np.nan)
+            leave_step = enter_step - self.window
+            leaving = np.where(leave_step >= 0,self.ring[slots,leave_step % size,col],np.nan)
+            for sign, obs in [(1.,entering),(-1.,leaving)]:
+                present = ~np.isnan(obs)
+                dev = np.where(present,obs - shift,0.)
+                self.sums[slots,pos] += sign * np.column_stack((present,dev,dev * dev))
+
+        self.ring[slots,steps % size] = values
+        self.steps[slots] = steps + 1
+        wrapped = slots[self.steps[slots] % size == 0]
+        if len(wrapped):
+            self._refresh(wrapped)
+
+        out = self._frame(self._moments(slots),pd.Index(groups,name='group'))
+        out.insert(0,'step',steps)
+        return out
+
+    def _moments(self,slots):
+        """
+        Description: This function returns the count, mean and M2 of the current window of every sample of some groups.
+        """
+        return [_shifted_moments(*self.sums[slots,pos].T,self.shift[slots,col])
+                for pos, (col, _) in enumerate(self._channels)]
+
+    def to_frame(self):
+        """
+        Description: This function returns the tests of the current window of every group.
+
+        Return: DataFrame indexed by group with the number of steps seen, the window count and mean of every sample,
+                ``test_stat`` and ``p_value``
+        """
+        slots = np.arange(len(self.labels))
+        out = self._frame(self._moments(slots),pd.Index(self.labels,name='group'))
+        out.insert(0,'steps',self.steps)
+        return out
+
+def rolling_tests(df,group_col,value_col,window,test='proportion',value_col2=None,time_col=None,**kwargs):
+    """
+    Description: This function performs ``one_porportion_ztest`` or ``ztest_notpooled`` over the trailing window of every
+                 row of a long-format time series, for all the groups in one vectorized sweep (see
+                 ``rolling_window_tests.backfill``).
+
+    Input Parameters: It accepts below inputs:
+        1. df : Long-format Pandas DataFrame, one row per group and time step
+        2. group_col : Column holding the group key
+        3. value_col : Column holding the observations
+        4. window : Number of time steps of the trailing window
+        5. test : "proportion" (default) or "ztest"
+        6. value_col2 : Column holding the second sample of a two sample Z test
+        7. time_col : Column giving the order of the rows inside a group
+        8. kwargs : Other arguments of ``rolling_window_tests`` (pop_proportion, value, alternative, ddof, lag, min_periods)
+
+    Returns:
+        - DataFrame aligned on ``df.index`` with ``nobs1``, ``mean1`` (``nobs2``, ``mean2``), ``test_stat`` and ``p_value``
+        - ``rolling_window_tests`` primed with the last windows, ready for ``append``
+    """
+    roller = rolling_window_tests(window,test=test,two_sample=value_col2 is not None,**kwargs)
+    out = roller.backfill(df,group_col,value_col,value_col2=value_col2,time_col=time_col)
+    return out, roller
@@ -0,0 +1,212 @@
+# Importing Packages
+import math
+import numpy as np
+import pandas as pd
+
+class msprt_tests:
+    """
+    Description: This class runs many sequential (always-valid) tests at once with the mixture Sequential Probability
+                 Ratio Test (mSPRT). Every experiment keeps O(1) state -- count, mean and M2 per arm, the running
+                 always-valid p-value and its decision -- held in arrays, so a batch of events updates thousands of
+                 experiments with a few vectorized operations and no recompute over past data.
+
+                 The test statistic follows the fixed-horizon tests of ``stats_tests``:
+                    - "ztest" : difference of the means of two arms with not pooled variances (``ztest_notpooled``)
+                    - "proportion" : sample proportion of one arm against ``pop_proportion`` (``one_porportion_ztest``)
+                 With a normal mixture N(value, tau2) on the effect, the likelihood ratio after n observations is
+                    Lambda = sqrt(V / (V + tau2)) * exp((diff - value)**2 * tau2 / (2 * V * (V + tau2)))
+                 where V is the variance of the estimated difference, and the always-valid p-value is the running minimum
+                 of 1 / Lambda. It can be checked after every batch without inflating the type-I error (two-sided).
+    """
+    __slots__ = ('n_experiments','test','alpha','value','pop_proportion','tau','max_samples',
+                 'count','mean','m2','p_value','rejected','n_updates')
+
+    def __init__(self,n_experiments,test='ztest',alpha=0.05,value=0.,pop_proportion=None,tau=0.1,max_samples=None):
+        """
+        Description: This function is created for initializing the state of ``n_experiments`` experiments.
+
+        Input: It accepts below input parameters:
+            1. ``n_experiments`` : Number of concurrent experiments, addressed by their position 0 .. n_experiments-1
+            2. ``test`` : "ztest" (two arms, default) or "proportion" (one arm of 0/1 events)
+            3. ``alpha`` : Level of significance of the stop decision (by default 0.05)
+            4. ``value`` : Difference of the means under the Null Hypothesis for "ztest" (by default 0)
+            5. ``pop_proportion`` : Proportion under the Null Hypothesis for "proportion"
+            6. ``tau`` : Standard deviation of the mixture on the effect, in units of the standard deviation of one
+                         observation (by default 0.1, i.e. the test is most sensitive to effects around 0.1 sigma)
+            7. ``max_samples`` : Optional horizon, an experiment also stops (without rejection) once every arm has this
+                                 many observations
+
+        Child-Functions:
+            ``update``         : Adds a batch of raw events (experiment, value) of one arm
+            ``update_moments`` : Adds pre-aggregated (count, mean, M2) of a batch of one arm
+            ``push``           : Adds one event (scalar fast path)
+            ``stop``           : Stop/continue decision of every experiment
+            ``to_frame``       : State, p-values and decisions as a DataFrame
+        """
+        if test not in ['ztest', 'proportion']:
+            raise ValueError('invalid test')
+        if test == 'proportion' and pop_proportion is None:
+            raise ValueError('pop_proportion is needed for the proportion test')
+        n_arms = 2 if test == 'ztest' else 1
+        self.n_experiments = int(n_experiments)
+        self.test = test
+        self.alpha = alpha
+        self.value = value
+        self.pop_proportion = pop_proportion
+        self.tau = tau
+        self.max_samples = max_samples
+        self.count = np.zeros((n_arms,self.n_experiments),dtype=np.int64)
+        self.mean = np.zeros((n_arms,self.n_experiments))
+        self.m2 = np.zeros((n_arms,self.n_experiments))
+        self.p_value = np.ones(self.n_experiments)
+        self.rejected = np.zeros(self.n_experiments,dtype=bool)
+        self.n_updates = np.zeros(self.n_experiments,dtype=np.int64)
+
+    def _combine(self,pos,arm,count,mean,m2):
+        """
+        Description: This function merges the moments of a batch into the state of the experiments ``pos`` (Chan et al.).
+        """
+        old_count = self.count[arm,pos]
+        total = old_count + count
+        delta = mean - self.mean[arm,pos]
+        with np.errstate(invalid='ignore',divide='ignore'):
+            weight = np.where(total > 0,count / total,0.)
+        self.mean[arm,pos] += delta * weight
+        self.m2[arm,pos] += m2 + (delta * delta) * (old_count * weight)
+        self.count[arm,pos] = total
+        self._refresh(pos)
+        return self
+
+    def _refresh(self,pos):
+        """
+        Description: This function recomputes the mixture likelihood ratio of the experiments ``pos`` from their moments
+                     and lowers their always-valid p-values.
+        """
+        count = self.count[:,pos].astype(float)
+        if self.test == 'ztest':
+            with np.errstate(invalid='ignore',divide='ignore'):
+                var = self.m2[:,pos] / (count - 1)
+                var_diff = var[0] / count[0] + var[1] / count[1]
+                diff = self.mean[0,pos] - self.mean[1,pos] - self.value
+                tau2 = (self.tau**2) * (var[0] + var[1]) / 2
+            ready = (count >= 2).all(axis=0) & (var_diff > 0)
+        else:
+            pop_var = self.pop_proportion * (1 - self.pop_proportion)
+            with np.errstate(invalid='ignore',divide='ignore'):
+                var_diff = pop_var / count[0]
+            diff = self.mean[0,pos] - self.pop_proportion
+            tau2 = (self.tau**2) * pop_var
+            ready = count[0] >= 1
+        with np.errstate(invalid='ignore',divide='ignore',over='ignore'):
+            # 1 / Lambda in log space, the exponent overflows for large effects
+            log_inv_lr = 0.5 * np.log((var_diff + tau2) / var_diff) - (diff**2) * tau2 / (2 * var_diff * (var_diff + tau2))
+            inv_lr = np.exp(np.minimum(log_inv_lr,0.))
+        inv_lr = np.where(ready,inv_lr,1.)
+        self.p_value[pos] = np.minimum(self.p_value[pos],inv_lr)
+        self.rejected[pos] |= self.p_value[pos] <= self.alpha
+        self.n_updates[pos] += 1
+
+    def update(self,experiments,values,arm=0):
+        """
+        Description: This function adds a batch of raw events of one arm. The events are reduced per experiment with one
+                     grouped pass (``np.bincount``) and merged into the state. NaN values are ignored.
+
+        Input Parameters: It accepts below inputs:
+            1. experiments : Array of experiment positions, one per event
+            2. values : Array of observations (0/1 for the proportion test), one per event
+            3. arm : Arm of the events, 0 or 1 (the second arm only exists for "ztest")
+
+        Return: The object itself
+        """
+        experiments = np.asarray(experiments,dtype=np.intp)
+        values = np.asarray(values,dtype=float)
+        keep = ~np.isnan(values)
+        experiments, values = experiments[keep], values[keep]
+        count = np.bincount(experiments,minlength=self.n_experiments)
+        with np.errstate(invalid='ignore',divide='ignore'):
+            mean = np.bincount(experiments,weights=values,minlength=self.n_experiments) / count
+        dev = values - mean[experiments]
+        m2 = np.bincount(experiments,weights=dev * dev,minlength=self.n_experiments)
+        pos = np.flatnonzero(count)
+        return self._combine(pos,arm,count[pos],mean[pos],m2[pos])
+
+    def update_moments(self,experiments,count,mean,m2,arm=0):
+        """
+        Description: This function adds pre-aggregated batches of one arm, e.g. built with ``grouped_moments`` or a SQL
+                     aggregation. ``experiments`` must not contain duplicates.
+
+        Input Parameters: It accepts below inputs:
+            1. experiments : Array of experiment positions
+            2. count, mean, m2 : Count, mean and sum of squared deviations of the batch of every experiment
+            3. arm : Arm of the batches, 0 or 1
+
+        Return: The object itself
+        """
+        pos = np.asarray(experiments,dtype=np.intp)
+        return self._combine(pos,arm,np.asarray(count,dtype=np.int64),np.asarray(mean,dtype=float),
+                             np.asarray(m2,dtype=float))
+
+    def push(self,experiment,value,arm=0):
+        """
+        Description: This function adds one event with Welford's update and refreshes the p-value of its experiment.
+        Return: The always-valid p-value of the experiment
+        """
+        value = float(value)
+        if value != value:
+            return self.p_value[experiment]
+        count = self.count[arm,experiment] + 1
+        delta = value - self.mean[arm,experiment]
+        self.count[arm,experiment] = count
+        self.mean[arm,experiment] += delta / count
+        self.m2[arm,experiment] += delta * (value - self.mean[arm,experiment])
+
+        # Scalar version of ``_refresh`` (plain floats, no array temporaries)
+        if self.test == 'ztest':
+            count1, count2 = int(self.count[0,experiment]), int(self.count[1,experiment])
+            if count1 < 2 or count2 < 2:
+                return self.p_value[experiment]
+            var1, var2 = self.m2[0,experiment] / (count1 - 1), self.m2[1,experiment] / (count2 - 1)
+            var_diff = var1 / count1 + var2 / count2
+            diff = self.mean[0,experiment] - self.mean[1,experiment] - self.value
+            tau2 = (self.tau**2) * (var1 + var2) / 2
+            if var_diff <= 0:
+                return self.p_value[experiment]
+        else:
+            pop_var = self.pop_proportion * (1 - self.pop_proportion)
+            var_diff = pop_var / count
+            diff = self.mean[0,experiment] - self.pop_proportion
+            tau2 = (self.tau**2) * pop_var
+        log_inv_lr = 0.5 * math.log((var_diff + tau2) / var_diff) - (diff**2) * tau2 / (2 * var_diff * (var_diff + tau2))
+        p_value = min(float(self.p_value[experiment]),math.exp(min(log_inv_lr,0.)))
+        self.p_value[experiment] = p_value
+        if p_value <= self.alpha:
+            self.rejected[experiment] = True
+        self.n_updates[experiment] += 1
+        return p_value
+
+    def stop(self):
+        """
+        Description: This function returns the stop/continue decision of every experiment. An experiment stops once its
+                     always-valid p-value is at most ``alpha`` (Null Hypothesis rejected) or when every arm has reached
+                     ``max_samples`` observations.
+
+        Return: Boolean array, True means stop
+        """
+        stop = self.rejected.copy()
+        if self.max_samples is not None:
+            stop |= (self.count >= self.max_samples).all(axis=0)
+        return stop
+
+    def to_frame(self):
+        """
+        Description: This function returns the state of every experiment as a DataFrame with the counts and means of
+                     every arm, the always-valid p-value, the rejection and the stop decision.
+        """
+        frame = {}
+        for arm in range(self.count.shape[0]):
+            frame['n{}'.format(arm + 1)] = self.count[arm]
+            frame['mean{}'.format(arm + 1)] = self.mean[arm]
+        frame['p_value'] = self.p_value
+        frame['reject'] = self.rejected
+        frame['stop'] = self.stop()
+        return pd.DataFrame(frame)
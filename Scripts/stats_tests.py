@@ -1,8 +1,8 @@
 # Importing Packages
 import numpy as np
-import pandas as pd
-import scipy.stats as scipy_stats
-from scipy.stats import norm as z_nm
+from .accumulators import running_moments
+from . import dist_cache
+from . import instrumentation
     
 def one_porportion_ztest(smp_porportion,pop_proportion,alternative='two-sided',nan_policy=False):
     """
@@ -11,6 +11,7 @@ def one_porportion_ztest(smp_porportion,pop_proportion,alternative='two-sided',n
     Input Parameters :: It accepts below parameters:
         1. smp_proportion : It is the sample proportion array. Sample proportion mean is calculated form this array.
                             The number of values in this array are considered as n i.e. number of samples. 
+                            A ``running_moments`` accumulator of the sample proportions can be given instead of the array.
         2. pop_proportion : It is the propotion which is currently accepted as the Null Hypothesis.
         3. alternative : This parameter represnts the kind of tail test that you can perform. It expects below values:
                             a) "smaller" : Executing the left tail test
@@ -26,35 +27,56 @@ def one_porportion_ztest(smp_porportion,pop_proportion,alternative='two-sided',n
                 2. P-value of the Test Statistic    
     """
 
-    if nan_policy == 'mean':
-        smp_prop = np.array(pd.Series(smp_proportion).fillna(np.mean(smp_proportion)))
-    elif nan_policy == 'median':
-        smp_prop = np.array(pd.Series(smp_proportion).fillna(np.median(smp_proportion)))
+    if isinstance(smp_porportion, running_moments):
+        timer = instrumentation.start('one_porportion_ztest',smp_porportion.count)
+        # NaN's are never pushed into an accumulator
+        smp_prop_mean = smp_porportion.mean
+        n = smp_porportion.count
     else:
-        smp_prop = np.array(pd.Series(smp_porportion).dropna())
+        timer = instrumentation.start('one_porportion_ztest',np.size(smp_porportion))
+        # The array (e.g. a memory-mapped column) is never copied, the NaN's are handled with a mask
+        smp_prop = np.asarray(smp_porportion, dtype=float)
+        nan_mask = np.isnan(smp_prop)
+        n_nan = np.count_nonzero(nan_mask)
+        smp_prop_sum = np.sum(smp_prop, where=~nan_mask) if n_nan else np.sum(smp_prop)
+        n = len(smp_prop) - n_nan
+        if nan_policy == 'mean':
+            # Filling with the mean leaves the mean unchanged
+            n = len(smp_prop)
+            smp_prop_sum = smp_prop_sum * n / (n - n_nan)
+        elif nan_policy == 'median':
+            smp_prop_sum = smp_prop_sum + n_nan * np.median(smp_prop[~nan_mask]) if n_nan else smp_prop_sum
+            n = len(smp_prop)
 
-    smp_prop_mean = np.mean(smp_prop, dtype=np.float)
-    n = len(smp_prop)
+        smp_prop_mean = smp_prop_sum / n
+    if timer is not None:
+        timer.mark('nan_handling')
 
     pops_diff = (smp_prop_mean - pop_proportion)
     denom = np.sqrt((pop_proportion * (1-pop_proportion))/n)
 
     test_stat = np.divide(pops_diff,denom)
+    if timer is not None:
+        timer.mark('moments')
 
     if alternative == 'smaller':
-        p_val = z_nm.cdf(test_stat)
+        p_val = dist_cache.cdf('norm',test_stat)
     elif alternative == 'larger':
-        p_val = z_nm.sf(test_stat)
+        p_val = dist_cache.sf('norm',test_stat)
     elif alternative == 'two-sided':
         test_stat_abs = np.abs(test_stat)
-        p_val = 2 * z_nm.sf(test_stat_abs)
+        p_val = 2 * dist_cache.sf('norm',test_stat_abs)
     else:
         raise ValueError('invalid alternative')
+    if timer is not None:
+        timer.mark('distribution')
 
     test_results = (test_stat, p_val)
+    if timer is not None:
+        timer.finish('formatting')
     return test_results
 
-def hyp_test(test_stats_result,loc,kind_of_test=['l','r','lr']):
+def hyp_test(test_stats_result,loc,kind_of_test=['l','r','lr'],verbose=True):
     """
     Description: This function is performing the p-value comparison with the level of significance or alpha. It checks below condition:
                     1. p <= alpha
@@ -63,18 +85,25 @@ def hyp_test(test_stats_result,loc,kind_of_test=['l','r','lr']):
                     1. test_stats_result : Values of Test Statistic and p-value
                     2. loc : Level of confidence 
                     3. kind_of_test : Any value from the options -- ['l','r','lr']
+                    4. verbose : Print the comparison result (by default True). Use ``results.decide`` for batches.
                     
-    Return: Print the comparison result b/w p-value and alpha.
+    Return: Print the comparison result b/w p-value and alpha and return True if the Null Hypothesis is rejected.
     """
     alpha = 1 - loc
     if (kind_of_test == 'l') & (test_stats_result[0] < 0) & (test_stats_result[1] < alpha):
-        print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = True
     elif (kind_of_test == 'r') & (test_stats_result[0] > 0) & (test_stats_result[1] < alpha):
-        print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = True
     elif (kind_of_test == 'lr') & (test_stats_result[1] < alpha):    
-        print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = True
     else:
-        print("Researcher claim is wrong. Thus, fail to reject the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = False
+    if verbose:
+        if reject:
+            print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        else:
+            print("Researcher claim is wrong. Thus, fail to reject the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+    return reject
 
 def chi_square_one_pop(f_exp,loc,test_tail=(['l','r','lr']),ddof=False,sample_data=False,sample_stddev=False):
     """
@@ -85,7 +114,7 @@ def chi_square_one_pop(f_exp,loc,test_tail=(['l','r','lr']),ddof=False,sample_da
         2. loc : Level of confidence. Used this parameter to calculate the critical value
         3. test_tail : This parameter represents which kind of test you want to perform
         4. ddof : Degree of freedom. Use this paramter if you want to provide the adhoc value of dof
-        5. sample_data : One dimensional array containing the sample data
+        5. sample_data : One dimensional array containing the sample data or a ``running_moments`` accumulator of it
         6. sample_stddev : You can provide the standard deviation of the sample directly as an input to perform the chi-sqaure test
         
     Returns:
@@ -111,33 +140,41 @@ def chi_square_one_pop(f_exp,loc,test_tail=(['l','r','lr']),ddof=False,sample_da
         Description: This function calculates the mean, variance and standard deviation of the 1 population.
         
         Input: It accepts below inp parameters:
-            1. input_array : Sample Population-1
+            1. input_array : Sample Population-1 (array or ``running_moments`` accumulator)
             
         Returns: Population-1:
                     - Mean
-                    - Variance
+                    - Variance (sample variance i.e. ddof=1)
                     - Standard Deviation
         """
-        sample_data_mean = round(np.mean(input_array,dtype='float'),3)
-        sample_data_stddev = round(np.mean(input_array,dtype='float'),3)
-        sample_data_var = round(np.var(input_array,dtype='float'),3)
+        if isinstance(input_array, running_moments):
+            input_acc = input_array
+        else:
+            input_acc = running_moments().update(input_array)
+        sample_data_mean = round(input_acc.mean,3)
+        sample_data_var = round(input_acc.var(ddof=1),3)
+        sample_data_stddev = round(input_acc.std(ddof=1),3)
         return sample_data_mean, sample_data_var, sample_data_stddev
     
-    if sample_stddev != False and sample_data == False and ddof != False:
+    timer = instrumentation.start('chi_square_one_pop',None if sample_data is False else
+                                  (sample_data.count if isinstance(sample_data, running_moments) else np.size(sample_data)))
+    if sample_stddev != False and sample_data is False and ddof != False:
         sample_data_stddev = sample_stddev
         sample_data_var = sample_data_stddev**2
         dof = ddof
-    elif sample_data != False and sample_stddev == False and ddof == False:
-        sample_data_mean, sample_data_stddev, sample_data_var = cal_mean_var_std(sample_data)
+    elif sample_data is not False and sample_stddev == False and ddof == False:
+        sample_data_mean, sample_data_var, sample_data_stddev = cal_mean_var_std(sample_data)
         total_obs = len(sample_data)
         dof = (total_obs-1)
-    elif sample_data != False and sample_stddev == False and ddof != False:
-        sample_data_mean, sample_data_stddev, sample_data_var = cal_mean_var_std(sample_data)
+    elif sample_data is not False and sample_stddev == False and ddof != False:
+        sample_data_mean, sample_data_var, sample_data_stddev = cal_mean_var_std(sample_data)
         dof = ddof
     
     f_exp_var = f_exp**2
     
     test_stat = (dof*sample_data_var)/f_exp_var
+    if timer is not None:
+        timer.mark('moments')
     
     def left_tail_crit_p_val(tail_test,c,df,test_statistic):
         """
@@ -154,10 +191,8 @@ def chi_square_one_pop(f_exp,loc,test_tail=(['l','r','lr']),ddof=False,sample_da
                     - Critical value
                     - p_value
         """
-        alpha = 1 - c
-        lower_tail_prob = alpha
-        critical_val = scipy_stats.chi2.ppf(lower_tail_prob,dof)
-        p_value = 1 - scipy_stats.chi2.cdf(test_stat,dof)
+        critical_val = dist_cache.critical_value('chi2',c,'left',dof)
+        p_value = dist_cache.sf('chi2',test_stat,dof)
         return test_stat, critical_val, p_value
     
     def right_tail_crit_p_val(tail_test,c,df,test_statistic):
@@ -175,9 +210,8 @@ def chi_square_one_pop(f_exp,loc,test_tail=(['l','r','lr']),ddof=False,sample_da
                     - Critical value
                     - p_value
         """
-        lower_tail_prob = c
-        critical_val = scipy_stats.chi2.ppf(lower_tail_prob,dof)
-        p_value = 1 - scipy_stats.chi2.cdf(test_stat,dof)
+        critical_val = dist_cache.critical_value('chi2',c,'right',dof)
+        p_value = dist_cache.sf('chi2',test_stat,dof)
         return test_stat, critical_val, p_value
          
     def two_tail_crit_p_val(tail_test,c,df,test_statistic):
@@ -196,25 +230,25 @@ def chi_square_one_pop(f_exp,loc,test_tail=(['l','r','lr']),ddof=False,sample_da
                     - Right critical value
                     - p value
         """  
-        l_alpha_by_2 = (1 - c)/2
-        l_lower_tail_prob = l_alpha_by_2
-        l_critical_val = scipy_stats.chi2.ppf(l_lower_tail_prob,dof)
-        r_lower_tail_prob = (1 - l_alpha_by_2)
-        r_critical_val = scipy_stats.chi2.ppf(r_lower_tail_prob,dof)
-        p_value = 1 - scipy_stats.chi2.cdf(test_stat,dof)
+        l_critical_val, r_critical_val = dist_cache.critical_value('chi2',c,'two-sided',dof)
+        p_value = dist_cache.sf('chi2',test_stat,dof)
         return test_stat, l_critical_val, r_critical_val, p_value
     
+    result = None
     if test_tail == 'l':
         test_stat, l_cri_val, p_value = left_tail_crit_p_val(tail_test=test_tail,c=loc,df=dof,test_statistic=test_stat)
-        return test_stat, l_cri_val, p_value
+        result = test_stat, l_cri_val, p_value
     if test_tail == 'r':
         test_stat, r_cri_val, p_value = right_tail_crit_p_val(tail_test=test_tail,c=loc,df=dof,test_statistic=test_stat)
-        return test_stat, r_cri_val, p_value
+        result = test_stat, r_cri_val, p_value
     if test_tail == 'lr':    
         test_stat, l_cric_val, r_cric_val, p_value = two_tail_crit_p_val(tail_test=test_tail,c=loc,df=dof,test_statistic=test_stat)
-        return test_stat, l_cric_val, r_cric_val, p_value
+        result = test_stat, l_cric_val, r_cric_val, p_value
+    if timer is not None:
+        timer.finish('distribution')
+    return result
         
-def chi_square_hyp_test(test_stats_result,loc,kind_of_test=['l','r','lr']):
+def chi_square_hyp_test(test_stats_result,loc,kind_of_test=['l','r','lr'],verbose=True):
     """
     Description: This function is performing the p-value comparison(only for chi square distribution) with the level of significance or alpha. It checks below condition:
                     1. p <= alpha
@@ -223,18 +257,25 @@ def chi_square_hyp_test(test_stats_result,loc,kind_of_test=['l','r','lr']):
                     1. test_stats_result : Values of Test Statistic, Left critical value, Right critical value and p-value
                     2. loc : Level of confidence 
                     3. kind_of_test : Any value from the options -- ['l','r','lr']
+                    4. verbose : Print the comparison result (by default True). Use ``results.decide`` for batches.
                     
-    Return: Print the comparison result b/w p-value and alpha.
+    Return: Print the comparison result b/w p-value and alpha and return True if the Null Hypothesis is rejected.
     """
     alpha = 1 - loc
     if (kind_of_test == 'l') & (test_stats_result[-1] < alpha):
-        print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = True
     elif (kind_of_test == 'r') & (test_stats_result[-1] < alpha):
-        print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = True
     elif (kind_of_test == 'lr') & (test_stats_result[-1] < alpha) & ((test_stats_result[0] < test_stats_result[1]) or (test_stats_result[0]) > test_stats_result[2]):    
-        print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = True
     else:
-        print("Researcher claim is wrong. Thus, fail to reject the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        reject = False
+    if verbose:
+        if reject:
+            print("Researcher claim is right. Thus, rejected the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+        else:
+            print("Researcher claim is wrong. Thus, fail to reject the Null Hypothesis at {} L.O.C and {} L.O.S".format(loc,round(alpha,2)))
+    return reject
         
 def ztest_notpooled(x1, x2=None, value=0, alternative='two-sided', usevar='notpooled', ddof=1.):
     '''test for mean based on normal distribution, one or two samples
@@ -243,9 +284,9 @@ def ztest_notpooled(x1, x2=None, value=0, alternative='two-sided', usevar='notpo
 
     Parameters
     ----------
-    x1 : array_like, 1-D or 2-D
+    x1 : array_like, 1-D or 2-D, or running_moments
         first of the two independent samples
-    x2 : array_like, 1-D or 2-D
+    x2 : array_like, 1-D or 2-D, or running_moments
         second of the two independent samples
     value : float
         In the one sample case, value is the mean of x1 under the Null
@@ -281,11 +322,11 @@ def ztest_notpooled(x1, x2=None, value=0, alternative='two-sided', usevar='notpo
         '''
         zstat = (value1 - value2 - diff) / std_diff
         if alternative in ['two-sided', '2-sided', '2s']:
-            pvalue = scipy_stats.norm.sf(np.abs(zstat))*2
+            pvalue = dist_cache.sf('norm',np.abs(zstat))*2
         elif alternative in ['larger', 'l']:
-            pvalue = scipy_stats.norm.sf(zstat)
+            pvalue = dist_cache.sf('norm',zstat)
         elif alternative in ['smaller', 's']:
-            pvalue = scipy_stats.norm.cdf(zstat)
+            pvalue = dist_cache.cdf('norm',zstat)
         else:
             raise ValueError('invalid alternative')
         return zstat, pvalue
@@ -294,11 +335,17 @@ def ztest_notpooled(x1, x2=None, value=0, alternative='two-sided', usevar='notpo
         #print("You are using Two populations whose variances are assumed to be ``Unequal`` or ``Not-pooled``")
         raise NotImplementedError('only usevar="not-pooled" is implemented')
 
-    x1 = np.asarray(x1)
-    nobs1 = x1.shape[0]
-    x1_mean = x1.mean(0)
-    x1_var = x1.var(0)
-    if x2 is not None:
+    if isinstance(x1, running_moments):
+        nobs1, x1_mean, x1_var = x1.count, x1.mean, x1.var()
+    else:
+        x1 = np.asarray(x1)
+        nobs1 = x1.shape[0]
+        x1_mean = x1.mean(0)
+        x1_var = x1.var(0)
+    if isinstance(x2, running_moments):
+        nobs2, x2_mean, x2_var = x2.count, x2.mean, x2.var()
+        var_not_pooled = ((x1_var/nobs1) + (x2_var/nobs2))
+    elif x2 is not None:
         x2 = np.asarray(x2)
         nobs2 = x2.shape[0]
         x2_mean = x2.mean(0)
@@ -326,6 +373,8 @@ def f_dist_test(x1,x2,loc=0.95,alternative='two-sided',usevar='pooled',cal_x1_x2
                         6. cal_x1_x2_var : Flag for whether variance of both the populations to be calculated from the given arrays
                             ``False`` : Means variance of pop1 and pop2 are given in x1 and x2
                             Other than False : Means x1 and x2 are the arrays and variances to be computed from the same
+                        x1 and x2 can also be ``running_moments`` accumulators, then count and variance are taken from them
+                        (an array of observations given with one accumulator is accumulated too)
                         7. n1_obsv : Sample 1 size (int)
                         8. n2_obsv : Sample 2 size (int)
     Return :
@@ -339,7 +388,24 @@ def f_dist_test(x1,x2,loc=0.95,alternative='two-sided',usevar='pooled',cal_x1_x2
     f_critical2 : float
         Second tail critical value
     """
-    if cal_x1_x2_var == False:
+    if isinstance(x1, running_moments) or isinstance(x2, running_moments):
+        # A sample given as an array next to an accumulator is accumulated too
+        if not isinstance(x1, running_moments):
+            if np.ndim(x1) == 0:
+                raise TypeError('x1 must be an array of observations or a running_moments accumulator like x2')
+            x1 = running_moments().update(x1)
+        if not isinstance(x2, running_moments):
+            if np.ndim(x2) == 0:
+                raise TypeError('x2 must be an array of observations or a running_moments accumulator like x1')
+            x2 = running_moments().update(x2)
+        timer = instrumentation.start('f_dist_test',x1.count + x2.count)
+        nobs1 = x1.count
+        nobs2 = x2.count
+        dof1 = nobs1 - 1
+        dof2 = nobs2 - 1
+        s1_var,s2_var = x1.var(),x2.var()
+    elif cal_x1_x2_var == False:
+        timer = instrumentation.start('f_dist_test',None)
         s1_var = (1. * x1)
         s2_var = (1. * x2)
         nobs1 = n1_obsv
@@ -348,6 +414,7 @@ def f_dist_test(x1,x2,loc=0.95,alternative='two-sided',usevar='pooled',cal_x1_x2
         dof2 = nobs2 - 1
     else:
         s1,s2 = np.asarray(x1),np.asarray(x2)
+        timer = instrumentation.start('f_dist_test',s1.size + s2.size)
         nobs1 = len(s1)
         nobs2 = len(s2)
         dof1 = nobs1 - 1
@@ -355,25 +422,24 @@ def f_dist_test(x1,x2,loc=0.95,alternative='two-sided',usevar='pooled',cal_x1_x2
         s1_var,s2_var = np.var(s1),np.var(s2)
         
     f_test_stat = (s1_var) * (1./s2_var)
+    if timer is not None:
+        timer.mark('moments')
 
     if alternative == 'larger':
-        f_distribution = scipy_stats.f(dof1,dof2)
-        p_value = 1 - f_distribution.cdf(f_test_stat)
-        f_critical = f_distribution.ppf(loc)
-        return f_test_stat, p_value, f_critical
+        p_value = dist_cache.sf('f',f_test_stat,(dof1,dof2))
+        f_critical = dist_cache.critical_value('f',loc,'right',(dof1,dof2))
+        result = f_test_stat, p_value, f_critical
     elif alternative == 'smaller':
-        f_distribution = scipy_stats.f(dof1,dof2)
-        p_value = f_distribution.cdf(f_test_stat)
-        f_critical = f_distribution.ppf(1 - loc)
-        return f_test_stat, p_value, f_critical
+        p_value = dist_cache.cdf('f',f_test_stat,(dof1,dof2))
+        f_critical = dist_cache.critical_value('f',loc,'left',(dof1,dof2))
+        result = f_test_stat, p_value, f_critical
     elif alternative == 'two-sided':
-        alpha = 1 - loc
-        alpha_by_2 = alpha/2
-        one_minus_alpha_by_2 = 1 - alpha_by_2
-        f_distribution = scipy_stats.f(dof2,dof1)
-        p_value = 2 * min(f_distribution.cdf(f_test_stat), 1 - f_distribution.cdf(f_test_stat))
-        f_critical1 = f_distribution.ppf(alpha_by_2)
-        f_critical2 = f_distribution.ppf(one_minus_alpha_by_2)
-        return f_test_stat, p_value, f_critical1, f_critical2
+        f_cdf = dist_cache.cdf('f',f_test_stat,(dof2,dof1))
+        p_value = 2 * min(f_cdf, 1 - f_cdf)
+        f_critical1, f_critical2 = dist_cache.critical_value('f',loc,'two-sided',(dof2,dof1))
+        result = f_test_stat, p_value, f_critical1, f_critical2
     else:
-        raise ValueError('invalid alternative')
\ No newline at end of file
+        raise ValueError('invalid alternative')
+    if timer is not None:
+        timer.finish('distribution')
+    return result
\ No newline at end of file
@@ -0,0 +1,57 @@
+# Importing Packages
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from Scripts.anova import one_way_anova
+
+def test_one_way_anova_drops_nan_per_response():
+    rng = np.random.default_rng(0)
+    groups = np.repeat(['a', 'b', 'c'],20)
+    values = pd.DataFrame({'y1': rng.normal(size=60), 'y2': rng.normal(size=60)})
+    values.loc[::7,'y2'] = np.nan
+    out = one_way_anova(values,groups)
+    # y1 does not depend on the NaN's of y2
+    pd.testing.assert_series_equal(out.loc['y1'],one_way_anova(values['y1'],groups).stack().loc[out.columns],check_names=False)
+    alone = one_way_anova(values['y2'].dropna(),groups[values['y2'].notna().to_numpy()])
+    np.testing.assert_allclose(out.loc['y2',('Residual','df')],alone.loc['Residual','df'])
+    np.testing.assert_allclose(out.loc['y2',('groups','F')],alone.loc['groups','F'])
+
+# Agreement with statsmodels' ``anova_lm`` on the ``ANOVA_questions/ch08_all`` data
+DATA_DIR = os.path.join(os.path.dirname(__file__),os.pardir,'ANOVA_questions','ch08_all')
+
+def _assert_same_table(out,ref):
+    np.testing.assert_allclose(out['df'],ref['df'])
+    np.testing.assert_allclose(out['sum_sq'],ref['sum_sq'],rtol=1e-9)
+    np.testing.assert_allclose(out['F'].iloc[:-1],ref['F'].iloc[:-1],rtol=1e-9)
+    np.testing.assert_allclose(out['PR(>F)'].iloc[:-1],ref['PR(>F)'].iloc[:-1],rtol=1e-7)
+
+def test_one_way_anova_matches_statsmodels():
+    smf = pytest.importorskip('statsmodels.formula.api')
+    sm = pytest.importorskip('statsmodels.api')
+    from Scripts.anova import one_way_anova_wide
+
+    # Long data
+    df = pd.read_csv('{}/REV_C08_13.csv'.format(DATA_DIR))
+    ref = sm.stats.anova_lm(smf.ols('Count ~ C(Group)',data=df).fit())
+    _assert_same_table(one_way_anova(df['Count'],df['Group']),ref)
+
+    # Wide data, one column per treatment
+    wide = pd.read_csv('{}/EXA_C08_S02_01.csv'.format(DATA_DIR))
+    long = wide.melt(var_name='group',value_name='value').dropna()
+    ref = sm.stats.anova_lm(smf.ols('value ~ C(group)',data=long).fit())
+    _assert_same_table(one_way_anova_wide(wide),ref)
+
+@pytest.mark.parametrize('file_name, value, factor_a, factor_b, replication',
+                         [('EXA_C08_S04_01', 'FUNC', 'TIME', 'SUBJ', False),
+                          ('EXA_C08_S05_02', 'HOME', 'A', 'B', True)])
+def test_two_way_anova_matches_statsmodels(file_name,value,factor_a,factor_b,replication):
+    smf = pytest.importorskip('statsmodels.formula.api')
+    sm = pytest.importorskip('statsmodels.api')
+    from Scripts.anova import two_way_anova
+
+    df = pd.read_csv('{}/{}.csv'.format(DATA_DIR,file_name))
+    formula = '{} ~ C({}) {} C({})'.format(value,factor_a,'*' if replication else '+',factor_b)
+    ref = sm.stats.anova_lm(smf.ols(formula,data=df).fit())
+    out = two_way_anova(df[value],df[factor_a],df[factor_b],replication=replication)
+    _assert_same_table(out,ref)
@@ -0,0 +1,39 @@
+# Importing Packages
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from Scripts.anova_vis import marginal_means, pre_anova_vis
+
+def test_marginal_means_long_without_row_factor():
+    df = pd.DataFrame({'grp': ['a'] * 3 + ['b'] * 3, 'value': [1., 2., 3., 10., 20., 30.]})
+    col_means, row_means, grand_mean = marginal_means(df,value_col='value',col_factor='grp')
+    assert row_means is None
+    assert col_means['count'].tolist() == [3, 3]
+    np.testing.assert_allclose(col_means['mean'],[2., 20.])
+    np.testing.assert_allclose(col_means['std_err'],[np.std([1,2,3],ddof=1) / np.sqrt(3),np.std([10,20,30],ddof=1) / np.sqrt(3)])
+    np.testing.assert_allclose(grand_mean,11.)
+
+def test_marginal_means_large_offset():
+    # Centered sums keep the variance of data far from zero
+    df = pd.DataFrame({'grp': ['a'] * 3 + ['b'] * 3, 'blk': [0, 1, 2] * 2,
+                       'value': 1e9 + np.array([1., 2., 3., 1., 2., 3.])})
+    col_means, row_means, _ = marginal_means(df,value_col='value',col_factor='grp',row_factor='blk')
+    np.testing.assert_allclose(col_means['std_err'],[1 / np.sqrt(3)] * 2,rtol=1e-6)
+    np.testing.assert_allclose(row_means['mean'],1e9 + np.array([1., 2., 3.]))
+    wide = pd.DataFrame({'a': 1e9 + np.array([1., 2., 3.]), 'b': 1e9 + np.array([1., 2., 3.])})
+    col_means, row_means, _ = marginal_means(wide)
+    np.testing.assert_allclose(col_means['std_err'],[1 / np.sqrt(3)] * 2,rtol=1e-6)
+
+def test_large_data_histogram_and_box_plot():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.normal(size=5000), 'b': rng.lognormal(size=5000)})
+    vis = pre_anova_vis(df,['a','b'],large_data=True)
+    try:
+        vis.plot_dist()
+        vis.plot_box()
+        assert len(plt.get_fignums()) == 4
+        assert set(vis._summaries) == {'a', 'b'}
+    finally:
+        plt.close('all')
@@ -0,0 +1,92 @@
+# Importing Packages
+import warnings
+import numpy as np
+import pytest
+import scipy.stats as scipy_stats
+from Scripts.assumptions import assumption_checks, homogeneity_tests, normality_tests
+
+SIZES = [3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 50, 2000]
+
+def _grouped_sample(seed):
+    # One group per size, shuffled, with a few NaN's that are dropped
+    rng = np.random.default_rng(seed)
+    groups = np.repeat(np.arange(len(SIZES)),SIZES)
+    values = rng.gamma(3.,size=groups.size) + 100. * groups
+    order = rng.permutation(groups.size)
+    values, groups = np.append(values[order],[np.nan, np.nan]), np.append(groups[order],[0, 10])
+    return values, groups
+
+def _group_values(values,groups,key):
+    group = values[groups == key]
+    return group[~np.isnan(group)]
+
+def test_normality_tests_match_scipy():
+    values, groups = _grouped_sample(0)
+    out = normality_tests(values,groups)
+    for key, size in enumerate(SIZES):
+        group = _group_values(values,groups,key)
+        row = out.loc[key]
+        assert row['n'] == size
+        np.testing.assert_allclose([row['shapiro_stat'], row['shapiro_p']],tuple(scipy_stats.shapiro(group)),rtol=1e-7)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            a2_stat = scipy_stats.anderson(group,dist='norm').statistic
+        np.testing.assert_allclose(row['anderson_stat'],a2_stat,rtol=1e-9)
+        if size >= 8:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                expected = tuple(scipy_stats.normaltest(group))
+            np.testing.assert_allclose([row['dagostino_stat'], row['dagostino_p']],expected,rtol=1e-9)
+        else:
+            assert np.isnan(row['dagostino_stat']) and np.isnan(row['dagostino_p'])
+
+def test_anderson_pvalue_matches_statsmodels():
+    diagnostic = pytest.importorskip('statsmodels.stats.diagnostic')
+    values, groups = _grouped_sample(1)
+    out = normality_tests(values,groups,tests=['anderson'])
+    for key in range(len(SIZES)):
+        expected = diagnostic.normal_ad(_group_values(values,groups,key))
+        # statsmodels reports p-values below 5e-31 as 0 for a single sample
+        np.testing.assert_allclose(out.loc[key,['anderson_stat','anderson_p']].to_numpy(dtype=float),expected,
+                                   rtol=1e-9,atol=1e-30)
+
+def test_constant_group_is_not_tested():
+    values = np.concatenate([np.full(10,3.),np.random.default_rng(2).normal(size=10)])
+    out = normality_tests(values,np.repeat([0, 1],10))
+    assert out.loc[0,['shapiro_stat','shapiro_p','dagostino_p','anderson_stat','anderson_p']].isna().all()
+    assert out.loc[1].notna().all()
+
+def test_homogeneity_tests_match_scipy():
+    values, groups = _grouped_sample(3)
+    samples = [_group_values(values,groups,key) for key in range(len(SIZES))]
+    out = homogeneity_tests(values,groups).iloc[0]
+    np.testing.assert_allclose([out['levene_stat'], out['levene_p']],tuple(scipy_stats.levene(*samples,center='mean')),rtol=1e-9)
+    np.testing.assert_allclose([out['brown_forsythe_stat'], out['brown_forsythe_p']],
+                               tuple(scipy_stats.levene(*samples,center='median')),rtol=1e-9)
+    np.testing.assert_allclose([out['bartlett_stat'], out['bartlett_p']],tuple(scipy_stats.bartlett(*samples)),rtol=1e-9)
+
+def test_several_responses_match_one_response():
+    rng = np.random.default_rng(4)
+    groups = np.repeat(np.arange(4),[6, 9, 20, 15])
+    values = rng.normal(size=(groups.size,3))
+    values[rng.random(values.shape) < 0.05] = np.nan
+    normality, homogeneity = normality_tests(values,groups), homogeneity_tests(values,groups)
+    for col in range(3):
+        np.testing.assert_allclose(normality.loc[col].to_numpy(dtype=float),
+                                   normality_tests(values[:,col],groups).to_numpy(dtype=float),rtol=1e-12)
+        np.testing.assert_allclose(homogeneity.loc[col].to_numpy(dtype=float),
+                                   homogeneity_tests(values[:,col],groups).iloc[0].to_numpy(dtype=float),rtol=1e-12)
+
+def test_assumption_checks_gate():
+    rng = np.random.default_rng(5)
+    groups = np.repeat(np.arange(3),40)
+    normal = rng.normal(size=groups.size)
+    skewed = rng.exponential(size=groups.size)**3
+    # A constant group has a NaN normality p-value, which fails the check
+    constant = normal.copy()
+    constant[groups == 2] = 1.
+    out = assumption_checks(np.column_stack([normal,skewed,constant]),groups)
+    assert out['normal'].tolist() == [True, False, False]
+    assert out['path'].tolist() == ['anova', 'nonparametric', 'nonparametric']
+    assert out.loc[0,'parametric'] and out.loc[0,'equal_var']
+    assert out['n_groups'].tolist() == [3, 3, 3]
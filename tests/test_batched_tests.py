@@ -0,0 +1,31 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+import pytest
+from Scripts.batched_tests import grouped_one_porportion_ztest, grouped_ztest_notpooled
+from Scripts.stats_tests import one_porportion_ztest, ztest_notpooled
+
+def _skewed_frame(seed):
+    # One big group and many small ones, with some NaN's
+    rng = np.random.default_rng(seed)
+    groups = np.concatenate([np.zeros(2000,dtype=int),np.repeat(np.arange(1,51),4)])
+    values = rng.random(groups.size)
+    values[rng.random(groups.size) < 0.1] = np.nan
+    return pd.DataFrame({'grp': groups, 'value': values})
+
+@pytest.mark.parametrize('nan_policy',[False, 'mean', 'median'])
+def test_grouped_one_porportion_ztest_matches_per_group(nan_policy):
+    df = _skewed_frame(0)
+    out = grouped_one_porportion_ztest(df,'grp','value',0.45,nan_policy=nan_policy)
+    for key, group in df.groupby('grp'):
+        np.testing.assert_allclose(out.loc[key],one_porportion_ztest(group['value'].to_numpy(),0.45,nan_policy=nan_policy))
+
+def test_grouped_ztest_notpooled_matches_per_group():
+    df1, df2 = _skewed_frame(1), _skewed_frame(2)
+    df2 = df2[df2['grp'] != 3]
+    out = grouped_ztest_notpooled(df1,'grp','value',df2)
+    assert 3 not in out.index
+    for key in out.index:
+        x1 = df1.loc[df1['grp'] == key,'value'].dropna().to_numpy()
+        x2 = df2.loc[df2['grp'] == key,'value'].dropna().to_numpy()
+        np.testing.assert_allclose(out.loc[key],ztest_notpooled(x1,x2))
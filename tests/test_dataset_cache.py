@@ -0,0 +1,45 @@
+# Importing Packages
+import os
+import numpy as np
+from Scripts import dataset_cache
+from Scripts.dataset_cache import load_columns, load_dataset
+
+SOURCE = os.path.join(os.path.dirname(__file__),os.pardir,'Datasets','StatewiseTestingDetails.csv')
+
+def _mapped_base(values):
+    # Follows the ``base`` chain of an array down to the memory-mapped array it views, if any
+    while values is not None and not isinstance(values,np.memmap):
+        values = getattr(values,'base',None)
+    return values
+
+def test_load_dataset_does_not_copy_numeric_columns(tmp_path):
+    columns = load_columns(SOURCE,cache_dir=str(tmp_path))
+    frame = load_dataset(SOURCE,cache_dir=str(tmp_path))
+    for name in ['TotalSamples', 'Positive']:
+        values = frame[name].to_numpy()
+        mapped = _mapped_base(values)
+        assert mapped is not None and np.shares_memory(values,mapped)
+        np.testing.assert_array_equal(values,columns[name])
+
+def test_parsing_options_do_not_invalidate_each_other(tmp_path,monkeypatch):
+    source = tmp_path / 'source.csv'
+    source.write_text('a,b\n1,2\n3,4\n5,6\n')
+    cache_dir = str(tmp_path / 'cache')
+    parsed = []
+    read_source = dataset_cache._read_source
+    monkeypatch.setattr(dataset_cache,'_read_source',lambda path,read_kwargs: parsed.append(read_kwargs) or read_source(path,read_kwargs))
+
+    options = [{}, {'usecols': ['a']}]
+    entry_dirs = [dataset_cache.cache_dataset(str(source),cache_dir=cache_dir,read_kwargs=kwargs) for kwargs in options]
+    for _ in range(2):
+        for kwargs, entry_dir in zip(options,entry_dirs):
+            assert dataset_cache.cache_dataset(str(source),cache_dir=cache_dir,read_kwargs=kwargs) == entry_dir
+            assert os.path.isdir(entry_dir)
+    assert len(parsed) == 2
+    assert list(dataset_cache.load_dataset(str(source),cache_dir=cache_dir,read_kwargs=options[1]).columns) == ['a']
+
+    # A new content replaces the entries of every option
+    source.write_text('a,b\n7,8\n')
+    os.utime(str(source),ns=(0,0))
+    assert dataset_cache.load_dataset(str(source),cache_dir=cache_dir)['a'].tolist() == [7]
+    assert not any(os.path.isdir(entry_dir) for entry_dir in entry_dirs)
@@ -0,0 +1,15 @@
+# Importing Packages
+import os
+import subprocess
+import sys
+import Scripts
+from Scripts.benchmarks import check_import_budgets
+
+def test_package_import_is_lazy():
+    code = 'import sys, Scripts; print(" ".join(name for name in ["scipy", "pandas", "matplotlib"] if name in sys.modules))'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(Scripts.__file__)))
+    proc = subprocess.run([sys.executable,'-c',code],cwd=root,capture_output=True,text=True,check=True)
+    assert proc.stdout.strip() == ''
+
+def test_import_budgets():
+    assert check_import_budgets(verbose=False) == []
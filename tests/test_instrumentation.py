@@ -0,0 +1,44 @@
+# Importing Packages
+import json
+import numpy as np
+from Scripts import dist_cache, instrumentation
+from Scripts.stats_tests import f_dist_test, one_porportion_ztest
+
+def test_start_is_none_when_disabled():
+    instrumentation.enable(False)
+    assert not instrumentation.is_enabled()
+    assert instrumentation.start('f_dist_test',10) is None
+
+def test_profiling_records_calls_and_exports(tmp_path):
+    rng = np.random.default_rng(0)
+    x1, x2 = rng.normal(size=30), rng.normal(size=40)
+    dist_cache.clear_cache()
+    instrumentation.enable(False)
+    with instrumentation.profiling(tmp_path / 'profile.json') as profile:
+        assert instrumentation.is_enabled()
+        # Same degrees of freedom twice: one critical value cache miss, then one hit
+        f_dist_test(x1,x2,cal_x1_x2_var=True)
+        f_dist_test(x1,x2,cal_x1_x2_var=True)
+        one_porportion_ztest(rng.random(50),0.5)
+    assert not instrumentation.is_enabled()
+    # Calls after the block are not recorded
+    f_dist_test(x1,x2,cal_x1_x2_var=True)
+
+    record = profile['functions']['f_dist_test']
+    assert (record['calls'], record['input_size'], record['max_input_size']) == (2, 140, 70)
+    assert (record['cache_misses'], record['cache_hits']) == (1, 1)
+    assert record['seconds'] > 0
+    assert {phase: values['calls'] for phase, values in record['phases'].items()} == {'moments': 2, 'distribution': 2}
+    assert profile['functions']['one_porportion_ztest']['calls'] == 1
+    assert profile['dist_cache']['critical_values']['misses'] == 1
+
+    with open(tmp_path / 'profile.json') as profile_file:
+        assert json.load(profile_file) == json.loads(json.dumps(profile))
+    text = instrumentation.to_prometheus(profile)
+    assert '# TYPE stats_tests_calls_total counter' in text
+    assert 'stats_tests_calls_total{function="f_dist_test"} 2.0' in text
+    assert 'stats_tests_phase_calls_total{function="f_dist_test",phase="moments"} 2.0' in text
+    assert 'stats_tests_dist_cache_misses_total{cache="critical_values"} 1.0' in text
+    instrumentation.export_snapshot(tmp_path / 'profile.prom',fmt='prometheus',snap=profile)
+    assert (tmp_path / 'profile.prom').read_text() == text
+    instrumentation.reset()
@@ -0,0 +1,33 @@
+# Importing Packages
+import numpy as np
+import pytest
+from Scripts import multiple_testing
+from Scripts.multiple_testing import adjust_pvalues, adjust_pvalues_external
+
+@pytest.mark.parametrize('method',['bh', 'by', 'holm', 'storey'])
+def test_external_matches_in_memory_with_crowded_pvalues(tmp_path,monkeypatch,method):
+    rng = np.random.default_rng(0)
+    # Crowded near 0 (one top-level bin), ties at 1 and 0.03, NaN's
+    p_values = np.concatenate([rng.random(5000),1e-5 + rng.random(5000) * 1e-17,10**-rng.uniform(5,300,5000),
+                               np.ones(3000),np.full(2000,0.03),np.full(10,np.nan)])
+    rng.shuffle(p_values)
+    np.save(tmp_path / 'p.npy',p_values)
+
+    # Largest number of pairs read from a bucket file at once
+    loaded = []
+    fromfile = np.fromfile
+    def counting_fromfile(*args,**kwargs):
+        pairs = fromfile(*args,**kwargs)
+        loaded.append(pairs.size)
+        return pairs
+    monkeypatch.setattr(multiple_testing.np,'fromfile',counting_fromfile)
+    adj = adjust_pvalues_external(tmp_path / 'p.npy',tmp_path / 'adj.npy',method,bucket_size=500,chunk_size=700)
+    np.testing.assert_array_equal(adj,adjust_pvalues(p_values,method))
+    assert max(loaded) <= 700
+
+@pytest.mark.filterwarnings('error')
+@pytest.mark.parametrize('method',['bh', 'storey'])
+def test_all_nan_pvalues(method):
+    p_values = np.full(5,np.nan)
+    assert np.isnan(multiple_testing.storey_pi0(p_values))
+    assert np.isnan(adjust_pvalues(p_values,method)).all()
@@ -0,0 +1,24 @@
+# Importing Packages
+import numpy as np
+import pytest
+from Scripts.permutation import permutation_test
+from Scripts.stats_tests import ztest_notpooled
+
+@pytest.mark.parametrize('exact',[True, False])
+def test_output_types(exact):
+    rng = np.random.default_rng(0)
+    observed, p_value, n_used = permutation_test([rng.random(7),rng.random(8)],exact=exact,seed=1)
+    assert (type(observed), type(p_value), type(n_used)) == (float, float, int)
+    observed, p_value, n_used = permutation_test([rng.random((7,2)),rng.random((8,2))],exact=exact,seed=1)
+    assert (observed.dtype, p_value.dtype, n_used.dtype, n_used.shape) == (np.float64, np.float64, np.int64, (2,))
+
+def test_exact_guard():
+    rng = np.random.default_rng(0)
+    with pytest.raises(ValueError):
+        permutation_test([rng.random(40),rng.random(40)],exact=True)
+
+def test_t_statistic_matches_ztest_notpooled():
+    rng = np.random.default_rng(0)
+    x1, x2 = rng.lognormal(size=20), rng.lognormal(size=35)
+    observed, _, _ = permutation_test([x1,x2],statistic='t',n_permutations=100,seed=1)
+    assert observed == pytest.approx(ztest_notpooled(x1,x2)[0])
@@ -0,0 +1,29 @@
+# Importing Packages
+import numpy as np
+import pytest
+import scipy.stats as scipy_stats
+from Scripts.post_hoc import _studentized_range_sf, tukey_hsd
+
+def test_tukey_hsd_identical_means():
+    # 435 pairs, all with a statistic of 0
+    out = tukey_hsd(np.tile(np.arange(5.),30),np.repeat(np.arange(30),5))
+    assert len(out) == 435
+    np.testing.assert_allclose(out['p_adj'],1.)
+    assert not out['reject'].any()
+
+def test_studentized_range_sf_non_finite():
+    q_stats = np.full(300,2.5)
+    q_stats[:3] = [np.inf, np.nan, np.inf]
+    p_values = _studentized_range_sf(q_stats,5,20)
+    assert p_values[0] == p_values[2] == 0. and np.isnan(p_values[1])
+    np.testing.assert_allclose(p_values[3:],scipy_stats.studentized_range.sf(2.5,5,20))
+    q_stats[3:] = np.linspace(0.,6.,297)
+    p_values = _studentized_range_sf(q_stats,5,20)
+    np.testing.assert_allclose(p_values[3:],scipy_stats.studentized_range.sf(q_stats[3:],5,20),atol=1e-5)
+
+@pytest.mark.filterwarnings('ignore:divide by zero')
+def test_tukey_hsd_zero_variance():
+    values = np.repeat(np.arange(30.),5)
+    out = tukey_hsd(values,np.repeat(np.arange(30),5))
+    np.testing.assert_array_equal(out['p_adj'],0.)
+    assert out['reject'].all()
@@ -0,0 +1,74 @@
+# Importing Packages
+import numpy as np
+import pandas as pd
+import pytest
+from Scripts.rolling import rolling_tests, rolling_window_tests
+
+def _panel(seed,offset=0.):
+    # Groups of different lengths (some shorter than the window), NaN rows, rows shuffled with a time column
+    rng = np.random.default_rng(seed)
+    lengths = {'a': 40, 'b': 3, 'c': 25, 'd': 1}
+    df = pd.DataFrame({'grp': np.repeat(list(lengths),list(lengths.values())),
+                       'time': np.concatenate([np.arange(n) for n in lengths.values()])})
+    df['x'] = offset + rng.random(len(df))
+    df['y'] = offset + rng.random(len(df)) * 2
+    df.loc[rng.random(len(df)) < 0.15,'x'] = np.nan
+    df.loc[rng.random(len(df)) < 0.15,'y'] = np.nan
+    return df.sample(frac=1.,random_state=seed)
+
+def _brute_force(df,col,window,lag):
+    # Count, mean and M2 of the window of every row, recomputed from the rows of its group
+    out = pd.DataFrame(index=df.index,columns=['n','mean','m2'],dtype=float)
+    for _, group in df.sort_values('time').groupby('grp'):
+        values = group[col].to_numpy()
+        for pos, idx in enumerate(group.index):
+            obs = values[max(0,pos - lag - window + 1):max(0,pos - lag + 1)]
+            obs = obs[~np.isnan(obs)]
+            out.loc[idx] = [obs.size, obs.mean() if obs.size else np.nan, ((obs - obs.mean())**2).sum() if obs.size else np.nan]
+    return out
+
+def _check(out,expected,test_stat):
+    enough = expected['n'].to_numpy() > 0
+    np.testing.assert_array_equal(out['nobs1'],expected['n'])
+    np.testing.assert_allclose(out['mean1'][enough],expected['mean'][enough],rtol=1e-12)
+    np.testing.assert_allclose(out['test_stat'],test_stat,rtol=1e-9,atol=1e-12)
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('test,lag',[('proportion',None), ('ztest',None), ('ztest',5)])
+def test_backfill_matches_brute_force(test,lag):
+    df, window = _panel(0), 7
+    out, _ = rolling_tests(df,'grp','x',window,test=test,time_col='time',min_periods=3,lag=lag,pop_proportion=0.4)
+    first = _brute_force(df,'x',window,0)
+    n1, mean1, m2_1 = [first[name].to_numpy(dtype=float) for name in ['n', 'mean', 'm2']]
+    if test == 'proportion':
+        test_stat = (mean1 - 0.4) / np.sqrt(0.4 * 0.6 / n1)
+        test_stat[n1 < 3] = np.nan
+    elif lag is None:
+        test_stat = mean1 / np.sqrt((m2_1 / n1) / (n1 - 1))
+        test_stat[n1 < 3] = np.nan
+    else:
+        second = _brute_force(df,'x',window,lag)
+        n2, mean2, m2_2 = [second[name].to_numpy(dtype=float) for name in ['n', 'mean', 'm2']]
+        np.testing.assert_array_equal(out['nobs2'],n2)
+        test_stat = (mean1 - mean2) / np.sqrt(m2_1 / n1 / n1 + m2_2 / n2 / n2)
+        test_stat[(n1 < 3) | (n2 < 3)] = np.nan
+    _check(out,first,test_stat)
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('kwargs',[{'test': 'ztest', 'lag': 7}, {'test': 'ztest', 'value_col2': 'y'}])
+def test_append_after_backfill_matches_full_backfill(kwargs):
+    # A large offset checks that the shifted window sums stay accurate while the ring buffers wrap around
+    df, window, cut = _panel(1,offset=1e3), 7, 10
+    full, _ = rolling_tests(df,'grp','x',window,time_col='time',min_periods=3,**kwargs)
+    _, roller = rolling_tests(df[df['time'] < cut],'grp','x',window,time_col='time',min_periods=3,**kwargs)
+    assert isinstance(roller,rolling_window_tests)
+    columns = ['nobs1', 'mean1', 'nobs2', 'mean2', 'test_stat', 'p_value']
+    for step, rows in df[df['time'] >= cut].sort_values('grp').groupby('time'):
+        x2 = rows['y'] if 'value_col2' in kwargs else None
+        out = roller.append(rows['grp'],rows['x'],x2)
+        assert (out['step'] == step).all()
+        np.testing.assert_allclose(out[columns].to_numpy(dtype=float),full.loc[rows.index,columns].to_numpy(dtype=float),
+                                   rtol=1e-11)
+    last = df.sort_values('time').groupby('grp').tail(1)
+    np.testing.assert_allclose(roller.to_frame().loc[last['grp'],columns].to_numpy(dtype=float),
+                               full.loc[last.index,columns].to_numpy(dtype=float),rtol=1e-11)
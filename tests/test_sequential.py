@@ -0,0 +1,71 @@
+# Importing Packages
+import numpy as np
+import pytest
+from Scripts.sequential import msprt_tests
+
+def _batches(seed,n_experiments,n_batches,batch_size):
+    # Batches of (experiment, arm, value) events, the first experiments having an effect on arm 0
+    rng = np.random.default_rng(seed)
+    for _ in range(n_batches):
+        experiments = rng.integers(0,n_experiments,batch_size)
+        arms = rng.integers(0,2,batch_size)
+        values = rng.normal(size=batch_size) + 0.5 * ((experiments < 3) & (arms == 0))
+        values[rng.random(batch_size) < 0.02] = np.nan
+        yield experiments, arms, values
+
+def test_update_matches_update_moments_and_push():
+    n_experiments = 10
+    by_update, by_moments, by_push = [msprt_tests(n_experiments,tau=0.5) for _ in range(3)]
+    history = []
+    for experiments, arms, values in _batches(0,n_experiments,30,200):
+        for arm in [0, 1]:
+            exp_arm, val_arm = experiments[arms == arm], values[arms == arm]
+            by_update.update(exp_arm,val_arm,arm=arm)
+            keep = ~np.isnan(val_arm)
+            pos = np.unique(exp_arm[keep])
+            groups = [val_arm[keep & (exp_arm == exp)] for exp in pos]
+            by_moments.update_moments(pos,[len(obs) for obs in groups],[obs.mean() for obs in groups],
+                                      [((obs - obs.mean())**2).sum() for obs in groups],arm=arm)
+        np.testing.assert_allclose(by_moments.p_value,by_update.p_value,rtol=1e-12)
+        history.append(by_update.p_value.copy())
+    history = np.array(history)
+    assert (np.diff(history,axis=0) <= 0).all()
+    assert history[-1,:3].max() < 0.05
+
+    # One event at a time: ``push`` against single event batches of ``update``
+    by_single = msprt_tests(n_experiments,tau=0.5)
+    pushed = []
+    for experiments, arms, values in _batches(0,n_experiments,5,200):
+        for exp, arm, value in zip(experiments,arms,values):
+            pushed.append(by_push.push(exp,value,arm=arm))
+            by_single.update([exp],[value],arm=arm)
+            assert pushed[-1] == pytest.approx(by_single.p_value[exp],rel=1e-12)
+    np.testing.assert_allclose(by_push.p_value,by_single.p_value,rtol=1e-12)
+    np.testing.assert_array_equal(by_push.rejected,by_single.rejected)
+
+@pytest.mark.parametrize('test',['ztest', 'proportion'])
+def test_stop_is_final(test):
+    rng = np.random.default_rng(1)
+    tests = msprt_tests(2,test=test,pop_proportion=0.5,tau=0.5,max_samples=400)
+    experiments = np.repeat([0, 1],50)
+    # Experiment 0 has a large effect, experiment 1 none
+    for _ in range(4):
+        if test == 'ztest':
+            tests.update(experiments,rng.normal(size=100) + (experiments == 0),arm=0)
+            tests.update(experiments,rng.normal(size=100),arm=1)
+        else:
+            tests.update(experiments,rng.random(100) < np.where(experiments == 0,0.9,0.5),arm=0)
+    assert tests.stop().tolist() == [True, False]
+    p_stopped = tests.p_value[0]
+
+    # Evidence the other way does not undo the decision, and the horizon stops the second experiment
+    for _ in range(6):
+        if test == 'ztest':
+            tests.update(experiments,rng.normal(size=100) - (experiments == 0),arm=0)
+            tests.update(experiments,rng.normal(size=100),arm=1)
+        else:
+            tests.update(experiments,rng.random(100) < np.where(experiments == 0,0.1,0.5),arm=0)
+        assert tests.stop()[0] and tests.rejected[0] and tests.p_value[0] <= p_stopped
+    frame = tests.to_frame()
+    assert frame['stop'].tolist() == [True, True]
+    assert frame.loc[1,'n1'] >= 400
@@ -0,0 +1,24 @@
+# Importing Packages
+import numpy as np
+import pytest
+from Scripts import instrumentation
+from Scripts.accumulators import running_moments
+from Scripts.stats_tests import f_dist_test
+
+@pytest.mark.parametrize('enabled',[False, True])
+def test_f_dist_test_mixed_accumulator_and_array(enabled):
+    rng = np.random.default_rng(0)
+    x1, x2 = rng.normal(size=40), rng.normal(scale=2.,size=60)
+    expected = f_dist_test(x1,x2,cal_x1_x2_var=True)
+    instrumentation.enable(enabled)
+    try:
+        for args in [(running_moments().update(x1),x2), (x1,running_moments().update(x2)),
+                     (running_moments().update(x1),running_moments().update(x2))]:
+            np.testing.assert_allclose(f_dist_test(*args),expected)
+    finally:
+        instrumentation.enable(False)
+        instrumentation.reset()
+
+def test_f_dist_test_accumulator_with_scalar():
+    with pytest.raises(TypeError):
+        f_dist_test(running_moments().update([1., 2., 4.]),2.5)